@@ -1,291 +1,364 @@
 """
 Achievement and Badge System for Cybersecurity Learning Bot
-Tracks user progress and awards badges for milestones
+Tracks user progress and awards badges for milestones; definitions are
+loaded from achievements.json and can be reloaded without a restart
 """
 
 from database import db
+from courses import LRUCache
 import discord
+import json
+import os
+from bisect import bisect_right
 from datetime import datetime
+from typing import NamedTuple
 
-# Achievement definitions
-ACHIEVEMENTS = {
-    # XP-based achievements
-    "first_steps": {
-        "name": "🚀 First Steps",
-        "description": "Complete your first lesson",
-        "type": "lesson_completion",
-        "requirement": 1,
-        "xp_bonus": 50
-    },
-    "knowledge_seeker": {
-        "name": "📚 Knowledge Seeker", 
-        "description": "Complete 5 lessons",
-        "type": "lesson_completion",
-        "requirement": 5,
-        "xp_bonus": 100
-    },
-    "cyber_student": {
-        "name": "🎓 Cyber Student",
-        "description": "Complete 10 lessons",
-        "type": "lesson_completion", 
-        "requirement": 10,
-        "xp_bonus": 200
-    },
-    "security_scholar": {
-        "name": "🏆 Security Scholar",
-        "description": "Complete 25 lessons",
-        "type": "lesson_completion",
-        "requirement": 25,
-        "xp_bonus": 500
-    },
+ACHIEVEMENTS_FILE = os.getenv("ACHIEVEMENTS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "achievements.json"))
+
+# Achievement categories (the "type" of a definition)
+CATEGORIES = ("xp_milestone", "lesson_completion", "course_completion", "perfect_quiz", "daily_streak", "special")
+
+CATEGORY_NAMES = {
+    "xp_milestone": "⭐ XP Milestones",
+    "lesson_completion": "📚 Learning Progress",
+    "course_completion": "🎓 Course Completions",
+    "perfect_quiz": "🎯 Quiz Mastery",
+    "daily_streak": "🔥 Dedication",
+    "special": "🌟 Special"
+}
+
+# Badges listed on each category page of !achievements
+ACHIEVEMENTS_PER_PAGE = 8
+
+def _course_completed(stats: dict, course_id: int) -> bool:
+    from courses import get_course_lesson_count
+    
+    total = get_course_lesson_count(course_id)
+    return bool(total) and stats["courses"].get(course_id, 0) >= total
+
+# Condition types the engine can evaluate from a user's stats (see db.get_achievement_stats)
+CONDITION_CHECKS = {
+    "xp_milestone": lambda stats, requirement: stats["xp"] >= requirement,
+    "lesson_completion": lambda stats, requirement: stats["lessons"] >= requirement,
+    "perfect_quiz": lambda stats, requirement: stats["perfect_quizzes"] >= requirement,
+    "daily_streak": lambda stats, requirement: stats["longest_streak"] >= requirement,
+    "course_completion": _course_completed
+}
+
+def achievement_bit(achievement: dict) -> int:
+    return 1 << achievement["id"]
+
+def _conditions(achievement: dict) -> list:
+    """(type, requirement) pairs that unlock an achievement; empty for manual ones"""
+    if "all" in achievement or "any" in achievement:
+        return [(c["type"], c["requirement"]) for c in achievement.get("all", achievement.get("any"))]
+    if achievement["type"] in CONDITION_CHECKS:
+        return [(achievement["type"], achievement["requirement"])]
+    return []
+
+def validate_achievements(achievements, previous: dict = None) -> list:
+    """Check achievement definitions; returns a list of problems (empty if valid)
     
-    # XP milestones
-    "xp_novice": {
-        "name": "⭐ XP Novice",
-        "description": "Earn 500 XP",
-        "type": "xp_milestone",
-        "requirement": 500,
-        "xp_bonus": 100
-    },
-    "xp_apprentice": {
-        "name": "⭐⭐ XP Apprentice", 
-        "description": "Earn 1,500 XP",
-        "type": "xp_milestone",
-        "requirement": 1500,
-        "xp_bonus": 200
-    },
-    "xp_expert": {
-        "name": "⭐⭐⭐ XP Expert",
-        "description": "Earn 5,000 XP", 
-        "type": "xp_milestone",
-        "requirement": 5000,
-        "xp_bonus": 500
-    },
-    "xp_master": {
-        "name": "⭐⭐⭐⭐ XP Master",
-        "description": "Earn 10,000 XP",
-        "type": "xp_milestone", 
-        "requirement": 10000,
-        "xp_bonus": 1000
-    },
+    Each entry needs an "id" (its achievement_mask bit, 0-62, which must never
+    change or be reused), "name", "description", "type" (a category) and
+    "xp_bonus". Evaluated categories need a positive integer "requirement";
+    any entry may instead list "all" or "any" conditions of the form
+    {"type": ..., "requirement": ...}. Others are awarded manually.
+    """
+    if not isinstance(achievements, dict) or not achievements:
+        return ["'achievements' must be a non-empty object"]
     
-    # Course completion achievements
-    "fundamentals_graduate": {
-        "name": "🛡️ Fundamentals Graduate",
-        "description": "Complete Cybersecurity Fundamentals course",
-        "type": "course_completion",
-        "requirement": 1,
-        "xp_bonus": 300
-    },
-    "password_master": {
-        "name": "🔐 Password Master", 
-        "description": "Complete Password Security Mastery course",
-        "type": "course_completion",
-        "requirement": 2,
-        "xp_bonus": 300
-    },
-    "phishing_defender": {
-        "name": "🎣 Phishing Defender",
-        "description": "Complete Phishing Defense Academy course", 
-        "type": "course_completion",
-        "requirement": 3,
-        "xp_bonus": 300
-    },
-    "network_guardian": {
-        "name": "🌐 Network Guardian",
-        "description": "Complete Network Security Basics course",
-        "type": "course_completion", 
-        "requirement": 4,
-        "xp_bonus": 400
-    },
+    errors = []
+    seen_ids = {}
+    seen_names = set()
+    for key, achievement in achievements.items():
+        where = f"achievement {key}"
+        if not isinstance(achievement, dict):
+            errors.append(f"{where}: must be an object")
+            continue
+        
+        for field, expected in (("id", int), ("name", str), ("description", str), ("type", str), ("xp_bonus", int)):
+            if not isinstance(achievement.get(field), expected):
+                errors.append(f"{where}: '{field}' must be {expected.__name__}")
+        
+        achievement_id = achievement.get("id")
+        if isinstance(achievement_id, int):
+            if not 0 <= achievement_id <= 62:
+                errors.append(f"{where}: id {achievement_id} must be between 0 and 62")
+            elif achievement_id in seen_ids:
+                errors.append(f"{where}: id {achievement_id} is already used by {seen_ids[achievement_id]}")
+            seen_ids[achievement_id] = key
+            if previous and key in previous and previous[key]["id"] != achievement_id:
+                errors.append(f"{where}: id changed from {previous[key]['id']} (ids are stored in user masks)")
+        
+        if achievement.get("name") in seen_names:
+            errors.append(f"{where}: name {achievement['name']!r} is used twice")
+        seen_names.add(achievement.get("name"))
+        
+        if achievement.get("type") not in CATEGORIES:
+            errors.append(f"{where}: type must be one of {', '.join(CATEGORIES)}")
+        
+        if "all" in achievement or "any" in achievement:
+            conditions = achievement.get("all", achievement.get("any"))
+            if "all" in achievement and "any" in achievement:
+                errors.append(f"{where}: use either 'all' or 'any', not both")
+            elif not isinstance(conditions, list) or not conditions:
+                errors.append(f"{where}: conditions must be a non-empty list")
+                conditions = []
+            for condition in conditions:
+                if not isinstance(condition, dict) or condition.get("type") not in CONDITION_CHECKS:
+                    errors.append(f"{where}: condition type must be one of {', '.join(CONDITION_CHECKS)}")
+                elif not isinstance(condition.get("requirement"), int) or condition["requirement"] < 1:
+                    errors.append(f"{where}: condition requirement must be a positive integer")
+        elif achievement.get("type") in CONDITION_CHECKS:
+            if not isinstance(achievement.get("requirement"), int) or achievement["requirement"] < 1:
+                errors.append(f"{where}: 'requirement' must be a positive integer")
     
-    # Quiz achievements
-    "quiz_ace": {
-        "name": "🎯 Quiz Ace",
-        "description": "Score 100% on 5 quizzes",
-        "type": "perfect_quiz",
-        "requirement": 5,
-        "xp_bonus": 250
-    },
-    "quiz_champion": {
-        "name": "🏅 Quiz Champion", 
-        "description": "Score 100% on 15 quizzes",
-        "type": "perfect_quiz",
-        "requirement": 15,
-        "xp_bonus": 500
-    },
+    return errors
+
+class AchievementRules:
+    """Validated achievement definitions compiled into per-type lookup tables
     
-    # Streak achievements
-    "daily_learner": {
-        "name": "📅 Daily Learner",
-        "description": "Complete lessons 3 days in a row",
-        "type": "daily_streak",
-        "requirement": 3,
-        "xp_bonus": 150
-    },
-    "dedicated_student": {
-        "name": "🔥 Dedicated Student",
-        "description": "Complete lessons 7 days in a row", 
-        "type": "daily_streak",
-        "requirement": 7,
-        "xp_bonus": 350
-    },
+    Threshold types get a sorted requirement array (located with bisect) and
+    course completion a dict by course id, so the cost of a check doesn't
+    grow with the number of rules.
+    """
     
-    # Special achievements
-    "early_adopter": {
-        "name": "🌟 Early Adopter",
-        "description": "One of the first 100 users",
-        "type": "special",
-        "requirement": 100,
-        "xp_bonus": 200
-    },
-    "community_helper": {
-        "name": "🤝 Community Helper",
-        "description": "Help other learners in the community",
-        "type": "special", 
-        "requirement": 1,
-        "xp_bonus": 300
-    }
-}
+    def __init__(self, achievements: dict, mtime_ns: int = None):
+        self.achievements = achievements
+        self.mtime_ns = mtime_ns
+        self.by_name = {a["name"]: a for a in achievements.values()}
+        
+        self.category_masks = {category: 0 for category in CATEGORIES}
+        triggers = {condition_type: [] for condition_type in CONDITION_CHECKS}
+        for achievement in achievements.values():
+            self.category_masks[achievement["type"]] |= achievement_bit(achievement)
+            for condition_type, requirement in _conditions(achievement):
+                triggers[condition_type].append((requirement, achievement["id"], achievement))
+        
+        # Course completion is matched by id rather than crossed
+        self.course_rules = {}
+        for requirement, _, achievement in triggers.pop("course_completion"):
+            self.course_rules.setdefault(requirement, []).append(achievement)
+        
+        self.thresholds = {}
+        for condition_type, entries in triggers.items():
+            entries.sort(key=lambda entry: entry[:2])
+            self.thresholds[condition_type] = ([entry[0] for entry in entries], [entry[2] for entry in entries])
+        
+        # !achievements pages after the overview: (category, definitions) chunks in id order
+        self.list_pages = []
+        for category in CATEGORIES:
+            entries = sorted((a for a in achievements.values() if a["type"] == category), key=lambda a: a["id"])
+            for start in range(0, len(entries), ACHIEVEMENTS_PER_PAGE):
+                self.list_pages.append((category, entries[start:start + ACHIEVEMENTS_PER_PAGE]))
+    
+    def crossed(self, condition_type: str, before: int, after: int) -> list:
+        """Achievements with a condition before < requirement <= after (O(log k) to locate)"""
+        requirements, entries = self.thresholds[condition_type]
+        return entries[bisect_right(requirements, before):bisect_right(requirements, after)]
+    
+    def qualifies(self, achievement: dict, stats: dict) -> bool:
+        """Evaluate an achievement against a user's stats (manual ones never qualify)"""
+        conditions = _conditions(achievement)
+        if not conditions:
+            return False
+        results = (CONDITION_CHECKS[condition_type](stats, requirement) for condition_type, requirement in conditions)
+        return any(results) if "any" in achievement else all(results)
+    
+    def count_by_category(self, mask: int) -> dict:
+        """Earned achievements per category: {type: (earned, available)}"""
+        return {category: (bin(mask & bits).count("1"), bin(bits).count("1"))
+                for category, bits in self.category_masks.items()}
+
+def load_achievement_rules(path: str = ACHIEVEMENTS_FILE, previous: dict = None) -> AchievementRules:
+    """Read, validate and compile the definitions file; raises ValueError listing problems"""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read {path}: {e}")
+    
+    achievements = data.get("achievements") if isinstance(data, dict) else None
+    errors = validate_achievements(achievements, previous)
+    if errors:
+        raise ValueError("Invalid achievements:\n" + "\n".join(f"• {error}" for error in errors))
+    return AchievementRules(achievements, mtime_ns)
+
+class AchievementPageCache:
+    """Rendered !achievements page fields per user, keyed by the user's achievement version
+    
+    The version is the earned mask plus the rules file stamp, so any award or
+    rules reload makes older pages unreachable. Pages are rendered the first
+    time they are viewed.
+    """
+    
+    def __init__(self, maxsize: int = 512):
+        self.users = LRUCache(maxsize)
+    
+    def get(self, user_id: int, version: tuple, page: int, build) -> list:
+        """Copy of the cached fields for one page, building them on a miss"""
+        entry = self.users.get(user_id)
+        if entry is None or entry["version"] != version:
+            entry = {"version": version, "pages": {}}
+            self.users.put(user_id, entry)
+        
+        fields = entry["pages"].get(page)
+        if fields is None:
+            fields = entry["pages"][page] = build()
+        return [dict(field) for field in fields]
+    
+    def invalidate(self, user_id: int = None):
+        """Drop one user's pages (or everyone's)"""
+        if user_id is None:
+            self.users.clear()
+        else:
+            self.users.pop(user_id)
+
+# Deltas reported by the code that changed a user's stats; the engine only
+# evaluates achievements whose thresholds lie in the crossed interval
+class XPChanged(NamedTuple):
+    before: int
+    after: int
+
+class LessonCompleted(NamedTuple):
+    completed_lessons: int  # total after this completion
+    course_id: int
+    course_lessons_completed: int
+
+class PerfectQuizRecorded(NamedTuple):
+    perfect_quizzes: int  # total after this quiz
+
+class StreakExtended(NamedTuple):
+    streak: int  # current streak after the first activity of a day
 
 class AchievementManager:
     def __init__(self):
         self.db = db
+        self.rules = load_achievement_rules()
+        self.pages = AchievementPageCache()
+    
+    @property
+    def achievements(self) -> dict:
+        """Current achievement definitions by key"""
+        return self.rules.achievements
     
-    def check_and_award_achievements(self, user_id: int, achievement_type: str = None):
-        """Check if user has earned any new achievements"""
-        awarded_achievements = []
+    def reload_rules(self, force: bool = False) -> dict:
+        """Reload the definitions file if it changed; a broken file keeps the current rules"""
+        try:
+            mtime_ns = os.stat(ACHIEVEMENTS_FILE).st_mtime_ns
+        except OSError as e:
+            return {"reloaded": False, "count": len(self.achievements), "errors": [str(e)]}
         
-        # Get user stats
-        user_stats = self.db.get_user_stats(user_id)
-        if not user_stats:
-            return awarded_achievements
+        if not force and mtime_ns == self.rules.mtime_ns:
+            return {"reloaded": False, "count": len(self.achievements), "errors": []}
         
-        username, xp, level, current_course, current_module, current_lesson = user_stats
+        try:
+            rules = load_achievement_rules(previous=self.achievements)
+        except ValueError as e:
+            problems = [line[2:] for line in str(e).splitlines()[1:]]
+            return {"reloaded": False, "count": len(self.achievements), "errors": problems or [str(e)]}
         
-        # Get user's existing achievements
-        existing_achievements = [ach[0] for ach in self.db.get_user_achievements(user_id)]
+        self.rules = rules
+        return {"reloaded": True, "count": len(rules.achievements), "errors": []}
+    
+    def apply_deltas(self, user_id: int, deltas: list) -> list:
+        """Award achievements unlocked by the given deltas
         
-        # Check each achievement
-        for achievement_id, achievement in ACHIEVEMENTS.items():
-            if achievement["name"] in existing_achievements:
-                continue  # User already has this achievement
-            
-            # Skip if checking specific type and this doesn't match
-            if achievement_type and achievement["type"] != achievement_type:
-                continue
-            
-            earned = False
+        Only thresholds crossed by a delta are checked, so the common case
+        (nothing crossed) needs no queries; "all" rules read the user's
+        stats once one of their thresholds is crossed. Bonus XP from an
+        award is fed back in as another XPChanged delta.
+        """
+        rules = self.rules
+        awarded = []
+        pending = list(deltas)
+        while pending:
+            delta = pending.pop(0)
             
-            # Check XP milestones
-            if achievement["type"] == "xp_milestone":
-                if xp >= achievement["requirement"]:
-                    earned = True
+            if isinstance(delta, XPChanged):
+                candidates = rules.crossed("xp_milestone", delta.before, delta.after)
+            elif isinstance(delta, LessonCompleted):
+                candidates = rules.crossed("lesson_completion", delta.completed_lessons - 1, delta.completed_lessons)
+                if delta.course_id in rules.course_rules and _course_completed(
+                        {"courses": {delta.course_id: delta.course_lessons_completed}}, delta.course_id):
+                    candidates = candidates + rules.course_rules[delta.course_id]
+            elif isinstance(delta, PerfectQuizRecorded):
+                candidates = rules.crossed("perfect_quiz", delta.perfect_quizzes - 1, delta.perfect_quizzes)
+            elif isinstance(delta, StreakExtended):
+                candidates = rules.crossed("daily_streak", delta.streak - 1, delta.streak)
+            else:
+                raise TypeError(f"Unknown achievement delta: {delta!r}")
             
-            # Check lesson completion count
-            elif achievement["type"] == "lesson_completion":
-                completed_lessons = self._count_completed_lessons(user_id)
-                if completed_lessons >= achievement["requirement"]:
-                    earned = True
-            
-            # Check course completion
-            elif achievement["type"] == "course_completion":
-                if self._is_course_completed(user_id, achievement["requirement"]):
-                    earned = True
-            
-            # Check perfect quiz scores
-            elif achievement["type"] == "perfect_quiz":
-                perfect_quizzes = self._count_perfect_quizzes(user_id)
-                if perfect_quizzes >= achievement["requirement"]:
-                    earned = True
-            
-            # Award achievement if earned
-            if earned:
-                success = self.db.add_achievement(user_id, achievement["name"], achievement["type"])
-                if success:
-                    # Award bonus XP
-                    self.db.add_xp(user_id, achievement["xp_bonus"])
-                    awarded_achievements.append(achievement)
-        
-        return awarded_achievements
-    
-    def _count_completed_lessons(self, user_id: int) -> int:
-        """Count total completed lessons for user"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+            for achievement in candidates:
+                if "all" in achievement and len(achievement["all"]) > 1:
+                    stats = self.db.get_achievement_stats(user_id).get(user_id)
+                    if not stats or not rules.qualifies(achievement, stats):
+                        continue
+                if self.db.add_achievement(user_id, achievement["name"], achievement["type"], achievement_bit(achievement)):
+                    new_xp = self.db.add_xp(user_id, achievement["xp_bonus"])
+                    awarded.append(achievement)
+                    pending.append(XPChanged(new_xp - achievement["xp_bonus"], new_xp))
         
-        try:
-            cursor.execute("""
-                SELECT COUNT(*) FROM course_progress 
-                WHERE user_id = ? AND completed = TRUE
-            """, (user_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 0
-        except Exception as e:
-            print(f"Error counting completed lessons: {e}")
-            return 0
-        finally:
-            conn.close()
+        if awarded:
+            self.pages.invalidate(user_id)
+        return awarded
     
-    def _is_course_completed(self, user_id: int, course_id: int) -> bool:
-        """Check if user has completed all lessons in a course"""
-        from courses import get_course
+    def backfill_achievements(self, keys: list = None) -> dict:
+        """Award achievements to every user who already qualifies for them
         
-        course = get_course(course_id)
-        if not course:
-            return False
+        Meant for newly added or changed definitions (`keys`, default all).
+        Reads stats with a few set-based queries and writes all awards and
+        bonus XP in one transaction; bonus XP can cascade into XP milestones.
+        """
+        rules = self.rules
+        selected = [rules.achievements[key] for key in keys] if keys else list(rules.achievements.values())
+        selected = [a for a in selected if _conditions(a)]
         
-        # Count total lessons in course
-        total_lessons = 0
-        for module in course["modules"].values():
-            total_lessons += len(module["lessons"])
+        # Bonus XP from a keyed backfill can cross XP milestones the live engine
+        # would never revisit, so those rules always join the cascade
+        xp_rules = [a for a in rules.achievements.values() if a not in selected
+                    and any(condition_type == "xp_milestone" for condition_type, _ in _conditions(a))]
         
-        # Count completed lessons in course
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT COUNT(*) FROM course_progress 
-                WHERE user_id = ? AND course_id = ? AND completed = TRUE
-            """, (user_id, course_id))
-            result = cursor.fetchone()
-            completed_lessons = result[0] if result else 0
+        awards = []
+        for user_id, stats in self.db.get_achievement_stats().items():
+            mask = stats["mask"]
+            earned = []
             
-            return completed_lessons >= total_lessons
-        except Exception as e:
-            print(f"Error checking course completion: {e}")
-            return False
-        finally:
-            conn.close()
-    
-    def _count_perfect_quizzes(self, user_id: int) -> int:
-        """Count quizzes where user scored 100%"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+            unlocked = True
+            while unlocked:
+                unlocked = False
+                for achievement in selected + (xp_rules if earned else []):
+                    if not mask & achievement_bit(achievement) and rules.qualifies(achievement, stats):
+                        earned.append(achievement)
+                        mask |= achievement_bit(achievement)
+                        stats["xp"] += achievement["xp_bonus"]
+                        unlocked = True
+            
+            if earned:
+                awards.append((user_id, [(a["name"], a["type"], achievement_bit(a), a["xp_bonus"]) for a in earned]))
         
-        try:
-            cursor.execute("""
-                SELECT COUNT(*) FROM quiz_attempts 
-                WHERE user_id = ? AND score = total_questions
-            """, (user_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 0
-        except Exception as e:
-            print(f"Error counting perfect quizzes: {e}")
-            return 0
-        finally:
-            conn.close()
+        if not awards:
+            return {"users": 0, "achievements": 0}
+        applied = self.db.apply_achievement_awards(awards)
+        if applied is None:
+            return {"users": 0, "achievements": 0, "error": "Could not write the awards"}
+        self.pages.invalidate()
+        return {"users": len(applied), "achievements": sum(applied.values())}
     
-    def get_user_achievement_summary(self, user_id: int) -> dict:
-        """Get comprehensive achievement summary for user"""
-        achievements = self.db.get_user_achievements(user_id)
-        user_stats = self.db.get_user_stats(user_id)
+    def find_achievement(self, name: str):
+        """Definition by key (e.g. community_helper) or display name, or None"""
+        return self.achievements.get(name) or self.rules.by_name.get(name)
+    
+    def get_user_achievement_summary(self, user_id: int, snapshot: dict = None) -> dict:
+        """Get comprehensive achievement summary for user (from db.get_progress_snapshot)"""
+        snapshot = snapshot or self.db.get_progress_snapshot(user_id)
         
-        if not user_stats:
+        if not snapshot or snapshot["username"] is None:
             return {"error": "User not found"}
         
-        username, xp, level, current_course, current_module, current_lesson = user_stats
+        achievements = snapshot["achievements"]
         
         # Categorize achievements
         categorized = {
@@ -298,23 +371,22 @@ class AchievementManager:
         }
         
         for achievement_name, achievement_type, date_awarded in achievements:
+            if achievement_type not in categorized:
+                continue  # e.g. level_up rows
             categorized[achievement_type].append({
                 "name": achievement_name,
                 "date": date_awarded
             })
         
-        # Calculate progress stats
-        completed_lessons = self._count_completed_lessons(user_id)
-        perfect_quizzes = self._count_perfect_quizzes(user_id)
-        
         return {
-            "username": username,
-            "xp": xp,
-            "level": level,
+            "username": snapshot["username"],
+            "xp": snapshot["xp"],
+            "level": snapshot["level"],
             "total_achievements": len(achievements),
-            "completed_lessons": completed_lessons,
-            "perfect_quizzes": perfect_quizzes,
-            "achievements_by_category": categorized
+            "completed_lessons": snapshot["completed_lessons"],
+            "perfect_quizzes": snapshot["quiz"]["perfect"],
+            "achievements_by_category": categorized,
+            "category_counts": self.rules.count_by_category(snapshot["mask"])
         }
     
     def create_achievement_embed(self, achievement: dict, user_mention: str) -> discord.Embed:
@@ -342,9 +414,50 @@ class AchievementManager:
         
         return embed
     
-    def create_achievements_list_embed(self, user_id: int) -> discord.Embed:
-        """Create embed showing all user achievements"""
-        summary = self.get_user_achievement_summary(user_id)
+    def page_count(self) -> int:
+        """Pages in the !achievements list: an overview plus the category pages"""
+        return 1 + len(self.rules.list_pages)
+    
+    def _overview_fields(self, mask: int) -> list:
+        """Earned badges grouped by category (page 0)"""
+        counts = self.rules.count_by_category(mask)
+        fields = []
+        for category in CATEGORIES:
+            earned = [a["name"] for a in sorted(self.achievements.values(), key=lambda a: a["id"])
+                      if a["type"] == category and mask & achievement_bit(a)]
+            if earned:
+                earned_count, available = counts[category]
+                fields.append({
+                    "name": f"{CATEGORY_NAMES[category]} ({earned_count}/{available})",
+                    "value": "\n".join(f"• {name}" for name in earned)[:1024],
+                    "inline": False
+                })
+        
+        if not fields:
+            fields.append({
+                "name": "No achievements yet",
+                "value": "Complete lessons and quizzes to start earning achievements!",
+                "inline": False
+            })
+        return fields
+    
+    def _category_fields(self, mask: int, page: int) -> list:
+        """Earned and locked badges of one category page"""
+        category, entries = self.rules.list_pages[page - 1]
+        fields = []
+        for achievement in entries:
+            earned = mask & achievement_bit(achievement)
+            fields.append({
+                "name": f"{'✅' if earned else '🔒'} {achievement['name']}",
+                "value": f"{achievement['description']}\n+{achievement['xp_bonus']} Bonus XP",
+                "inline": False
+            })
+        return fields
+    
+    def create_achievements_list_embed(self, user_id: int, snapshot: dict = None, page: int = 0) -> discord.Embed:
+        """Create one page of the user's achievement list (page 0 is the overview)"""
+        snapshot = snapshot or self.db.get_progress_snapshot(user_id)
+        summary = self.get_user_achievement_summary(user_id, snapshot)
         
         if "error" in summary:
             embed = discord.Embed(
@@ -354,45 +467,53 @@ class AchievementManager:
             )
             return embed
         
+        mask = snapshot["mask"]
+        page = max(0, min(page, self.page_count() - 1))
+        
+        title = f"🏆 {summary['username']}'s Achievements"
+        if page:
+            category, _ = self.rules.list_pages[page - 1]
+            earned, available = summary["category_counts"][category]
+            title += f" • {CATEGORY_NAMES[category]} ({earned}/{available})"
+        
         embed = discord.Embed(
-            title=f"🏆 {summary['username']}'s Achievements",
+            title=title,
             description=f"**Level {summary['level']}** • **{summary['xp']:,} XP** • **{summary['total_achievements']} Achievements**",
             color=0x00FF00
         )
         
-        # Add achievement categories
-        category_names = {
-            "xp_milestone": "⭐ XP Milestones",
-            "lesson_completion": "📚 Learning Progress", 
-            "course_completion": "🎓 Course Completions",
-            "perfect_quiz": "🎯 Quiz Mastery",
-            "daily_streak": "🔥 Dedication",
-            "special": "🌟 Special"
-        }
-        
-        for category, achievements in summary["achievements_by_category"].items():
-            if achievements:
-                achievement_list = "\n".join([f"• {ach['name']}" for ach in achievements])
-                embed.add_field(
-                    name=category_names[category],
-                    value=achievement_list,
-                    inline=False
-                )
+        # Badge fields only change when the user earns something (or the rules are reloaded)
+        version = (mask, self.rules.mtime_ns)
+        build = (lambda: self._overview_fields(mask)) if page == 0 else (lambda: self._category_fields(mask, page))
+        for field in self.pages.get(user_id, version, page, build):
+            embed.add_field(**field)
         
-        if summary["total_achievements"] == 0:
+        if page == 0:
             embed.add_field(
-                name="No achievements yet",
-                value="Complete lessons and quizzes to start earning achievements!",
+                name="📊 Progress Stats",
+                value=f"• Lessons Completed: {summary['completed_lessons']}\n• Perfect Quiz Scores: {summary['perfect_quizzes']}",
                 inline=False
             )
         
-        embed.add_field(
-            name="📊 Progress Stats",
-            value=f"• Lessons Completed: {summary['completed_lessons']}\n• Perfect Quiz Scores: {summary['perfect_quizzes']}",
-            inline=False
-        )
+        if self.page_count() > 1:
+            embed.set_footer(text=f"Page {page + 1}/{self.page_count()}")
         
         return embed
 
 # Global achievement manager instance
 achievement_manager = AchievementManager()
+
+if __name__ == "__main__":
+    # Offline backfill: python achievements.py [achievement_key ...]
+    import sys
+    
+    unknown = [key for key in sys.argv[1:] if key not in achievement_manager.achievements]
+    if unknown:
+        print(f"❌ Unknown achievements: {', '.join(unknown)}")
+        sys.exit(1)
+    
+    result = achievement_manager.backfill_achievements(sys.argv[1:] or None)
+    if "error" in result:
+        print(f"❌ {result['error']}")
+        sys.exit(1)
+    print(f"✅ Awarded {result['achievements']} achievements to {result['users']} users")
@@ -0,0 +1,52 @@
+"""
+Daily Activity Tracking for Cybersecurity Learning Bot
+Each user's active days are one bitmap (bit n = n days after ACTIVITY_EPOCH),
+so streaks and recent activity are computed with bit operations
+"""
+
+from datetime import date, datetime
+
+ACTIVITY_EPOCH = date(2024, 1, 1)
+
+def day_number(day: date = None) -> int:
+    """Bit index of a (UTC) day"""
+    day = day or datetime.utcnow().date()
+    return (day - ACTIVITY_EPOCH).days
+
+def bits_from_blob(blob) -> int:
+    return int.from_bytes(blob, "little") if blob else 0
+
+def blob_from_bits(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+def current_streak(bits: int, today: int = None) -> int:
+    """Consecutive active days ending today (or yesterday, until today is over)"""
+    today = day_number() if today is None else today
+    end = today if bits >> today & 1 else today - 1
+    if end < 0 or not bits >> end & 1:
+        return 0
+    
+    # The highest inactive day at or before `end` bounds the streak
+    window = (1 << (end + 1)) - 1
+    inactive = ~bits & window
+    return end + 1 - inactive.bit_length()
+
+def longest_streak(bits: int) -> int:
+    """Longest run of consecutive active days (one AND per day of the run)"""
+    length = 0
+    while bits:
+        bits &= bits << 1
+        length += 1
+    return length
+
+def active_days(bits: int, days: int = 30, today: int = None) -> int:
+    """Number of active days among the last `days` days, today included"""
+    today = day_number() if today is None else today
+    start = today - days + 1
+    window = bits >> start if start >= 0 else bits << -start
+    return bin(window & ((1 << days) - 1)).count("1")
+
+def recent_days(bits: int, days: int = 14, today: int = None) -> list:
+    """Active flags for the last `days` days, oldest first"""
+    today = day_number() if today is None else today
+    return [day >= 0 and bool(bits >> day & 1) for day in range(today - days + 1, today + 1)]
@@ -7,9 +7,18 @@ import discord
 from discord.ext import commands
 from discord.ui import Modal, TextInput, View, Button
 import json
+import io
+import asyncio
 from database import db
-from achievements import achievement_manager
-from courses import COURSES
+from achievements import achievement_manager, achievement_bit, XPChanged
+from loop_monitor import loop_watchdog
+from profiler import stack_sampler
+from memory import memory_tracker, format_bytes
+from content_watcher import content_watcher
+from courses import add_authored_course, add_authored_module, add_authored_lesson, get_course, get_module, get_catalog
+from content_compiler import validate_lesson
+from search import lesson_search
+from metrics import InstrumentedView, registry, command_calls, command_latency, view_calls, view_latency
 
 # Admin user IDs - replace with actual admin Discord IDs
 ADMIN_IDS = [
@@ -17,6 +26,9 @@ ADMIN_IDS = [
     # Add more admin IDs as needed
 ]
 
+# Bonus XP for ad-hoc special achievements (defined ones pay their own xp_bonus)
+SPECIAL_ACHIEVEMENT_XP = 300
+
 def is_admin(user_id: int) -> bool:
     """Check if user is an admin"""
     return user_id in ADMIN_IDS
@@ -49,8 +61,19 @@ class AddCourseModal(Modal):
         self.add_item(self.course_level)
     
     async def on_submit(self, interaction: discord.Interaction):
-        # This would typically save to a database or file
-        # For now, we'll just show a confirmation
+        level = self.course_level.value.strip().title()
+        if level not in ("Beginner", "Intermediate", "Advanced"):
+            await interaction.response.send_message("❌ Level must be Beginner, Intermediate, or Advanced.", ephemeral=True)
+            return
+        
+        # Save to the content store and make it live immediately
+        course_id = add_authored_course(
+            self.course_title.value.strip(), self.course_description.value.strip(), level, interaction.user.id
+        )
+        if course_id is None:
+            await interaction.response.send_message("❌ Could not save the course. Please try again.", ephemeral=True)
+            return
+        
         embed = discord.Embed(
             title="✅ Course Added Successfully",
             description=f"**{self.course_title.value}** has been added to the course catalog.",
@@ -58,11 +81,135 @@ class AddCourseModal(Modal):
         )
         
         embed.add_field(name="Description", value=self.course_description.value, inline=False)
-        embed.add_field(name="Level", value=self.course_level.value, inline=True)
+        embed.add_field(name="Level", value=level, inline=True)
+        embed.add_field(name="Course ID", value=str(course_id), inline=True)
+        embed.set_footer(text="Use the Add Module button to give this course some modules.")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+class AddModuleModal(Modal):
+    def __init__(self):
+        super().__init__(title="Add New Module")
+        
+        self.course_id = TextInput(
+            label="Course ID",
+            placeholder="e.g., 5",
+            max_length=6
+        )
+        
+        self.module_title = TextInput(
+            label="Module Title",
+            placeholder="e.g., Intrusion Detection",
+            max_length=100
+        )
+        
+        self.add_item(self.course_id)
+        self.add_item(self.module_title)
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            course_id = int(self.course_id.value)
+        except ValueError:
+            await interaction.response.send_message("❌ Course ID must be a number.", ephemeral=True)
+            return
+        
+        course = get_course(course_id)
+        if not course:
+            await interaction.response.send_message(f"❌ Course {course_id} does not exist.", ephemeral=True)
+            return
+        
+        module_id = add_authored_module(course_id, self.module_title.value.strip(), interaction.user.id)
+        if module_id is None:
+            await interaction.response.send_message("❌ Could not save the module. Please try again.", ephemeral=True)
+            return
+        
+        embed = discord.Embed(
+            title="✅ Module Added Successfully",
+            description=f"**{self.module_title.value}** has been added to **{course['title']}**.",
+            color=0x00FF00
+        )
+        embed.add_field(name="Location", value=f"Course {course_id} • Module {module_id}", inline=True)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+class AddLessonModal(Modal):
+    def __init__(self):
+        super().__init__(title="Add New Lesson")
+        
+        self.location = TextInput(
+            label="Course and Module ID",
+            placeholder="e.g., 5 1",
+            max_length=13
+        )
+        
+        self.lesson_title = TextInput(
+            label="Lesson Title",
+            placeholder="e.g., Reading Firewall Logs",
+            max_length=100
+        )
+        
+        self.lesson_content = TextInput(
+            label="Lesson Content",
+            placeholder="Markdown lesson text",
+            style=discord.TextStyle.paragraph,
+            max_length=4000
+        )
+        
+        self.xp_reward = TextInput(
+            label="XP Reward",
+            placeholder="100",
+            required=False,
+            max_length=5
+        )
+        
+        self.add_item(self.location)
+        self.add_item(self.lesson_title)
+        self.add_item(self.lesson_content)
+        self.add_item(self.xp_reward)
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            course_id, module_id = [int(part) for part in self.location.value.split()]
+            xp_reward = int(self.xp_reward.value or 100)
+        except ValueError:
+            await interaction.response.send_message("❌ Use numbers like `5 1` for the location and XP reward.", ephemeral=True)
+            return
+        
+        if not get_module(course_id, module_id):
+            await interaction.response.send_message(f"❌ Module {course_id}/{module_id} does not exist.", ephemeral=True)
+            return
+        
+        lesson = {
+            "title": self.lesson_title.value.strip(),
+            "content": self.lesson_content.value,
+            "xp_reward": xp_reward
+        }
+        
+        errors = []
+        validate_lesson(lesson, "lesson", errors)
+        if errors or not 0 < xp_reward <= 1000:
+            await interaction.response.send_message("❌ Lessons need a title, content and an XP reward between 1 and 1,000.", ephemeral=True)
+            return
+        
+        lesson_id = add_authored_lesson(course_id, module_id, lesson, interaction.user.id)
+        if lesson_id is None:
+            await interaction.response.send_message("❌ Could not save the lesson. Please try again.", ephemeral=True)
+            return
+        
+        # Make the new lesson searchable (incremental, only this lesson is indexed)
+        await asyncio.to_thread(lesson_search.sync, get_catalog())
+        
+        embed = discord.Embed(
+            title="✅ Lesson Added Successfully",
+            description=f"**{lesson['title']}** is live now.",
+            color=0x00FF00
+        )
+        embed.add_field(name="Open It", value=f"`!lesson {course_id} {module_id} {lesson_id}`", inline=True)
+        embed.add_field(name="XP Reward", value=f"{xp_reward} XP", inline=True)
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
-class AdminView(View):
+class AdminView(InstrumentedView):
     def __init__(self):
         super().__init__(timeout=300)
     
@@ -149,6 +296,22 @@ class AdminView(View):
         modal = AddCourseModal()
         await interaction.response.send_modal(modal)
     
+    @discord.ui.button(label="📦 Add Module", style=discord.ButtonStyle.success)
+    async def add_module(self, interaction: discord.Interaction, button: Button):
+        if not is_admin(interaction.user.id):
+            await interaction.response.send_message("❌ Admin access required.", ephemeral=True)
+            return
+        
+        await interaction.response.send_modal(AddModuleModal())
+    
+    @discord.ui.button(label="📝 Add Lesson", style=discord.ButtonStyle.success)
+    async def add_lesson(self, interaction: discord.Interaction, button: Button):
+        if not is_admin(interaction.user.id):
+            await interaction.response.send_message("❌ Admin access required.", ephemeral=True)
+            return
+        
+        await interaction.response.send_modal(AddLessonModal())
+    
     @discord.ui.button(label="🏆 Award Achievement", style=discord.ButtonStyle.secondary)
     async def award_achievement(self, interaction: discord.Interaction, button: Button):
         if not is_admin(interaction.user.id):
@@ -205,12 +368,21 @@ class AdminCommands(commands.Cog):
         # Add user to database if not exists
         self.db.add_user(user.id, user.display_name)
         
-        # Award achievement
-        success = self.db.add_achievement(user.id, achievement_name, "special")
+        # Award achievement (defined ones by key or name also set their mask bit)
+        definition = achievement_manager.find_achievement(achievement_name)
+        if definition:
+            achievement_name = definition["name"]
+            xp_bonus = definition["xp_bonus"]
+            success = self.db.add_achievement(user.id, achievement_name, definition["type"], achievement_bit(definition))
+        else:
+            xp_bonus = SPECIAL_ACHIEVEMENT_XP
+            success = self.db.add_achievement(user.id, achievement_name, "special")
         
         if success:
-            # Award bonus XP
-            self.db.add_xp(user.id, 300)
+            # Award bonus XP (milestones it crosses are awarded too)
+            new_xp = self.db.add_xp(user.id, xp_bonus)
+            achievement_manager.pages.invalidate(user.id)
+            new_achievements = achievement_manager.apply_deltas(user.id, [XPChanged(new_xp - xp_bonus, new_xp)])
             
             embed = discord.Embed(
                 title="🏆 Achievement Awarded!",
@@ -218,7 +390,13 @@ class AdminCommands(commands.Cog):
                 color=0xFFD700
             )
             
-            embed.add_field(name="Bonus XP", value="+300 XP", inline=True)
+            embed.add_field(name="Bonus XP", value=f"+{xp_bonus} XP", inline=True)
+            if new_achievements:
+                embed.add_field(
+                    name="🎉 Milestones Unlocked",
+                    value="\n".join([f"🏆 {ach['name']}" for ach in new_achievements]),
+                    inline=False
+                )
             
             await ctx.send(embed=embed)
             
@@ -229,7 +407,7 @@ class AdminCommands(commands.Cog):
                     description=f"You've been awarded: **{achievement_name}**",
                     color=0xFFD700
                 )
-                dm_embed.add_field(name="Bonus XP", value="+300 XP", inline=True)
+                dm_embed.add_field(name="Bonus XP", value=f"+{xp_bonus} XP", inline=True)
                 dm_embed.set_footer(text="Awarded by an administrator")
                 
                 await user.send(embed=dm_embed)
@@ -265,8 +443,8 @@ class AdminCommands(commands.Cog):
         
         await ctx.send(embed=embed)
         
-        # Check for new achievements
-        new_achievements = achievement_manager.check_and_award_achievements(user.id)
+        # Check for XP milestones crossed by the award
+        new_achievements = achievement_manager.apply_deltas(user.id, [XPChanged(new_xp - amount, new_xp)])
         if new_achievements:
             achievement_text = "\n".join([f"🏆 {ach['name']}" for ach in new_achievements])
             follow_up = discord.Embed(
@@ -291,7 +469,7 @@ class AdminCommands(commands.Cog):
         )
         
         # Add confirmation buttons
-        view = View(timeout=30)
+        view = InstrumentedView(timeout=30)
         
         async def confirm_reset(interaction):
             if interaction.user.id != ctx.author.id:
@@ -303,11 +481,14 @@ class AdminCommands(commands.Cog):
             
             try:
                 # Reset user data
-                cursor.execute("UPDATE users SET xp = 0, level = 1, current_course = 1, current_module = 1, current_lesson = 1 WHERE user_id = ?", (user.id,))
+                cursor.execute("UPDATE users SET xp = 0, level = 1, current_course = 1, current_module = 1, current_lesson = 1, achievement_mask = 0, activity_days = NULL WHERE user_id = ?", (user.id,))
                 cursor.execute("DELETE FROM achievements WHERE user_id = ?", (user.id,))
                 cursor.execute("DELETE FROM course_progress WHERE user_id = ?", (user.id,))
                 cursor.execute("DELETE FROM quiz_attempts WHERE user_id = ?", (user.id,))
+                cursor.execute("DELETE FROM quiz_answers WHERE session_id IN (SELECT session_id FROM quiz_sessions WHERE user_id = ?)", (user.id,))
+                cursor.execute("DELETE FROM quiz_sessions WHERE user_id = ?", (user.id,))
                 conn.commit()
+                achievement_manager.pages.invalidate(user.id)
                 
                 reset_embed = discord.Embed(
                     title="✅ User Reset Complete",
@@ -409,6 +590,237 @@ class AdminCommands(commands.Cog):
         finally:
             conn.close()
 
+    @commands.command(name="admin_lag")
+    async def loop_lag(self, ctx):
+        """Show event loop lag percentiles and recent blocking handlers"""
+        if not is_admin(ctx.author.id):
+            await ctx.send("❌ Admin access required.")
+            return
+        
+        lag = loop_watchdog.get_lag_percentiles()
+        
+        embed = discord.Embed(
+            title="🐕 Event Loop Lag",
+            description=f"Watchdog {'running' if loop_watchdog.running else 'stopped'} • {lag['samples']} samples",
+            color=0x0099FF
+        )
+        
+        embed.add_field(
+            name="⏱️ Percentiles",
+            value=f"• **p50:** {lag['p50']} ms\n• **p90:** {lag['p90']} ms\n• **p99:** {lag['p99']} ms\n• **Max:** {lag['max']} ms",
+            inline=True
+        )
+        
+        embed.add_field(
+            name="⚠️ Stalls",
+            value=f"• **Total:** {loop_watchdog.stall_count}\n• **Threshold:** {loop_watchdog.threshold * 1000:.0f} ms",
+            inline=True
+        )
+        
+        if loop_watchdog.blocking_events:
+            events_text = "\n".join([f"• `{event['handler']}` - {event['stalled_ms']} ms"
+                                     for event in list(loop_watchdog.blocking_events)[-5:]])
+            embed.add_field(name="🧱 Recent Blocking Handlers", value=events_text, inline=False)
+        
+        await ctx.send(embed=embed)
+
+    @commands.command(name="admin_metrics")
+    async def metrics_summary(self, ctx):
+        """Summarise command and view latency metrics"""
+        if not is_admin(ctx.author.id):
+            await ctx.send("❌ Admin access required.")
+            return
+        
+        embed = discord.Embed(
+            title="📈 Bot Metrics",
+            description="Latency and throughput since startup (full data at `/metrics`)",
+            color=0x0099FF
+        )
+        
+        for title, calls, latency in [("⌨️ Commands", command_calls, command_latency),
+                                      ("🖱️ View Callbacks", view_calls, view_latency)]:
+            rows = []
+            for (name,), series in sorted(latency.values.items(), key=lambda item: -item[1]["count"])[:8]:
+                errors = calls.get(name, "error")
+                avg_ms = series["sum"] / series["count"] * 1000
+                p95_ms = latency.quantile(0.95, name) * 1000
+                rows.append(f"• `{name}` {series['count']}x • avg {avg_ms:.0f} ms • p95 ≤{p95_ms:.0f} ms"
+                            + (f" • {errors:.0f} errors" if errors else ""))
+            embed.add_field(name=title, value="\n".join(rows) or "No calls yet", inline=False)
+        
+        gauges = []
+        for name, metric in sorted(registry.metrics.items()):
+            if metric.kind == "gauge":
+                for key, value in sorted(metric.collect().items()):
+                    label = f"{{{','.join(map(str, key))}}}" if key else ""
+                    gauges.append(f"• `{name}{label}`: {value:,.2f}" if isinstance(value, float) else f"• `{name}{label}`: {value:,}")
+        
+        if gauges:
+            embed.add_field(name="📊 Gauges", value="\n".join(gauges)[:1024], inline=False)
+        
+        await ctx.send(embed=embed)
+
+    @commands.command(name="admin_profile")
+    async def profile_bot(self, ctx, seconds: int = 10):
+        """Sample the bot's stacks for a few seconds and return a flamegraph file"""
+        if not is_admin(ctx.author.id):
+            await ctx.send("❌ Admin access required.")
+            return
+        
+        if seconds < 1 or seconds > 120:
+            await ctx.send("❌ Profile window must be between 1 and 120 seconds.")
+            return
+        
+        if stack_sampler.busy:
+            await ctx.send("❌ A profile is already running. Try again when it finishes.")
+            return
+        
+        await ctx.send(f"🔬 Profiling for {seconds} seconds...")
+        
+        # Sample from a worker thread so the event loop keeps running normally
+        completed = await asyncio.to_thread(stack_sampler.run, seconds)
+        if not completed:
+            await ctx.send("❌ A profile is already running. Try again when it finishes.")
+            return
+        
+        embed = discord.Embed(
+            title="🔬 Profile Complete",
+            description=f"{stack_sampler.samples} samples over {stack_sampler.duration:.1f}s ({stack_sampler.idle_samples} idle thread samples skipped)",
+            color=0x0099FF
+        )
+        
+        top_text = "\n".join([f"• `{name}` - {own} self / {total} total"
+                              for name, own, total in stack_sampler.top_functions(10)])
+        embed.add_field(name="🔥 Top Functions", value=top_text[:1024] or "No samples", inline=False)
+        embed.set_footer(text="Open the attached file with speedscope or flamegraph.pl")
+        
+        profile_file = discord.File(io.BytesIO(stack_sampler.collapsed().encode()),
+                                    filename=f"profile_{seconds}s.collapsed")
+        await ctx.send(embed=embed, file=profile_file)
+    
+    @commands.command(name="admin_memory")
+    async def memory_report(self, ctx, action: str = "snapshot"):
+        """Report live views and memory per subsystem (start/stop/snapshot)"""
+        if not is_admin(ctx.author.id):
+            await ctx.send("❌ Admin access required.")
+            return
+        
+        action = action.lower()
+        if action == "start":
+            memory_tracker.start()
+            await ctx.send("🧠 Memory tracing started. Use `!admin_memory` to take snapshots.")
+            return
+        elif action == "stop":
+            memory_tracker.stop()
+            await ctx.send("🧠 Memory tracing stopped.")
+            return
+        elif action != "snapshot":
+            await ctx.send("❌ Use `!admin_memory [start|stop|snapshot]`.")
+            return
+        
+        embed = discord.Embed(
+            title="🧠 Memory Report",
+            color=0x0099FF
+        )
+        
+        view_counts = memory_tracker.view_counts()
+        views_text = "\n".join([f"• **{name}:** {total} alive ({active} listening)"
+                                for name, (total, active) in view_counts.items()])
+        embed.add_field(name="🪟 Live Views", value=views_text or "No live views", inline=False)
+        
+        if not memory_tracker.tracing:
+            embed.description = "Allocation tracing is off. Use `!admin_memory start` to enable it."
+            await ctx.send(embed=embed)
+            return
+        
+        # Snapshots walk every traced allocation, so keep them off the event loop
+        report = await asyncio.to_thread(memory_tracker.take_snapshot)
+        if "error" in report:
+            # Tracing can be stopped while the snapshot waits for a thread
+            embed.description = f"❌ {report['error']}"
+            await ctx.send(embed=embed)
+            return
+        
+        embed.description = f"**Traced:** {format_bytes(report['current'])} • **Peak:** {format_bytes(report['peak'])}"
+        
+        subsystems_text = "\n".join([f"• `{name}`: {format_bytes(size)}" for name, size in report["subsystems"][:10]])
+        embed.add_field(name="📦 By Subsystem", value=subsystems_text or "No data", inline=True)
+        
+        if report["growth"]:
+            growth_text = "\n".join([f"• `{where}`: {'+' if diff > 0 else ''}{format_bytes(diff)}"
+                                     for where, diff, _ in report["growth"]])
+            embed.add_field(name="📈 Since Last Snapshot", value=growth_text[:1024], inline=True)
+        
+        if len(report["history"]) > 1:
+            history_text = "\n".join([f"• {when:%H:%M:%S} - {format_bytes(size)}" for when, size in report["history"][-8:]])
+            embed.add_field(name="🕒 History", value=history_text, inline=False)
+        
+        await ctx.send(embed=embed)
+    
+    @commands.command(name="admin_reload")
+    async def reload_content(self, ctx):
+        """Reload course content and achievement rules from disk without restarting"""
+        if not is_admin(ctx.author.id):
+            await ctx.send("❌ Admin access required.")
+            return
+        
+        result = await content_watcher.reload(force=True)
+        
+        if result["errors"]:
+            embed = discord.Embed(
+                title="❌ Reload Failed",
+                description="The current content is still in use. Fix these problems and try again:",
+                color=0xFF0000
+            )
+            embed.add_field(name="Problems", value="\n".join(f"• {error}" for error in result["errors"][:10])[:1024], inline=False)
+            await ctx.send(embed=embed)
+            return
+        
+        embed = discord.Embed(
+            title="🔁 Content Reloaded",
+            description=f"Course catalog is now at version **{result['version']}**.",
+            color=0x00FF00
+        )
+        
+        changed_text = "\n".join(f"• `{path}`" for path in result["changed"][:15])
+        embed.add_field(name="Changed Files", value=changed_text or "No file changes", inline=False)
+        
+        rules = result["achievements"]
+        if rules["errors"]:
+            rules_text = "❌ Kept the current rules:\n" + "\n".join(f"• {error}" for error in rules["errors"][:10])
+        else:
+            rules_text = f"{rules['count']} achievements loaded"
+        embed.add_field(name="🏆 Achievement Rules", value=rules_text[:1024], inline=False)
+        
+        await ctx.send(embed=embed)
+    
+    @commands.command(name="admin_backfill")
+    async def backfill_achievements(self, ctx, *keys: str):
+        """Award new or changed achievements to every user who already qualifies"""
+        if not is_admin(ctx.author.id):
+            await ctx.send("❌ Admin access required.")
+            return
+        
+        unknown = [key for key in keys if key not in achievement_manager.achievements]
+        if unknown:
+            await ctx.send(f"❌ Unknown achievements: {', '.join(unknown)}")
+            return
+        
+        result = await asyncio.to_thread(achievement_manager.backfill_achievements, list(keys) or None)
+        
+        if "error" in result:
+            await ctx.send(f"❌ Backfill failed: {result['error']}")
+            return
+        
+        embed = discord.Embed(
+            title="🏆 Achievement Backfill Complete",
+            description=f"Awarded **{result['achievements']}** achievements to **{result['users']}** users.",
+            color=0x00FF00
+        )
+        embed.add_field(name="Checked", value=", ".join(f"`{key}`" for key in keys) or "All achievements", inline=False)
+        
+        await ctx.send(embed=embed)
+    
 def setup(bot):
     """Setup function for the cog"""
     bot.add_cog(AdminCommands(bot))
@@ -3,6 +3,8 @@ Enhanced Cybersecurity Learning Discord Bot
 Interactive, gamified cybersecurity education platform
 """
 
+# Imported first so the startup timeline covers every other import
+from startup import timeline, sync_command_tree
 import discord
 from discord.ext import commands
 from discord.ui import Button, View
@@ -12,10 +14,17 @@ from datetime import datetime
 
 # Import our custom modules
 from database import db
-from courses import get_course, get_lesson, get_next_lesson, get_course_list
-from achievements import achievement_manager
-from quiz import quiz_manager
+from courses import get_course, get_lesson, get_next_lesson, get_course_list, get_course_progress, get_catalog, get_course_lesson_count
+from achievements import achievement_manager, XPChanged, LessonCompleted, StreakExtended
+from quiz import quiz_manager, quiz_sessions, QuizOptionButton, ModuleQuizButton
 from admin import AdminCommands
+from loop_monitor import loop_watchdog
+from metrics import InstrumentedView, instrument_bot, register_bot_gauges, metrics_server
+from content_watcher import content_watcher
+from search import lesson_search
+from embed_cache import embed_cache
+from notifications import notification_dispatcher
+from activity import current_streak, longest_streak, active_days, recent_days
 
 # Bot configuration
 PREFIX = "!"
@@ -24,11 +33,46 @@ GUILD_ID = 1394809146036977795  # Replace with your server ID
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix=PREFIX, intents=intents)
+class AcademyBot(commands.Bot):
+    tree_synced = False
+    
+    async def setup_hook(self):
+        """Runs once after login, before connecting to the gateway"""
+        timeline.mark("login")
+        
+        # Create the database schema here instead of at import time
+        db.init_database()
+        timeline.mark("db_init")
+        
+        # Load the catalog and hash its lessons for the content version off the event loop
+        await asyncio.to_thread(get_catalog)
+        timeline.mark("catalog")
+        
+        # Add admin commands
+        await self.add_cog(AdminCommands(self))
+        
+        # Quiz buttons are routed by custom_id, so they keep working after a restart
+        self.add_dynamic_items(QuizOptionButton, ModuleQuizButton)
+
+    async def close(self):
+        """Save buffered state before disconnecting"""
+        quiz_sessions.close()
+        await notification_dispatcher.close()
+        await super().close()
+
+bot = AcademyBot(command_prefix=PREFIX, intents=intents)
 
-class LessonView(View):
+# Command latency and throughput metrics
+instrument_bot(bot)
+register_bot_gauges(bot)
+
+timeline.mark("import")
+
+class LessonView(InstrumentedView):
     def __init__(self, user_id: int, course_id: int, module_id: int, lesson_id: int):
         super().__init__(timeout=300)
+        # Complete the lesson as it was shown, even if content is reloaded meanwhile
+        self.catalog = get_catalog()
         self.user_id = user_id
         self.course_id = course_id
         self.module_id = module_id
@@ -44,9 +88,13 @@ class LessonView(View):
             return
         
         # Get lesson data
-        lesson = get_lesson(self.course_id, self.module_id, self.lesson_id)
+        lesson = self.catalog.get_lesson(self.course_id, self.module_id, self.lesson_id)
         if not lesson:
-            await interaction.response.send_message("❌ Lesson not found.", ephemeral=True)
+            # Also the case when the lesson was edited after this message was sent
+            await interaction.response.send_message(
+                "❌ Lesson not found or updated since it was shown. Open it again with `!lesson`.",
+                ephemeral=True
+            )
             return
         
         # Add user to database if not exists
@@ -57,10 +105,17 @@ class LessonView(View):
         new_xp = db.add_xp(interaction.user.id, xp_reward)
         
         # Update progress
-        db.update_progress(interaction.user.id, self.course_id, self.module_id, self.lesson_id)
+        completed = db.update_progress(interaction.user.id, self.course_id, self.module_id, self.lesson_id,
+                                       self.catalog.version)
         
-        # Check for achievements
-        new_achievements = achievement_manager.check_and_award_achievements(interaction.user.id)
+        # Check only the achievements this lesson can have unlocked
+        deltas = [XPChanged(new_xp - xp_reward, new_xp)]
+        if completed:
+            deltas.append(LessonCompleted(completed[0], self.course_id, completed[1]))
+        streak = db.record_activity(interaction.user.id)
+        if streak:
+            deltas.append(StreakExtended(streak))
+        new_achievements = achievement_manager.apply_deltas(interaction.user.id, deltas)
         
         # Create completion embed
         embed = discord.Embed(
@@ -102,22 +157,8 @@ class LessonView(View):
         
         await interaction.response.edit_message(embed=embed, view=self)
         
-        # Send DM with achievement notifications
-        if new_achievements:
-            try:
-                dm_embed = discord.Embed(
-                    title="🏆 Achievement Unlocked!",
-                    color=0xFFD700
-                )
-                for achievement in new_achievements:
-                    dm_embed.add_field(
-                        name=achievement["name"],
-                        value=f"{achievement['description']}\n+{achievement['xp_bonus']} Bonus XP",
-                        inline=False
-                    )
-                await interaction.user.send(embed=dm_embed)
-            except:
-                pass  # User might have DMs disabled
+        # DM the achievements from the background queue instead of the click path
+        notification_dispatcher.notify_achievements(interaction.user, new_achievements)
     
     @discord.ui.button(label="❓ Take Quiz", style=discord.ButtonStyle.primary)
     async def take_quiz(self, interaction: discord.Interaction, button: Button):
@@ -144,20 +185,107 @@ class LessonView(View):
         
         # Start the quiz
         await quiz_manager.start_lesson_quiz(
-            interaction.followup, self.course_id, self.module_id, self.lesson_id
+            interaction.followup, self.course_id, self.module_id, self.lesson_id, interaction.user.id
         )
 
+class AchievementPagesView(InstrumentedView):
+    """Previous/next buttons for the !achievements pages (rendered on demand)"""
+    
+    def __init__(self, user_id: int, target_id: int, snapshot: dict):
+        super().__init__(timeout=180)
+        self.user_id = user_id
+        self.target_id = target_id
+        self.snapshot = snapshot
+        self.page = 0
+        self._update_buttons()
+    
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= achievement_manager.page_count() - 1
+    
+    async def _show(self, interaction: discord.Interaction, page: int):
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message(
+                "❌ Use `!achievements` to browse your own copy.",
+                ephemeral=True
+            )
+            return
+        
+        self.page = max(0, min(page, achievement_manager.page_count() - 1))
+        self._update_buttons()
+        embed = achievement_manager.create_achievements_list_embed(self.target_id, self.snapshot, self.page)
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(label="◀️ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: Button):
+        await self._show(interaction, self.page - 1)
+    
+    @discord.ui.button(label="Next ▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: Button):
+        await self._show(interaction, self.page + 1)
+
 @bot.event
 async def on_ready():
     print(f"✅ {bot.user} is online and ready to teach cybersecurity!")
     print(f"📚 Loaded courses: {len(get_course_list())}")
     
-    # Sync slash commands (optional)
-    try:
-        synced = await bot.tree.sync()
-        print(f"🔄 Synced {len(synced)} slash commands")
-    except Exception as e:
-        print(f"❌ Failed to sync commands: {e}")
+    # Watch for handlers that block the event loop
+    loop_watchdog.start()
+    
+    # Serve Prometheus metrics locally
+    await metrics_server.start()
+    
+    # Hot-reload course content when files change
+    content_watcher.start()
+    
+    # Deliver achievement DMs in the background
+    notification_dispatcher.start()
+    
+    # Batch quiz session writes and sweep expired sessions
+    quiz_sessions.start()
+    
+    # Index any lessons that changed since the last run
+    await asyncio.to_thread(lesson_search.sync, get_catalog())
+    
+    # Sync slash commands once per process, and only if they changed
+    if not bot.tree_synced:
+        try:
+            await sync_command_tree(bot, force=os.getenv("FORCE_COMMAND_SYNC") == "1")
+            bot.tree_synced = True
+        except Exception as e:
+            print(f"❌ Failed to sync commands: {e}")
+    
+    if "ready" not in timeline.elapsed():
+        timeline.mark("ready")
+        timeline.log()
+
+@bot.event
+async def on_command_completion(ctx):
+    if "first_response" not in timeline.elapsed():
+        timeline.mark("first_response")
+        timeline.log()
+
+def build_start_embed(lesson: dict, course_id: int, module_id: int, lesson_id: int) -> discord.Embed:
+    """Static part of the !start embed (progress and greeting are added per user)"""
+    embed = discord.Embed(
+        title="🚀 Welcome to Cyber Academy!",
+        color=0x0099FF
+    )
+    
+    embed.add_field(
+        name="📚 Next Lesson",
+        value=f"**{lesson['title']}**\nCourse {course_id} • Module {module_id} • Lesson {lesson_id}",
+        inline=False
+    )
+    
+    embed.add_field(
+        name="🎯 Quick Commands",
+        value="• `!lesson` - View current lesson\n• `!courses` - Browse all courses\n• `!progress` - Check your progress\n• `!leaderboard` - See top learners",
+        inline=False
+    )
+    
+    embed.set_footer(text="Click the button below to start your next lesson!")
+    return embed
 
 @bot.command(name="start")
 async def start_journey(ctx):
@@ -187,35 +315,19 @@ async def start_journey(ctx):
         await ctx.send(embed=embed)
         return
     
-    # Create welcome embed
-    embed = discord.Embed(
-        title="🚀 Welcome to Cyber Academy!",
-        description=f"Ready to continue your cybersecurity journey, **{ctx.author.display_name}**?",
-        color=0x0099FF
-    )
-    
-    embed.add_field(
+    # Create welcome embed from the cached lesson part, then add the per-user parts
+    embed = embed_cache.get(("start", current_course, current_module, current_lesson),
+                            lambda: build_start_embed(lesson, current_course, current_module, current_lesson))
+    embed.description = f"Ready to continue your cybersecurity journey, **{ctx.author.display_name}**?"
+    embed.insert_field_at(
+        0,
         name="📊 Your Progress",
         value=f"• **Level:** {level}\n• **XP:** {xp:,}\n• **Current Course:** {course['title']}",
         inline=False
     )
     
-    embed.add_field(
-        name="📚 Next Lesson",
-        value=f"**{lesson['title']}**\nCourse {current_course} • Module {current_module} • Lesson {current_lesson}",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="🎯 Quick Commands",
-        value="• `!lesson` - View current lesson\n• `!courses` - Browse all courses\n• `!progress` - Check your progress\n• `!leaderboard` - See top learners",
-        inline=False
-    )
-    
-    embed.set_footer(text="Click the button below to start your next lesson!")
-    
     # Create start button
-    view = View(timeout=300)
+    view = InstrumentedView(timeout=300)
     
     async def start_lesson(interaction):
         if interaction.user.id != ctx.author.id:
@@ -239,35 +351,8 @@ async def start_journey(ctx):
     
     await ctx.send(embed=embed, view=view)
 
-@bot.command(name="lesson")
-async def show_lesson(ctx, course_id: int = None, module_id: int = None, lesson_id: int = None):
-    """📖 View a specific lesson or your current lesson"""
-    
-    # Add user to database
-    db.add_user(ctx.author.id, ctx.author.display_name)
-    
-    # If no parameters provided, show current lesson
-    if not all([course_id, module_id, lesson_id]):
-        user_stats = db.get_user_stats(ctx.author.id)
-        if user_stats:
-            _, _, _, course_id, module_id, lesson_id = user_stats
-        else:
-            course_id, module_id, lesson_id = 1, 1, 1
-    
-    # Get lesson and course data
-    lesson = get_lesson(course_id, module_id, lesson_id)
-    course = get_course(course_id)
-    
-    if not lesson:
-        embed = discord.Embed(
-            title="❌ Lesson Not Found",
-            description="Could not find the specified lesson.",
-            color=0xFF0000
-        )
-        await ctx.send(embed=embed)
-        return
-    
-    # Create lesson embed
+def build_lesson_embed(lesson: dict, course: dict, course_id: int, module_id: int, lesson_id: int) -> discord.Embed:
+    """Build the embed for a lesson"""
     embed = discord.Embed(
         title=f"📖 {lesson['title']}",
         description=lesson['content'],
@@ -296,16 +381,47 @@ async def show_lesson(ctx, course_id: int = None, module_id: int = None, lesson_
         )
     
     embed.set_footer(text="Complete the lesson to earn XP and unlock achievements!")
+    return embed
+
+@bot.command(name="lesson")
+async def show_lesson(ctx, course_id: int = None, module_id: int = None, lesson_id: int = None):
+    """📖 View a specific lesson or your current lesson"""
+    
+    # Add user to database
+    db.add_user(ctx.author.id, ctx.author.display_name)
+    
+    # If no parameters provided, show current lesson
+    if not all([course_id, module_id, lesson_id]):
+        user_stats = db.get_user_stats(ctx.author.id)
+        if user_stats:
+            _, _, _, course_id, module_id, lesson_id = user_stats
+        else:
+            course_id, module_id, lesson_id = 1, 1, 1
+    
+    # Get lesson and course data
+    lesson = get_lesson(course_id, module_id, lesson_id)
+    course = get_course(course_id)
+    
+    if not lesson:
+        embed = discord.Embed(
+            title="❌ Lesson Not Found",
+            description="Could not find the specified lesson.",
+            color=0xFF0000
+        )
+        await ctx.send(embed=embed)
+        return
+    
+    # Lesson embeds are the same for everyone, so build each one once per content version
+    embed = embed_cache.get(("lesson", course_id, module_id, lesson_id),
+                            lambda: build_lesson_embed(lesson, course, course_id, module_id, lesson_id))
     
     # Create lesson view with buttons
     view = LessonView(ctx.author.id, course_id, module_id, lesson_id)
     
     await ctx.send(embed=embed, view=view)
 
-@bot.command(name="courses")
-async def list_courses(ctx):
-    """📚 Browse all available courses"""
-    
+def build_course_list_embed() -> discord.Embed:
+    """Build the course catalog embed"""
     courses = get_course_list()
     
     embed = discord.Embed(
@@ -322,6 +438,41 @@ async def list_courses(ctx):
         )
     
     embed.set_footer(text="More courses coming soon!")
+    return embed
+
+@bot.command(name="courses")
+async def list_courses(ctx):
+    """📚 Browse all available courses"""
+    
+    await ctx.send(embed=embed_cache.get(("courses",), build_course_list_embed))
+
+@bot.command(name="search")
+async def search_lessons(ctx, *, terms: str):
+    """🔎 Search lessons by keyword"""
+    
+    results = await asyncio.to_thread(lesson_search.search, terms)
+    
+    if not results:
+        embed = discord.Embed(
+            title="🔎 No Lessons Found",
+            description=f"Nothing matched **{terms[:100]}**. Try different keywords!",
+            color=0xFF0000
+        )
+        await ctx.send(embed=embed)
+        return
+    
+    embed = discord.Embed(
+        title="🔎 Search Results",
+        description=f"Lessons matching **{terms[:100]}**:",
+        color=0x0099FF
+    )
+    
+    for course_id, module_id, lesson_id, title, snippet in results:
+        embed.add_field(
+            name=f"📖 {title}",
+            value=f"{' '.join(snippet.split())[:900]}\nUse `!lesson {course_id} {module_id} {lesson_id}` to open it",
+            inline=False
+        )
     
     await ctx.send(embed=embed)
 
@@ -331,11 +482,9 @@ async def show_progress(ctx, user: discord.Member = None):
     
     target_user = user or ctx.author
     
-    # Add user to database
-    db.add_user(target_user.id, target_user.display_name)
-    
-    user_stats = db.get_user_stats(target_user.id)
-    if not user_stats:
+    # Add user to database and read everything shown below in one round trip
+    snapshot = db.get_progress_snapshot(target_user.id, target_user.display_name)
+    if not snapshot or snapshot["username"] is None:
         embed = discord.Embed(
             title="❌ No Progress Found",
             description="Start learning with `!start` to track your progress!",
@@ -344,10 +493,18 @@ async def show_progress(ctx, user: discord.Member = None):
         await ctx.send(embed=embed)
         return
     
-    username, xp, level, current_course, current_module, current_lesson = user_stats
+    username, xp, level = snapshot["username"], snapshot["xp"], snapshot["level"]
+    current_course, current_module, current_lesson = snapshot["position"]
+    lessons_done, course_lessons = get_course_progress(current_course, current_module, current_lesson)
+    # Past the end of the catalog the position stays on the last lesson (older rows may
+    # point one past it); count a finished course as complete rather than 0 or N-1
+    if not get_next_lesson(current_course, current_module, current_lesson) \
+            and snapshot["courses"].get(current_course, 0) >= course_lessons:
+        lessons_done = course_lessons
+    course_percentage = (lessons_done / course_lessons * 100) if course_lessons else 0
     
     # Get achievement summary
-    achievement_summary = achievement_manager.get_user_achievement_summary(target_user.id)
+    achievement_summary = achievement_manager.get_user_achievement_summary(target_user.id, snapshot)
     
     embed = discord.Embed(
         title=f"📊 {username}'s Progress",
@@ -362,7 +519,7 @@ async def show_progress(ctx, user: discord.Member = None):
     
     embed.add_field(
         name="📚 Learning Progress",
-        value=f"• **Current Course:** {current_course}\n• **Current Module:** {current_module}\n• **Current Lesson:** {current_lesson}",
+        value=f"• **Current Course:** {current_course}\n• **Current Module:** {current_module}\n• **Current Lesson:** {current_lesson}\n• **Course Progress:** {lessons_done}/{course_lessons} ({course_percentage:.0f}%)",
         inline=True
     )
     
@@ -372,6 +529,17 @@ async def show_progress(ctx, user: discord.Member = None):
         inline=True
     )
     
+    # Completion of every course the user has started
+    course_lines = []
+    for course_id, completed in sorted(snapshot["courses"].items()):
+        course = get_course(course_id)
+        total = get_course_lesson_count(course_id)
+        if course and total:
+            completed = min(completed, total)
+            course_lines.append(f"• **{course['title']}:** {completed}/{total} ({completed / total * 100:.0f}%)")
+    if course_lines:
+        embed.add_field(name="🎓 Courses", value="\n".join(course_lines)[:1024], inline=False)
+    
     # XP to next level
     xp_to_next = ((level * 1000) - xp)
     if xp_to_next > 0:
@@ -421,7 +589,7 @@ async def show_leaderboard(ctx):
     
     await ctx.send(embed=embed)
 
-@bot.command(name="quiz")
+@bot.group(name="quiz", invoke_without_command=True)
 async def start_quiz(ctx, course_id: int = None, module_id: int = None, lesson_id: int = None):
     """🎯 Take a quiz for a lesson or module"""
     
@@ -446,17 +614,27 @@ async def start_quiz(ctx, course_id: int = None, module_id: int = None, lesson_i
             )
             await ctx.send(embed=embed)
 
+@start_quiz.command(name="resume")
+async def resume_quiz(ctx):
+    """🔄 Continue your unfinished module quiz"""
+    
+    await quiz_manager.resume_module_quiz(ctx)
+
 @bot.command(name="achievements", aliases=["ach", "badges"])
 async def show_achievements(ctx, user: discord.Member = None):
     """🏆 View your achievements and badges"""
     
     target_user = user or ctx.author
     
-    # Add user to database
-    db.add_user(target_user.id, target_user.display_name)
+    # Add user to database and read their achievements in one round trip
+    snapshot = db.get_progress_snapshot(target_user.id, target_user.display_name)
     
-    embed = achievement_manager.create_achievements_list_embed(target_user.id)
-    await ctx.send(embed=embed)
+    embed = achievement_manager.create_achievements_list_embed(target_user.id, snapshot)
+    if not snapshot or snapshot["username"] is None or achievement_manager.page_count() == 1:
+        await ctx.send(embed=embed)
+        return
+    
+    await ctx.send(embed=embed, view=AchievementPagesView(ctx.author.id, target_user.id, snapshot))
 
 @bot.command(name="stats")
 async def quiz_stats(ctx, user: discord.Member = None):
@@ -465,10 +643,42 @@ async def quiz_stats(ctx, user: discord.Member = None):
     target_user = user or ctx.author
     await quiz_manager.get_quiz_stats(ctx, target_user.id)
 
-@bot.command(name="help_cyber", aliases=["help_academy"])
-async def help_command(ctx):
-    """❓ Get help with bot commands"""
+@bot.command(name="streak")
+async def show_streak(ctx, user: discord.Member = None):
+    """🔥 View your daily learning streak"""
+    
+    target_user = user or ctx.author
+    bits = db.get_activity(target_user.id)
+    
+    if not bits:
+        embed = discord.Embed(
+            title="🔥 Daily Streak",
+            description=f"**{target_user.display_name}** hasn't been active yet. Complete a lesson or quiz to start a streak!",
+            color=0x0099FF
+        )
+        await ctx.send(embed=embed)
+        return
+    
+    streak = current_streak(bits)
+    embed = discord.Embed(
+        title=f"🔥 {target_user.display_name}'s Daily Streak",
+        description=f"**{streak} day{'s' if streak != 1 else ''}** in a row" if streak else "No active streak. Learn something today to start one!",
+        color=0xFF6600 if streak else 0x0099FF
+    )
     
+    embed.add_field(name="🏆 Longest Streak", value=f"{longest_streak(bits)} days", inline=True)
+    embed.add_field(name="📅 Last 30 Days", value=f"{active_days(bits, 30)}/30 days active", inline=True)
+    embed.add_field(
+        name="🗓️ Last 2 Weeks",
+        value="".join("🟩" if active else "⬛" for active in recent_days(bits, 14)),
+        inline=False
+    )
+    
+    embed.set_footer(text="Complete a lesson or quiz each day to keep your streak going!")
+    await ctx.send(embed=embed)
+
+def build_help_embed() -> discord.Embed:
+    """Build the help embed"""
     embed = discord.Embed(
         title="🤖 Cyber Academy Bot Help",
         description="Your interactive cybersecurity learning companion!",
@@ -483,13 +693,13 @@ async def help_command(ctx):
     
     embed.add_field(
         name="📚 Learning Commands",
-        value="`!lesson [course] [module] [lesson]` - View specific lesson\n`!quiz` - Take a quiz\n`!quiz [course] [module]` - Take module quiz",
+        value="`!lesson [course] [module] [lesson]` - View specific lesson\n`!search [keywords]` - Find lessons by topic\n`!quiz` - Take a quiz\n`!quiz [course] [module]` - Take module quiz\n`!quiz resume` - Continue an unfinished module quiz",
         inline=False
     )
     
     embed.add_field(
         name="📊 Progress Tracking",
-        value="`!progress` - Check your progress\n`!achievements` - View your badges\n`!stats` - Quiz statistics\n`!leaderboard` - Top learners",
+        value="`!progress` - Check your progress\n`!achievements` - View your badges\n`!stats` - Quiz statistics\n`!streak` - Daily learning streak\n`!leaderboard` - Top learners",
         inline=False
     )
     
@@ -500,11 +710,13 @@ async def help_command(ctx):
     )
     
     embed.set_footer(text="Need more help? Ask in the community channels!")
-    
-    await ctx.send(embed=embed)
+    return embed
 
-# Add admin commands
-bot.add_cog(AdminCommands(bot))
+@bot.command(name="help_cyber", aliases=["help_academy"])
+async def help_command(ctx):
+    """❓ Get help with bot commands"""
+    
+    await ctx.send(embed=embed_cache.get(("help",), build_help_embed))
 
 # Error handling
 @bot.event
@@ -0,0 +1,157 @@
+"""
+Course Content Compiler for Cybersecurity Learning Bot
+Validates the content/ tree and writes a compact bundle that courses.py
+memory-maps at startup
+
+Bundle layout:
+    MAGIC (8 bytes) | header length (uint32 LE) | header JSON | lesson data
+The header is the manifest with each lesson's "file" replaced by the
+"offset"/"length" of its compact JSON inside the lesson data section and
+the sha1 "digest" of those bytes (used for the catalog version).
+
+Usage: python content_compiler.py [content_dir] [output_file]
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+
+BUNDLE_MAGIC = b"CYBNDL01"
+BUNDLE_FILE = "catalog.bundle"
+MANIFEST_FILE = "manifest.json"
+
+def _validate_id(value, where: str, errors: list):
+    try:
+        if int(value) < 1:
+            raise ValueError
+    except (TypeError, ValueError):
+        errors.append(f"{where}: id {value!r} must be a positive integer")
+
+def _require(entry: dict, fields: dict, where: str, errors: list):
+    """Check required fields exist and have the expected types"""
+    for field, expected in fields.items():
+        if field not in entry:
+            errors.append(f"{where}: missing '{field}'")
+        elif not isinstance(entry[field], expected):
+            errors.append(f"{where}: '{field}' must be {getattr(expected, '__name__', expected)}")
+
+def validate_quiz(quiz: dict, where: str, errors: list):
+    """Check a quiz has a question, 2+ options and a valid correct index"""
+    _require(quiz, {"question": str, "options": list, "correct": int, "explanation": str}, where, errors)
+    options = quiz.get("options")
+    correct = quiz.get("correct")
+    if isinstance(options, list) and len(options) < 2:
+        errors.append(f"{where}: needs at least 2 options")
+    if isinstance(options, list) and isinstance(correct, int) and not 0 <= correct < len(options):
+        errors.append(f"{where}: correct index {correct} is outside options 0-{len(options) - 1}")
+
+def validate_lesson(lesson: dict, where: str, errors: list):
+    """Check a full lesson record"""
+    _require(lesson, {"title": str, "content": str}, where, errors)
+    if "xp_reward" in lesson and not isinstance(lesson["xp_reward"], int):
+        errors.append(f"{where}: 'xp_reward' must be int")
+    if "practical_exercise" in lesson:
+        _require(lesson["practical_exercise"], {"title": str, "description": str}, f"{where} exercise", errors)
+    if "quiz" in lesson:
+        validate_quiz(lesson["quiz"], f"{where} quiz", errors)
+
+def load_source(content_dir: str):
+    """Read the manifest and every lesson file: (manifest, {lesson file: lesson}, errors)"""
+    errors = []
+    with open(os.path.join(content_dir, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    lessons = {}
+    for course_id, course in manifest.get("courses", {}).items():
+        for module_id, module in course.get("modules", {}).items():
+            for lesson_id, summary in module.get("lessons", {}).items():
+                where = f"lesson {course_id}/{module_id}/{lesson_id}"
+                path = summary.get("file")
+                if not path:
+                    errors.append(f"{where}: missing 'file'")
+                    continue
+                try:
+                    with open(os.path.join(content_dir, path), encoding="utf-8") as f:
+                        lessons[path] = json.load(f)
+                except (OSError, ValueError) as e:
+                    errors.append(f"{where}: cannot read {path}: {e}")
+
+    return manifest, lessons, errors
+
+def validate_catalog(manifest: dict, lessons: dict) -> list:
+    """Validate the whole course tree; returns a list of problems (empty if valid)"""
+    errors = []
+    courses = manifest.get("courses")
+    if not isinstance(courses, dict) or not courses:
+        return ["manifest: 'courses' must be a non-empty object"]
+
+    for course_id, course in courses.items():
+        where = f"course {course_id}"
+        _validate_id(course_id, where, errors)
+        _require(course, {"title": str, "description": str, "level": str, "modules": dict}, where, errors)
+
+        for module_id, module in course.get("modules", {}).items():
+            where = f"module {course_id}/{module_id}"
+            _validate_id(module_id, where, errors)
+            _require(module, {"title": str, "lessons": dict}, where, errors)
+            if not module.get("lessons"):
+                errors.append(f"{where}: has no lessons")
+
+            for lesson_id, summary in module.get("lessons", {}).items():
+                where = f"lesson {course_id}/{module_id}/{lesson_id}"
+                _validate_id(lesson_id, where, errors)
+                _require(summary, {"title": str}, f"{where} manifest entry", errors)
+
+                lesson = lessons.get(summary.get("file"))
+                if lesson is None:
+                    continue
+                validate_lesson(lesson, where, errors)
+                if lesson.get("title") != summary.get("title"):
+                    errors.append(f"{where}: manifest title does not match lesson file")
+
+    return errors
+
+def compile_bundle(content_dir: str, output: str = None) -> str:
+    """Validate content_dir and write the bundle; raises ValueError listing problems"""
+    output = output or os.path.join(content_dir, BUNDLE_FILE)
+    manifest, lessons, errors = load_source(content_dir)
+    errors += validate_catalog(manifest, lessons)
+    if errors:
+        raise ValueError("Invalid course content:\n" + "\n".join(f"• {error}" for error in errors))
+
+    data = bytearray()
+    header = json.loads(json.dumps(manifest))
+    for course in header["courses"].values():
+        for module in course["modules"].values():
+            for summary in module["lessons"].values():
+                blob = json.dumps(lessons[summary.pop("file")], ensure_ascii=False, separators=(",", ":")).encode()
+                summary["offset"] = len(data)
+                summary["length"] = len(blob)
+                summary["digest"] = hashlib.sha1(blob).hexdigest()
+                data += blob
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode()
+
+    # Write to a temporary file first so a running bot never maps a half-written bundle
+    temp_path = output + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(data)
+    os.replace(temp_path, output)
+    return output
+
+if __name__ == "__main__":
+    content_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "content")
+    output = sys.argv[2] if len(sys.argv) > 2 else None
+
+    try:
+        path = compile_bundle(content_dir, output)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"✅ Compiled course bundle: {path} ({os.path.getsize(path):,} bytes)")
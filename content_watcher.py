@@ -0,0 +1,68 @@
+"""
+Course Content Watcher for Cybersecurity Learning Bot
+Polls the content directory and achievement definitions and hot-reloads
+changes without a restart
+"""
+
+import asyncio
+import os
+from courses import reload_catalog
+from achievements import achievement_manager
+
+class ContentWatcher:
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.reloads = 0
+        self.last_result = None
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start polling (safe to call on every on_ready; interval 0 disables it)"""
+        if self.running or not self.interval:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        print(f"👀 Watching course content every {self.interval:.0f}s")
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def reload(self, force: bool = False) -> dict:
+        """Reload changed content on a worker thread and swap the catalog"""
+        async with self._lock:
+            result = await asyncio.to_thread(reload_catalog, force)
+            result["achievements"] = await asyncio.to_thread(achievement_manager.reload_rules, force)
+
+        previous = self.last_result or {"errors": [], "achievements": {"errors": []}}
+        self.last_result = result
+        if result["reloaded"]:
+            self.reloads += 1
+            print(f"🔁 Course content reloaded (version {result['version']}, {len(result['changed'])} files changed)")
+        if result["achievements"]["reloaded"]:
+            print(f"🏆 Achievement rules reloaded ({result['achievements']['count']} achievements)")
+        
+        # Polling retries broken content every interval; only log new problems
+        if result["errors"] != previous["errors"]:
+            for error in result["errors"]:
+                print(f"❌ Content error: {error}")
+        if result["achievements"]["errors"] != previous["achievements"]["errors"]:
+            for error in result["achievements"]["errors"]:
+                print(f"❌ Achievement rules error: {error}")
+        return result
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"Error reloading course content: {e}")
+
+# Global content watcher instance (CONTENT_WATCH_INTERVAL=0 disables polling)
+content_watcher = ContentWatcher(interval=float(os.getenv("CONTENT_WATCH_INTERVAL", "5")))
@@ -1,650 +1,788 @@
 """
-Cybersecurity Course Content - From Beginner to Intermediate
-Interactive, practical lessons with hands-on exercises
+Course Catalog Access for Cybersecurity Learning Bot
+Course structure comes from content/manifest.json; each lesson lives in its
+own JSON file, decoded on demand and kept in a small LRU cache. A snapshot
+built from files keeps the lessons it was built from compressed in memory,
+so an edited or broken file doesn't affect it until a reload publishes a new one.
+When an up-to-date compiled bundle exists (see content_compiler.py) it is
+memory-mapped instead and lessons are decoded from it on demand.
+With COURSE_COMPACT_CONTENT=on every lesson read is also kept compressed in
+memory, so only the small LRU holds decoded lessons.
 """
 
-COURSES = {
-    1: {
-        "title": "🛡️ Cybersecurity Fundamentals",
-        "description": "Learn the basics of cybersecurity and develop a security mindset",
-        "level": "Beginner",
-        "modules": {
-            1: {
-                "title": "Introduction to Cybersecurity",
-                "lessons": {
-                    1: {
-                        "title": "What is Cybersecurity?",
-                        "content": """
-🔐 **Welcome to Cybersecurity!**
-
-Cybersecurity is like being a digital bodyguard - protecting information, systems, and networks from digital attacks.
-
-**Think of it this way:**
-• Your phone = Your house
-• Your apps = Rooms in your house  
-• Cybersecurity = Locks, alarms, and security cameras
-
-**Real-world example:** 
-When you use online banking, cybersecurity protects your money from digital thieves trying to steal it through the internet.
-
-**Why does it matter?**
-• 🏦 Protects your money and identity
-• 📱 Keeps your personal photos and messages safe
-• 💼 Secures business data and operations
-• 🌐 Maintains trust in digital services
-
-**Your mission:** Complete this lesson to earn your first 100 XP!
-                        """,
-                        "xp_reward": 100,
-                        "practical_exercise": {
-                            "title": "Security Mindset Challenge",
-                            "description": "Look around your digital life and identify 3 things you want to protect",
-                            "example_answers": ["Bank account", "Social media", "Email", "Photos", "Work files"]
-                        }
-                    },
-                    2: {
-                        "title": "Common Cyber Threats",
-                        "content": """
-⚠️ **Know Your Digital Enemies**
-
-Just like in the real world, the digital world has different types of threats:
-
-**1. 🎣 Phishing (Digital Fishing)**
-• Fake emails/websites trying to steal your info
-• Example: "Your bank account is locked! Click here to unlock"
-• Reality: It's a trap to steal your login details
-
-**2. 🦠 Malware (Digital Viruses)**
-• Harmful software that damages your device
-• Types: Viruses, ransomware, spyware
-• Like getting your computer "sick"
-
-**3. 👤 Social Engineering (Digital Manipulation)**
-• Tricking people into giving away secrets
-• Example: Fake tech support calls
-• Uses psychology, not just technology
-
-**4. 🔓 Data Breaches (Digital Break-ins)**
-• When hackers break into company databases
-• Your personal info gets stolen in bulk
-• Like someone breaking into a filing cabinet
-
-**Real Example:** In 2017, Equifax was breached and 147 million people's personal data was stolen - including Social Security numbers!
-
-**Remember:** Knowing these threats is your first line of defense!
-                        """,
-                        "xp_reward": 150,
-                        "quiz": {
-                            "question": "Which threat involves tricking people psychologically rather than using technical methods?",
-                            "options": ["Malware", "Social Engineering", "Data Breach", "Phishing"],
-                            "correct": 1,
-                            "explanation": "Social Engineering uses psychological manipulation to trick people into revealing information or performing actions."
-                        }
-                    },
-                    3: {
-                        "title": "Building a Security Mindset",
-                        "content": """
-🧠 **Think Like a Security Expert**
-
-A security mindset means always thinking "What could go wrong?" and "How can I protect myself?"
-
-**The Security Mindset Principles:**
-
-**1. 🤔 Question Everything**
-• Is this email really from my bank?
-• Why is this app asking for my location?
-• Should I really click this link?
-
-**2. 🔒 Assume Breach**
-• What if someone gets my password?
-• How would I recover if my phone was stolen?
-• What's my backup plan?
-
-**3. 🎯 Think Like an Attacker**
-• How would someone try to trick me?
-• What information am I sharing publicly?
-• Where are my weak points?
-
-**Practical Exercise:**
-Look at your social media profiles. What could a cybercriminal learn about you?
-• Your birthday (for password guessing)
-• Your location (for targeted attacks)
-• Your friends/family (for social engineering)
-
-**Real-world Application:**
-Before posting "Going on vacation to Hawaii!" think: "Am I telling criminals my house will be empty?"
-
-**Your Challenge:** Practice the security mindset for one day. Question 3 things you normally wouldn't think twice about!
-                        """,
-                        "xp_reward": 200,
-                        "practical_exercise": {
-                            "title": "Security Mindset Practice",
-                            "description": "For the next 24 hours, question 3 digital activities you normally do without thinking",
-                            "examples": ["Why does this app need camera access?", "Is this WiFi network safe?", "Should I share this location?"]
-                        }
-                    }
-                }
-            }
-        }
-    },
-    2: {
-        "title": "🔐 Password Security Mastery",
-        "description": "Master the art of creating and managing secure passwords",
-        "level": "Beginner",
-        "modules": {
-            1: {
-                "title": "Password Fundamentals",
-                "lessons": {
-                    1: {
-                        "title": "Password Strength Secrets",
-                        "content": """
-💪 **What Makes a Password Strong?**
-
-Think of passwords like the locks on your house. A weak password is like a flimsy lock - easy to break!
-
-**The Password Strength Formula:**
-
-**Length > Complexity**
-• "ILovePizza123!" = Weak (predictable pattern)
-• "Coffee-Morning-Sunshine-2024" = Strong (long + unpredictable)
-
-**What Makes Passwords Weak:**
-• 🚫 Personal info (birthday, pet names)
-• 🚫 Dictionary words
-• 🚫 Common patterns (123456, qwerty)
-• 🚫 Short length (under 12 characters)
-
-**What Makes Passwords Strong:**
-• ✅ 12+ characters long
-• ✅ Mix of words, numbers, symbols
-• ✅ Unpredictable combinations
-• ✅ Unique for each account
-
-**The Passphrase Method:**
-Instead of "P@ssw0rd1" try "Purple-Elephant-Dancing-42"
-• Easier to remember
-• Harder to crack
-• More fun to create!
-
-**Real Example:**
-Bad: "Sarah1995!" (name + birth year)
-Good: "Midnight-Coffee-Tastes-Purple-77"
-
-**Your Mission:** Create a strong password using the passphrase method!
-                        """,
-                        "xp_reward": 150,
-                        "quiz": {
-                            "question": "Which password is stronger?",
-                            "options": ["P@ssw0rd123!", "Banana-Helicopter-Music-2024", "JohnSmith1990", "abc123"],
-                            "correct": 1,
-                            "explanation": "Long passphrases with random words are much stronger than short complex passwords with predictable patterns."
-                        }
-                    },
-                    2: {
-                        "title": "Password Managers: Your Digital Vault",
-                        "content": """
-🗝️ **Never Remember Another Password!**
-
-Password managers are like having a super-secure digital vault that remembers all your passwords for you.
-
-**How Password Managers Work:**
-1. You create ONE master password
-2. The manager generates unique, strong passwords for every site
-3. It automatically fills them in when you need them
-4. Everything is encrypted and secure
-
-**Popular Password Managers:**
-• **Bitwarden** (Free & Open Source)
-• **1Password** (Premium features)
-• **LastPass** (Freemium)
-• **Dashlane** (User-friendly)
-
-**Real-world Benefits:**
-• 🎯 Unique password for every account
-• 🚀 Faster login (auto-fill)
-• 🛡️ Protection against data breaches
-• 📱 Works across all your devices
-
-**The "Breach-Proof" Strategy:**
-When LinkedIn gets hacked and your password is stolen, it doesn't matter because:
-1. That password is unique to LinkedIn
-2. Your other accounts are still safe
-3. You can easily change just that one password
-
-**Practical Exercise:**
-Set up a password manager today and migrate your top 5 most important accounts (email, banking, social media).
-
-**Pro Tip:** Your master password should be a long, memorable passphrase that you'll never forget - like "My-Favorite-Coffee-Shop-Has-Purple-Chairs-2024"
-                        """,
-                        "xp_reward": 200,
-                        "practical_exercise": {
-                            "title": "Password Manager Setup",
-                            "description": "Install a password manager and secure your top 3 accounts with unique, strong passwords",
-                            "steps": ["Choose a password manager", "Create a strong master password", "Add your most important accounts"]
-                        }
-                    },
-                    3: {
-                        "title": "Two-Factor Authentication (2FA)",
-                        "content": """
-🔐 **Double Your Security Power!**
-
-2FA is like having two locks on your door instead of one. Even if someone steals your password, they still can't get in!
-
-**How 2FA Works:**
-1. **Something you know** (your password)
-2. **Something you have** (your phone/app)
-3. Both are required to log in
-
-**Types of 2FA:**
-
-**📱 Authenticator Apps (BEST)**
-• Google Authenticator, Authy, Microsoft Authenticator
-• Generates time-based codes
-• Works without internet
-
-**📧 Email Codes (OKAY)**
-• Code sent to your email
-• Better than nothing
-• Vulnerable if email is compromised
-
-**📞 SMS Codes (RISKY)**
-• Code sent via text message
-• Can be intercepted
-• Still better than no 2FA
-
-**🔑 Hardware Keys (ULTIMATE)**
-• Physical USB/NFC devices
-• Highest security level
-• Used by security professionals
-
-**Real-world Impact:**
-Google found that 2FA blocks 99.9% of automated attacks!
-
-**Where to Enable 2FA First:**
-1. 📧 Email accounts (Gmail, Outlook)
-2. 🏦 Banking and financial accounts
-3. 📱 Social media accounts
-4. 💼 Work accounts
-5. 🛒 Shopping accounts with saved payment info
-
-**Your Challenge:** Enable 2FA on your email account right now - it takes 2 minutes and dramatically improves your security!
-                        """,
-                        "xp_reward": 250,
-                        "quiz": {
-                            "question": "What percentage of automated attacks does 2FA block according to Google?",
-                            "options": ["50%", "75%", "90%", "99.9%"],
-                            "correct": 3,
-                            "explanation": "Google's research shows that 2FA blocks 99.9% of automated attacks, making it incredibly effective."
-                        }
-                    }
-                }
-            }
-        }
-    },
-    3: {
-        "title": "🎣 Phishing Defense Academy",
-        "description": "Learn to spot and avoid phishing attacks like a pro",
-        "level": "Beginner",
-        "modules": {
-            1: {
-                "title": "Phishing Detection Mastery",
-                "lessons": {
-                    1: {
-                        "title": "Anatomy of a Phishing Email",
-                        "content": """
-🕵️ **Become a Phishing Detective!**
-
-Phishing emails are like digital disguises - they pretend to be someone trustworthy to steal your information.
-
-**🚨 Red Flags to Watch For:**
-
-**1. Urgent Language**
-• "Your account will be closed in 24 hours!"
-• "Immediate action required!"
-• "Verify now or lose access!"
-
-**2. Generic Greetings**
-• "Dear Customer" instead of your actual name
-• "Dear Sir/Madam"
-• No personalization
-
-**3. Suspicious Sender**
-• amazon-security@gmail.com (not @amazon.com)
-• Misspelled company names
-• Random email addresses
-
-**4. Suspicious Links**
-• Hover over links to see the real destination
-• bit.ly/suspicious-link instead of official URLs
-• Misspelled domains (amazom.com instead of amazon.com)
-
-**5. Grammar and Spelling Errors**
-• Professional companies proofread their emails
-• Multiple typos = major red flag
-• Awkward phrasing
-
-**Real Phishing Example:**
-"Dear Valued Customer, Your PayPal account has been limited due to suspicious activity. Click here to verify: http://paypal-security.fake-site.com"
-
-**Red Flags Found:**
-• Generic greeting ❌
-• Urgent language ❌
-• Suspicious URL ❌
-• Creates fear ❌
-
-**Your Mission:** Practice identifying these red flags in every email you receive!
-                        """,
-                        "xp_reward": 175,
-                        "practical_exercise": {
-                            "title": "Phishing Email Analysis",
-                            "description": "Look at your recent emails and identify any that have phishing red flags",
-                            "red_flags": ["Urgent language", "Generic greetings", "Suspicious links", "Grammar errors", "Requests for personal info"]
-                        }
-                    },
-                    2: {
-                        "title": "Social Engineering Tactics",
-                        "content": """
-🎭 **The Psychology of Deception**
-
-Social engineering is like being a con artist - attackers use psychology to manipulate you into giving them what they want.
-
-**Common Social Engineering Tactics:**
-
-**1. 😨 Fear and Urgency**
-• "Your computer is infected! Call now!"
-• "Suspicious login detected!"
-• Creates panic to bypass logical thinking
-
-**2. 🎁 Too Good to Be True**
-• "You've won $1,000,000!"
-• "Free iPhone - just pay shipping!"
-• Exploits greed and excitement
-
-**3. 👔 Authority Impersonation**
-• "This is IT support, we need your password"
-• "IRS calling about unpaid taxes"
-• People naturally obey authority figures
-
-**4. 🤝 Trust and Familiarity**
-• "Hi, I'm calling from your bank..."
-• Using information from social media
-• Building fake relationships
-
-**5. 💔 Emotional Manipulation**
-• Fake charity appeals
-• Romance scams
-• Exploiting empathy and kindness
-
-**Real-world Example:**
-Scammer calls pretending to be your grandchild: "Grandma, I'm in jail and need bail money. Please don't tell my parents!"
-
-**Defense Strategy - The STOP Method:**
-• **S**top and think
-• **T**ake a breath
-• **O**bserve red flags
-• **P**roceed with caution (or not at all)
-
-**Your Challenge:** Next time someone asks for personal information (even if they seem legitimate), use the STOP method!
-                        """,
-                        "xp_reward": 200,
-                        "quiz": {
-                            "question": "What should you do when someone creates urgency to get you to act quickly?",
-                            "options": ["Act immediately to avoid problems", "Use the STOP method", "Give them what they want", "Ignore them completely"],
-                            "correct": 1,
-                            "explanation": "The STOP method helps you pause and think rationally when someone is trying to create urgency to manipulate you."
-                        }
-                    },
-                    3: {
-                        "title": "Safe Browsing Practices",
-                        "content": """
-🌐 **Navigate the Web Like a Security Pro**
-
-The internet is like a big city - there are safe neighborhoods and dangerous ones. Learn to stay in the safe areas!
-
-**🛡️ Safe Browsing Rules:**
-
-**1. Check the Lock (HTTPS)**
-• Look for 🔒 in the address bar
-• URL starts with "https://" not "http://"
-• Especially important for login pages and shopping
-
-**2. Verify Website URLs**
-• amazon.com ✅ vs amazom.com ❌
-• paypal.com ✅ vs paypaI.com ❌ (that's an "i" not "l")
-• When in doubt, type the URL manually
-
-**3. Be Suspicious of Pop-ups**
-• "Your computer is infected!" = Fake
-• "You've won a prize!" = Scam
-• Close pop-ups with the X button, never click inside them
-
-**4. Download Safely**
-• Only download from official websites
-• Avoid "free" versions of paid software
-• Scan downloads with antivirus
-
-**5. Use Reputable Browsers**
-• Chrome, Firefox, Safari, Edge
-• Keep them updated
-• Use ad blockers to reduce malicious ads
-
-**Browser Security Features:**
-• **Safe Browsing** - Warns about dangerous sites
-• **Pop-up Blocker** - Stops annoying/malicious pop-ups
-• **Password Manager** - Built-in password storage
-• **Private/Incognito Mode** - Doesn't save browsing history
-
-**Red Flag Websites:**
-• Excessive pop-ups and ads
-• Poor design and grammar
-• Requests for unnecessary personal information
-• No contact information or privacy policy
-• Too-good-to-be-true offers
-
-**Your Mission:** Check your browser's security settings and enable safe browsing features!
-                        """,
-                        "xp_reward": 225,
-                        "practical_exercise": {
-                            "title": "Browser Security Audit",
-                            "description": "Check and enable security features in your web browser",
-                            "checklist": ["Enable safe browsing", "Turn on pop-up blocker", "Update browser", "Install ad blocker", "Check privacy settings"]
-                        }
-                    }
-                }
-            }
-        }
-    },
-    4: {
-        "title": "🌐 Network Security Basics",
-        "description": "Understand networks and protect your connections",
-        "level": "Intermediate",
-        "modules": {
-            1: {
-                "title": "Understanding Networks",
-                "lessons": {
-                    1: {
-                        "title": "How Networks Work",
-                        "content": """
-🔗 **The Digital Highway System**
-
-Networks are like roads that connect different places. Understanding how they work helps you travel safely!
-
-**Network Basics:**
-
-**What is a Network?**
-• A system that connects devices together
-• Allows sharing of information and resources
-• Like a postal system for digital messages
-
-**Types of Networks:**
-
-**🏠 Home Network (LAN - Local Area Network)**
-• Your WiFi router connects all your devices
-• Printer, laptop, phone, smart TV all connected
-• Private and controlled by you
-
-**🌍 Internet (WAN - Wide Area Network)**
-• Global network connecting millions of devices
-• Public and shared by everyone
-• Requires security measures
-
-**☁️ Cloud Networks**
-• Remote servers you access over the internet
-• Google Drive, Netflix, email services
-• Your data stored on someone else's computers
-
-**How Data Travels:**
-1. Your device sends a request
-2. Router forwards it to your ISP
-3. ISP routes it across the internet
-4. Destination server receives and responds
-5. Response travels back the same way
-
-**Network Security Concerns:**
-• **Eavesdropping** - Someone listening to your traffic
-• **Man-in-the-Middle** - Someone intercepting your communications
-• **Unauthorized Access** - Strangers using your network
-
-**Real-world Analogy:**
-Sending data is like mailing a postcard - anyone handling it can read it unless you put it in an envelope (encryption)!
-                        """,
-                        "xp_reward": 200,
-                        "quiz": {
-                            "question": "What does LAN stand for?",
-                            "options": ["Large Area Network", "Local Area Network", "Limited Access Network", "Long Access Network"],
-                            "correct": 1,
-                            "explanation": "LAN stands for Local Area Network - a network that connects devices in a small area like your home or office."
-                        }
-                    },
-                    2: {
-                        "title": "WiFi Security Essentials",
-                        "content": """
-📶 **Secure Your Wireless World**
-
-WiFi is like having an invisible cable connecting your devices. But if not secured properly, anyone can tap into that cable!
-
-**WiFi Security Standards:**
-
-**🔐 WPA3 (Best)**
-• Latest and strongest encryption
-• Protects against most attacks
-• Use this if available
-
-**🔒 WPA2 (Good)**
-• Still secure for most users
-• Widely supported
-• Minimum acceptable standard
-
-**⚠️ WEP (Dangerous)**
-• Old and easily cracked
-• Never use this
-• Can be broken in minutes
-
-**🚫 Open/No Security (Never!)**
-• No encryption at all
-• Anyone can see your traffic
-• Only use for guest access
-
-**Securing Your Home WiFi:**
-
-**1. Change Default Passwords**
-• Router admin password
-• WiFi network password
-• Use strong, unique passwords
-
-**2. Update Router Firmware**
-• Fixes security vulnerabilities
-• Check manufacturer's website
-• Enable automatic updates if available
-
-**3. Use Strong Network Names**
-• Avoid personal information
-• "Smith_Family_WiFi" reveals too much
-• "Network_2024" is better
-
-**4. Enable Guest Networks**
-• Separate network for visitors
-• Protects your main devices
-• Can be turned off when not needed
-
-**5. Disable WPS**
-• WiFi Protected Setup has vulnerabilities
-• Turn it off in router settings
-• Use manual password entry instead
-
-**Public WiFi Safety:**
-• Never access sensitive accounts
-• Use your phone's hotspot instead
-• If you must use public WiFi, use a VPN
-
-**Your Mission:** Check your home WiFi security settings and upgrade to WPA3 if possible!
-                        """,
-                        "xp_reward": 250,
-                        "practical_exercise": {
-                            "title": "WiFi Security Audit",
-                            "description": "Check and improve your home WiFi security settings",
-                            "steps": ["Check WiFi encryption type", "Change default passwords", "Update router firmware", "Set up guest network", "Disable WPS"]
-                        }
-                    }
-                }
-            }
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from content_compiler import BUNDLE_MAGIC, BUNDLE_FILE, MANIFEST_FILE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CONTENT_DIR = os.getenv("COURSE_CONTENT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "content"))
+USE_BUNDLE = os.getenv("COURSE_BUNDLE", "on") != "off"
+COMPACT_CONTENT = os.getenv("COURSE_COMPACT_CONTENT", "off") == "on"
+# The compact store keeps every lesson read, so only a few need to stay decoded
+LESSON_CACHE_SIZE = int(os.getenv("LESSON_CACHE_SIZE", "8" if COMPACT_CONTENT else "64"))
+
+# Current catalog snapshot; replaced as a whole on reloads and admin edits
+_catalog = None
+
+# Serializes swapping in a new snapshot (reloads run in a worker thread)
+_publish_lock = threading.Lock()
+
+# Callbacks run with the new catalog after every successful reload
+_reload_listeners = []
+
+# Bumped on every admin-authored change so reloads never drop a concurrent edit
+_authored_revision = 0
+
+# sha1 of each lesson's compact JSON by source stamp, so a new snapshot only hashes lessons it hasn't seen
+_lesson_digests = {}
+
+class LRUCache:
+    """Small least-recently-used cache with hit/miss counters
+    
+    Safe to share between the event loop and worker threads (reloads and
+    reload listeners fill caches from to_thread).
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key)
+            if value is not None:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+    
+    def peek(self, key):
+        """Value for key without counting it as a use"""
+        with self.lock:
+            return self.data.get(key)
+    
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+    
+    def pop(self, key):
+        with self.lock:
+            return self.data.pop(key, None)
+    
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+# Parsed lessons, keyed by the source stamp of the lesson (file + mtime or bundle offset)
+lesson_cache = LRUCache(LESSON_CACHE_SIZE)
+
+class CompactLessonStore:
+    """Lessons kept in memory as compressed compact JSON, keyed by source stamp
+    
+    Uses zstd when the zstandard package is installed, zlib otherwise.
+    """
+    
+    def __init__(self):
+        if zstandard is not None:
+            self.codec = "zstd"
+            self._compress = zstandard.ZstdCompressor(level=9).compress
+            self._decompress = zstandard.ZstdDecompressor().decompress
+        else:
+            self.codec = "zlib"
+            self._compress = lambda data: zlib.compress(data, 9)
+            self._decompress = zlib.decompress
+        self.blobs = {}
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+    
+    def get(self, stamp):
+        blob = self.blobs.get(stamp)
+        if blob is None:
+            return None
+        lesson = json.loads(self._decompress(blob[0]))
+        lesson["title"] = sys.intern(lesson["title"])
+        return lesson
+    
+    def put(self, stamp, lesson: dict):
+        if stamp in self.blobs:
+            return
+        raw = json.dumps(lesson, ensure_ascii=False, separators=(",", ":")).encode()
+        blob = self._compress(raw)
+        self.blobs[stamp] = (blob, len(raw))
+        self.raw_bytes += len(raw)
+        self.compressed_bytes += len(blob)
+    
+    def prune(self, catalog):
+        """Drop lessons whose stamp is no longer in the catalog (after a reload)"""
+        live = {summary["stamp"] for _, summary in catalog.iter_lessons()}
+        for stamp in [stamp for stamp in self.blobs if stamp not in live]:
+            blob, raw_length = self.blobs.pop(stamp)
+            self.raw_bytes -= raw_length
+            self.compressed_bytes -= len(blob)
+    
+    def stats(self) -> dict:
+        return {
+            "codec": self.codec,
+            "lessons": len(self.blobs),
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes
         }
+
+# Compressed copies of every lesson read so far (None unless COURSE_COMPACT_CONTENT=on)
+content_store = CompactLessonStore() if COMPACT_CONTENT else None
+
+# Lesson files as the live snapshots were built from them, by stamp (shares the compact store when enabled)
+_file_copies = content_store or CompactLessonStore()
+
+class ContentBundle:
+    """Memory-mapped compiled catalog written by content_compiler.py"""
+    
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if self.map[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not a course bundle")
+        
+        header_start = len(BUNDLE_MAGIC) + 4
+        header_length = struct.unpack_from("<I", self.map, len(BUNDLE_MAGIC))[0]
+        self.manifest = json.loads(self.map[header_start:header_start + header_length])
+        self.data_start = header_start + header_length
+    
+    def read_raw(self, summary: dict) -> bytes:
+        """Compact JSON of one lesson from its offset in the data section"""
+        start = self.data_start + summary["offset"]
+        return self.map[start:start + summary["length"]]
+    
+    def read_lesson(self, summary: dict):
+        """Decode one lesson from its offset in the data section"""
+        return json.loads(self.read_raw(summary))
+
+def _scan_sources() -> dict:
+    """Modification times of the manifest and lesson files: {relative path: mtime_ns}"""
+    mtimes = {}
+    pending = [CONTENT_DIR]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                elif entry.name.endswith(".json"):
+                    path = os.path.relpath(entry.path, CONTENT_DIR).replace(os.sep, "/")
+                    mtimes[path] = entry.stat().st_mtime_ns
+    return mtimes
+
+def _open_bundle(source_mtimes: dict):
+    """Open the compiled bundle if it exists and is newer than the source files"""
+    path = os.path.join(CONTENT_DIR, BUNDLE_FILE)
+    if not USE_BUNDLE or not os.path.exists(path):
+        return None
+    
+    if os.stat(path).st_mtime_ns < max(source_mtimes.values(), default=0):
+        print("⚠️ Course bundle is older than the content files, loading from source (run content_compiler.py)")
+        return None
+    
+    try:
+        return ContentBundle(path)
+    except (OSError, ValueError) as e:
+        print(f"Error opening course bundle: {e}")
+        return None
+
+class LessonIndex:
+    """Flattened, ordered (course, module, lesson) keys with position maps and totals"""
+    
+    def __init__(self, courses: dict):
+        self.order = []
+        self.position = {}
+        self.course_start = {}
+        self.course_totals = {}
+        self.module_totals = {}
+        
+        for course_id in sorted(courses):
+            self.course_start[course_id] = len(self.order)
+            modules = courses[course_id].get("modules", {})
+            for module_id in sorted(modules):
+                lessons = modules[module_id].get("lessons", {})
+                for lesson_id in sorted(lessons):
+                    key = (course_id, module_id, lesson_id)
+                    self.position[key] = len(self.order)
+                    self.order.append(key)
+                self.module_totals[(course_id, module_id)] = len(lessons)
+            self.course_totals[course_id] = len(self.order) - self.course_start[course_id]
+    
+    def copy(self):
+        """Independent copy that can be changed without affecting this index"""
+        index = LessonIndex({})
+        index.order = list(self.order)
+        index.position = dict(self.position)
+        index.course_start = dict(self.course_start)
+        index.course_totals = dict(self.course_totals)
+        index.module_totals = dict(self.module_totals)
+        return index
+    
+    def add_course(self, course_id: int):
+        """Register a course that has no lessons yet"""
+        if course_id not in self.course_start:
+            self.course_start[course_id] = bisect.bisect_left(self.order, (course_id, 0, 0))
+            self.course_totals[course_id] = 0
+    
+    def add_module(self, course_id: int, module_id: int):
+        """Register a module that has no lessons yet"""
+        self.add_course(course_id)
+        self.module_totals.setdefault((course_id, module_id), 0)
+    
+    def insert(self, key: tuple):
+        """Add one lesson in order without rebuilding
+        
+        O(N) in the worst case: every key after the insertion point shifts
+        position (only appending at the very end of the catalog is O(1)).
+        """
+        if key in self.position:
+            return
+        
+        course_id, module_id, _ = key
+        self.add_module(course_id, module_id)
+        
+        index = bisect.bisect_left(self.order, key)
+        self.order.insert(index, key)
+        for position in range(index, len(self.order)):
+            self.position[self.order[position]] = position
+        
+        for other_course in self.course_start:
+            if other_course > course_id:
+                self.course_start[other_course] += 1
+        self.course_totals[course_id] += 1
+        self.module_totals[(course_id, module_id)] += 1
+    
+    def next(self, key: tuple):
+        """Key of the lesson after `key`, or None at the end of the catalog"""
+        index = self.position.get(key)
+        if index is None or index + 1 >= len(self.order):
+            return None
+        return self.order[index + 1]
+    
+    def previous(self, key: tuple):
+        """Key of the lesson before `key`, or None at the start of the catalog"""
+        index = self.position.get(key)
+        if not index:
+            return None
+        return self.order[index - 1]
+    
+    def course_progress(self, key: tuple):
+        """(lessons before `key` in its course, total lessons in that course)"""
+        course_id = key[0]
+        total = self.course_totals.get(course_id, 0)
+        index = self.position.get(key)
+        if index is None:
+            return (0, total)
+        return (index - self.course_start[course_id], total)
+
+class Catalog:
+    """An immutable snapshot of the course tree together with its lesson index
+    
+    Reloads and admin edits build a new Catalog (see derive()) and swap the
+    module reference in one assignment, so each lookup sees either the old or
+    the new tree. Anything holding a snapshot keeps seeing the same content.
+    The add_* methods are only for building a snapshot before it is published.
+    """
+    
+    def __init__(self, courses: dict, bundle: ContentBundle = None, source_mtimes: dict = None, index: LessonIndex = None):
+        self.courses = courses
+        self.index = index or LessonIndex(courses)
+        self.bundle = bundle
+        self.source_mtimes = source_mtimes or {}
+        self.course_list = None
+        self._version = None
+    
+    @property
+    def version(self) -> str:
+        """Short hash of the tree and every lesson's content
+        
+        Depends only on what learners see, not on where it was read from
+        (bundle, files or the authored store) or on file timestamps, so it
+        is stable across restarts and can be stored with progress rows.
+        
+        Bundle lessons carry their digest from the compiler; any other lesson
+        not hashed before is read once (and a file lesson kept, see
+        _read_lesson), so this is slow for a snapshot built from files.
+        get_catalog() and reload_catalog() compute it before publishing.
+        """
+        if self._version is None:
+            digest = hashlib.sha1()
+            for course_id in sorted(self.courses):
+                course = self.courses[course_id]
+                digest.update(repr((course_id, course["title"], course.get("description"), course.get("level"))).encode())
+                for module_id in sorted(course["modules"]):
+                    module = course["modules"][module_id]
+                    digest.update(repr((module_id, module["title"])).encode())
+                    for lesson_id in sorted(module["lessons"]):
+                        summary = module["lessons"][lesson_id]
+                        digest.update(repr((lesson_id, summary["title"], self.lesson_digest(summary))).encode())
+            self._version = digest.hexdigest()[:12]
+        return self._version
+    
+    def lesson_digest(self, summary: dict) -> str:
+        """sha1 of a lesson's compact JSON (the same bytes the compiler writes to the bundle)"""
+        if "digest" in summary:
+            return summary["digest"]
+        
+        stamp = summary["stamp"]
+        digest = _lesson_digests.get(stamp)
+        if digest is not None:
+            return digest
+        
+        if "offset" in summary:
+            raw = self.bundle.read_raw(summary)
+        else:
+            lesson = lesson_cache.peek(stamp) or self._read_lesson(summary)
+            if lesson is None:
+                # Unreadable; hash the stamp without caching so a later call can retry
+                return hashlib.sha1(repr(stamp).encode()).hexdigest()
+            if "file" in summary:
+                _file_copies.put(stamp, lesson)
+            raw = json.dumps(lesson, ensure_ascii=False, separators=(",", ":")).encode()
+        
+        digest = _lesson_digests[stamp] = hashlib.sha1(raw).hexdigest()
+        return digest
+    
+    def derive(self, course_id: int = None, module_id: int = None):
+        """New snapshot that shares everything with this one except the
+        containers on the path to course_id/module_id, which are copied so
+        the new snapshot can be changed with the add_* methods
+        
+        The lesson index is copied whole, so an edit costs O(N) in the number
+        of lessons. That is fine for occasional admin edits; bulk changes go
+        through reload_catalog, which rebuilds once.
+        """
+        courses = dict(self.courses)
+        course = courses.get(course_id)
+        if course is not None:
+            course = courses[course_id] = {**course, "modules": dict(course["modules"])}
+            module = course["modules"].get(module_id)
+            if module is not None:
+                course["modules"][module_id] = {**module, "lessons": dict(module["lessons"])}
+        return Catalog(courses, self.bundle, self.source_mtimes, self.index.copy())
+    
+    def get_summary(self, course_id: int, module_id: int, lesson_id: int):
+        """Manifest entry for a lesson"""
+        course = self.courses.get(course_id)
+        if not course:
+            return None
+        module = course["modules"].get(module_id)
+        if not module:
+            return None
+        return module["lessons"].get(lesson_id)
+    
+    def get_lesson(self, course_id: int, module_id: int, lesson_id: int, use_cache: bool = True):
+        """Full lesson, parsed on first use and cached by source stamp
+        
+        Bulk readers (e.g. the search indexer) pass use_cache=False so they
+        don't evict the lessons learners are actually reading.
+        """
+        summary = self.get_summary(course_id, module_id, lesson_id)
+        if not summary:
+            return None
+        
+        lesson = lesson_cache.peek(summary["stamp"]) if not use_cache else lesson_cache.get(summary["stamp"])
+        if lesson is None and content_store is not None:
+            lesson = content_store.get(summary["stamp"])
+            if lesson is not None and use_cache:
+                lesson_cache.put(summary["stamp"], lesson)
+        if lesson is None:
+            lesson = self._read_lesson(summary)
+            if lesson is not None and content_store is not None:
+                content_store.put(summary["stamp"], lesson)
+            if lesson is not None and use_cache:
+                lesson_cache.put(summary["stamp"], lesson)
+        return lesson
+    
+    def iter_lessons(self):
+        """Yield ((course_id, module_id, lesson_id), summary) in catalog order"""
+        for key in self.index.order:
+            yield key, self.get_summary(*key)
+    
+    def add_course(self, course_id: int, course: dict):
+        """Add a course to this catalog in place"""
+        course.setdefault("modules", {})
+        self.courses[course_id] = course
+        self.index.add_course(course_id)
+        self.course_list = None
+        self._version = None
+    
+    def add_module(self, course_id: int, module_id: int, module: dict):
+        """Add a module to an existing course in place"""
+        module.setdefault("lessons", {})
+        self.courses[course_id]["modules"][module_id] = module
+        self.index.add_module(course_id, module_id)
+        self._version = None
+    
+    def add_lesson(self, course_id: int, module_id: int, lesson_id: int, summary: dict):
+        """Add or replace a lesson summary in an existing module in place"""
+        self.courses[course_id]["modules"][module_id]["lessons"][lesson_id] = summary
+        self.index.insert((course_id, module_id, lesson_id))
+        self._version = None
+    
+    def next_course_id(self) -> int:
+        return max(self.courses, default=0) + 1
+    
+    def next_module_id(self, course_id: int) -> int:
+        return max(self.courses[course_id]["modules"], default=0) + 1
+    
+    def next_lesson_id(self, course_id: int, module_id: int) -> int:
+        return max(self.courses[course_id]["modules"][module_id]["lessons"], default=0) + 1
+    
+    def _read_lesson(self, summary: dict):
+        """Parse one lesson from the bundle, the authored content store or its own file
+        
+        A file lesson comes from the copy kept when the snapshot was built, so
+        editing the file doesn't change what this snapshot serves. Copies are
+        dropped once a newer snapshot is published; after that a changed file
+        returns None, so an old snapshot never caches newer content under its
+        own stamp (the bundle needs no check: each snapshot keeps its own
+        mapping of the file).
+        """
+        try:
+            if summary.get("authored"):
+                from database import db
+                return db.get_authored_lesson(*summary["key"], updated_at=summary["stamp"][-1])
+            if "offset" in summary:
+                return self.bundle.read_lesson(summary)
+            lesson = _file_copies.get(summary["stamp"])
+            if lesson is not None:
+                return lesson
+            with open(os.path.join(CONTENT_DIR, summary["file"]), encoding="utf-8") as f:
+                if os.fstat(f.fileno()).st_mtime_ns != summary["stamp"][1]:
+                    print(f"⚠️ {summary['file']} changed since this catalog snapshot was built, not serving it")
+                    return None
+                lesson = json.load(f)
+            _file_copies.put(summary["stamp"], lesson)
+            return lesson
+        except (OSError, ValueError) as e:
+            print(f"Error loading lesson {summary.get('file', summary.get('offset'))}: {e}")
+            return None
+
+def _int_keys(items: dict) -> dict:
+    """JSON object keys are strings; catalog ids are ints"""
+    return {int(key): value for key, value in items.items()}
+
+def _build_catalog(manifest: dict, source_mtimes: dict, bundle: ContentBundle = None) -> Catalog:
+    """Convert a manifest into a Catalog, stamping each lesson with its source identity"""
+    bundle_stamp = os.stat(os.path.join(CONTENT_DIR, BUNDLE_FILE)).st_mtime_ns if bundle else None
+    
+    courses = _int_keys(manifest["courses"])
+    for course in courses.values():
+        course["modules"] = _int_keys(course["modules"])
+        for module in course["modules"].values():
+            module["lessons"] = _int_keys(module["lessons"])
+            for summary in module["lessons"].values():
+                # Shared with the lesson dicts decoded from the compact store
+                summary["title"] = sys.intern(summary["title"])
+                if bundle:
+                    summary["stamp"] = (BUNDLE_FILE, bundle_stamp, summary["offset"])
+                else:
+                    summary["stamp"] = (summary["file"], source_mtimes.get(summary["file"]))
+    
+    return Catalog(courses, bundle, source_mtimes)
+
+def _authored_summary(course_id: int, module_id: int, lesson_id: int, title: str, xp_reward: int, updated_at) -> dict:
+    return {
+        "title": title,
+        "xp_reward": xp_reward,
+        "authored": True,
+        "key": (course_id, module_id, lesson_id),
+        "stamp": ("db", course_id, module_id, lesson_id, str(updated_at))
     }
-}
+
+def _get_module_from(catalog: Catalog, course_id: int, module_id: int):
+    """Module entry from a specific catalog"""
+    course = catalog.courses.get(course_id)
+    return course["modules"].get(module_id) if course else None
+
+def _merge_authored(catalog: Catalog):
+    """Add admin-authored courses, modules and lessons from SQLite to a catalog"""
+    from database import db
+    
+    courses, modules, lessons = db.get_authored_content()
+    for course_id, title, description, level in courses:
+        if course_id in catalog.courses:
+            print(f"⚠️ Authored course {course_id} conflicts with content files, skipping")
+            continue
+        catalog.add_course(course_id, {"title": title, "description": description, "level": level, "authored": True})
+    
+    for course_id, module_id, title in modules:
+        if course_id not in catalog.courses or module_id in catalog.courses[course_id]["modules"]:
+            print(f"⚠️ Authored module {course_id}/{module_id} has no course or conflicts, skipping")
+            continue
+        catalog.add_module(course_id, module_id, {"title": title, "authored": True})
+    
+    for course_id, module_id, lesson_id, title, xp_reward, updated_at in lessons:
+        module = _get_module_from(catalog, course_id, module_id)
+        if module is None or (lesson_id in module["lessons"] and not module["lessons"][lesson_id].get("authored")):
+            print(f"⚠️ Authored lesson {course_id}/{module_id}/{lesson_id} has no module or conflicts, skipping")
+            continue
+        catalog.add_lesson(course_id, module_id, lesson_id,
+                           _authored_summary(course_id, module_id, lesson_id, title, xp_reward, updated_at))
+
+def _read_manifest() -> dict:
+    with open(os.path.join(CONTENT_DIR, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+def get_catalog() -> Catalog:
+    """Get the current catalog, loading the manifest (or compiled bundle) on first use
+    
+    The first call hashes every lesson for the version, which reads all lesson
+    files unless a bundle is used, so the bot makes it from a worker thread.
+    """
+    global _catalog
+    if _catalog is None:
+        source_mtimes = _scan_sources()
+        bundle = _open_bundle(source_mtimes)
+        manifest = bundle.manifest if bundle else _read_manifest()
+        catalog = _build_catalog(manifest, source_mtimes, bundle)
+        _merge_authored(catalog)
+        catalog.version
+        _catalog = catalog
+    return _catalog
+
+def reload_catalog(force: bool = False) -> dict:
+    """Re-read changed content files and atomically swap in a new catalog
+    
+    Changed lesson files are parsed and validated before the swap; if any
+    are invalid the current catalog stays in place and the errors are returned.
+    """
+    global _catalog
+    from content_compiler import validate_catalog
+    
+    current = get_catalog()
+    source_mtimes = _scan_sources()
+    changed = sorted(path for path, mtime in source_mtimes.items() if current.source_mtimes.get(path) != mtime)
+    removed = sorted(set(current.source_mtimes) - set(source_mtimes))
+    
+    if not force and not changed and not removed:
+        return {"reloaded": False, "version": current.version, "changed": [], "errors": []}
+    
+    try:
+        manifest = _read_manifest()
+    except (OSError, ValueError) as e:
+        return {"reloaded": False, "version": current.version, "changed": changed, "errors": [f"manifest: {e}"]}
+    
+    # Parse only the lesson files that changed; unchanged ones keep their cache entries
+    parsed = {}
+    errors = []
+    for path in changed:
+        if path == MANIFEST_FILE:
+            continue
+        try:
+            with open(os.path.join(CONTENT_DIR, path), encoding="utf-8") as f:
+                parsed[path] = json.load(f)
+        except (OSError, ValueError) as e:
+            errors.append(f"{path}: {e}")
+    
+    errors += validate_catalog(manifest, parsed)
+    for course_id, course in manifest.get("courses", {}).items():
+        for module_id, module in course.get("modules", {}).items():
+            for lesson_id, summary in module.get("lessons", {}).items():
+                if summary.get("file") not in source_mtimes:
+                    errors.append(f"lesson {course_id}/{module_id}/{lesson_id}: file {summary.get('file')} not found")
+    
+    if errors:
+        return {"reloaded": False, "version": current.version, "changed": changed, "errors": errors}
+    
+    # Keep serving from the compiled bundle when it is still newer than the sources
+    # (a forced reload also picks up a freshly compiled one)
+    bundle = _open_bundle(source_mtimes)
+    if bundle is not None:
+        manifest = bundle.manifest
+    
+    # Rebuild if an admin authored content while we were reading the store
+    while True:
+        revision = _authored_revision
+        catalog = _build_catalog(manifest, source_mtimes, bundle)
+        _merge_authored(catalog)
+        
+        for _, summary in catalog.iter_lessons():
+            if summary.get("file") in parsed:
+                lesson_cache.put(summary["stamp"], parsed[summary["file"]])
+                _file_copies.put(summary["stamp"], parsed[summary["file"]])
+        
+        # Hash (and keep) lessons here in the worker thread rather than on first use in the event loop
+        catalog.version
+        
+        with _publish_lock:
+            if revision == _authored_revision:
+                _catalog = catalog
+                break
+    
+    # Older snapshots stop serving file lessons that changed since they were built
+    _file_copies.prune(catalog)
+    live = {summary["stamp"] for _, summary in catalog.iter_lessons()}
+    for stamp in [stamp for stamp in _lesson_digests if stamp not in live]:
+        _lesson_digests.pop(stamp, None)
+    for listener in _reload_listeners:
+        try:
+            listener(catalog)
+        except Exception as e:
+            print(f"Error in content reload listener: {e}")
+    
+    return {"reloaded": True, "version": catalog.version, "changed": changed + removed, "errors": []}
+
+def add_reload_listener(callback):
+    """Register a callback that receives the new catalog after each reload"""
+    _reload_listeners.append(callback)
+
+def add_authored_course(title: str, description: str, level: str, author_id: int):
+    """Persist a new course and publish a catalog snapshot with it; returns its id or None"""
+    global _catalog, _authored_revision
+    from database import db
+    
+    with _publish_lock:
+        catalog = get_catalog()
+        course_id = catalog.next_course_id()
+        if not db.save_authored_course(course_id, title, description, level, author_id):
+            return None
+        
+        _authored_revision += 1
+        snapshot = catalog.derive()
+        snapshot.add_course(course_id, {"title": title, "description": description, "level": level, "authored": True})
+        _catalog = snapshot
+    return course_id
+
+def add_authored_module(course_id: int, title: str, author_id: int):
+    """Persist a new module at the end of a course; returns its id or None"""
+    global _catalog, _authored_revision
+    from database import db
+    
+    with _publish_lock:
+        catalog = get_catalog()
+        if course_id not in catalog.courses:
+            return None
+        
+        module_id = catalog.next_module_id(course_id)
+        if not db.save_authored_module(course_id, module_id, title, author_id):
+            return None
+        
+        _authored_revision += 1
+        snapshot = catalog.derive(course_id)
+        snapshot.add_module(course_id, module_id, {"title": title, "authored": True})
+        _catalog = snapshot
+    return module_id
+
+def add_authored_lesson(course_id: int, module_id: int, lesson: dict, author_id: int):
+    """Persist a new lesson at the end of a module; returns its id or None"""
+    global _catalog, _authored_revision
+    from database import db
+    
+    with _publish_lock:
+        catalog = get_catalog()
+        if _get_module_from(catalog, course_id, module_id) is None:
+            return None
+        
+        lesson_id = catalog.next_lesson_id(course_id, module_id)
+        updated_at = db.save_authored_lesson(course_id, module_id, lesson_id, lesson, author_id)
+        if not updated_at:
+            return None
+        
+        _authored_revision += 1
+        summary = _authored_summary(course_id, module_id, lesson_id, lesson["title"],
+                                    lesson.get("xp_reward", 100), updated_at)
+        lesson_cache.put(summary["stamp"], lesson)
+        if content_store is not None:
+            content_store.put(summary["stamp"], lesson)
+        
+        snapshot = catalog.derive(course_id, module_id)
+        snapshot.add_lesson(course_id, module_id, lesson_id, summary)
+        _catalog = snapshot
+    return lesson_id
+
+def get_content_version() -> str:
+    """Version of the current catalog snapshot; changes on reloads and admin edits"""
+    return get_catalog().version
+
+def get_lesson_index() -> LessonIndex:
+    """Get the flattened lesson index of the current catalog"""
+    return get_catalog().index
+
+def __getattr__(name):
+    # Keep `courses.COURSES` working; this loads every lesson, so avoid it in the bot
+    if name == "COURSES":
+        return get_all_courses()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_course(course_id: int):
-    """Get course by ID"""
-    return COURSES.get(course_id)
+    """Get course by ID (manifest entry: titles and lesson summaries only)"""
+    return get_catalog().courses.get(course_id)
 
 def get_module(course_id: int, module_id: int):
-    """Get module by course and module ID"""
-    course = COURSES.get(course_id)
+    """Get module by course and module ID (manifest entry: titles and lesson summaries only)"""
+    course = get_catalog().courses.get(course_id)
     if course:
         return course.get("modules", {}).get(module_id)
     return None
 
 def get_lesson(course_id: int, module_id: int, lesson_id: int):
     """Get lesson by course, module, and lesson ID"""
-    module = get_module(course_id, module_id)
-    if module:
-        return module.get("lessons", {}).get(lesson_id)
-    return None
+    return get_catalog().get_lesson(course_id, module_id, lesson_id)
 
 def get_all_courses():
-    """Get all available courses"""
-    return COURSES
+    """Get all available courses with every lesson loaded (reads the whole catalog)"""
+    catalog = get_catalog()
+    courses = {}
+    for course_id, course in catalog.courses.items():
+        modules = {}
+        for module_id, module in course["modules"].items():
+            lessons = {lesson_id: catalog.get_lesson(course_id, module_id, lesson_id) for lesson_id in module["lessons"]}
+            modules[module_id] = {**module, "lessons": lessons}
+        courses[course_id] = {**course, "modules": modules}
+    return courses
 
 def get_course_list():
-    """Get simplified course list for display"""
-    course_list = []
-    for course_id, course in COURSES.items():
-        course_list.append({
+    """Get simplified course list for display (shared per catalog; don't modify it)"""
+    catalog = get_catalog()
+    if catalog.course_list is None:
+        catalog.course_list = [{
             "id": course_id,
             "title": course["title"],
             "description": course["description"],
             "level": course["level"]
-        })
-    return course_list
+        } for course_id, course in sorted(catalog.courses.items())]
+    return catalog.course_list
 
 def get_next_lesson(course_id: int, module_id: int, lesson_id: int):
     """Get the next lesson in sequence"""
-    course = get_course(course_id)
-    if not course:
-        return None
-    
-    # Try next lesson in current module
-    next_lesson = get_lesson(course_id, module_id, lesson_id + 1)
-    if next_lesson:
-        return (course_id, module_id, lesson_id + 1)
-    
-    # Try first lesson of next module
-    next_module = get_module(course_id, module_id + 1)
-    if next_module:
-        return (course_id, module_id + 1, 1)
-    
-    # Try first lesson of next course
-    next_course = get_course(course_id + 1)
-    if next_course:
-        return (course_id + 1, 1, 1)
-    
-    return None  # No more lessons
+    return get_lesson_index().next((course_id, module_id, lesson_id))
+
+def get_previous_lesson(course_id: int, module_id: int, lesson_id: int):
+    """Get the previous lesson in sequence"""
+    return get_lesson_index().previous((course_id, module_id, lesson_id))
+
+def get_course_lesson_count(course_id: int) -> int:
+    """Get the number of lessons in a course"""
+    return get_lesson_index().course_totals.get(course_id, 0)
+
+def get_module_lesson_count(course_id: int, module_id: int) -> int:
+    """Get the number of lessons in a module"""
+    return get_lesson_index().module_totals.get((course_id, module_id), 0)
+
+def get_course_progress(course_id: int, module_id: int, lesson_id: int):
+    """Get (lessons before this one in its course, total lessons in the course)"""
+    return get_lesson_index().course_progress((course_id, module_id, lesson_id))
@@ -1,19 +1,27 @@
 import sqlite3
 import datetime
+import json
 from typing import Optional, List, Tuple
 
 class DatabaseManager:
     def __init__(self, db_path: str = "academy.db"):
         self.db_path = db_path
-        self.init_database()
+        self.connections_opened = 0
+        self.initialized = False
     
     def get_connection(self):
-        """Get database connection"""
+        """Get database connection (creates the schema on first use)"""
+        if not self.initialized:
+            self.init_database()
+        self.connections_opened += 1
         return sqlite3.connect(self.db_path)
     
     def init_database(self):
         """Initialize database tables"""
-        conn = self.get_connection()
+        if self.initialized:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         # Users table
@@ -71,8 +79,103 @@ class DatabaseManager:
             )
         """)
         
+        # Admin-authored course content
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS authored_courses (
+                course_id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                description TEXT,
+                level TEXT,
+                created_by INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS authored_modules (
+                course_id INTEGER,
+                module_id INTEGER,
+                title TEXT NOT NULL,
+                created_by INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (course_id, module_id)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS authored_lessons (
+                course_id INTEGER,
+                module_id INTEGER,
+                lesson_id INTEGER,
+                title TEXT NOT NULL,
+                xp_reward INTEGER DEFAULT 100,
+                lesson_json TEXT NOT NULL,
+                created_by INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (course_id, module_id, lesson_id)
+            )
+        """)
+        
+        # In-progress module quizzes (lessons: comma-separated lesson ids in question order)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS quiz_sessions (
+                session_id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                course_id INTEGER,
+                module_id INTEGER,
+                lessons TEXT NOT NULL,
+                score INTEGER DEFAULT 0,
+                content_version TEXT,
+                started REAL,
+                updated REAL,
+                finished INTEGER DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_quiz_sessions_user ON quiz_sessions (user_id, updated)")
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS quiz_answers (
+                session_id TEXT,
+                question INTEGER,
+                selected INTEGER,
+                is_correct INTEGER,
+                PRIMARY KEY (session_id, question)
+            ) WITHOUT ROWID
+        """)
+        
+        # Columns added after the first release
+        self._add_missing_columns(cursor, "course_progress", {"content_version": "TEXT"})
+        self._add_missing_columns(cursor, "quiz_attempts", {"content_version": "TEXT"})
+        if self._add_missing_columns(cursor, "users", {"achievement_mask": "INTEGER DEFAULT 0"}):
+            self._backfill_achievement_masks(cursor)
+        self._add_missing_columns(cursor, "users", {"activity_days": "BLOB"})
+        
         conn.commit()
         conn.close()
+        self.initialized = True
+    
+    def _add_missing_columns(self, cursor, table: str, columns: dict) -> list:
+        """ALTER TABLE to add any of `columns` ({name: type}) that an older database lacks; returns the added names"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        added = []
+        for name, column_type in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+                added.append(name)
+        return added
+    
+    def _backfill_achievement_masks(self, cursor):
+        """Set users.achievement_mask from existing achievement rows"""
+        from achievements import achievement_manager, achievement_bit
+        
+        bits = {name: achievement_bit(achievement) for name, achievement in achievement_manager.rules.by_name.items()}
+        masks = {}
+        cursor.execute("SELECT user_id, achievement_name FROM achievements")
+        for user_id, name in cursor.fetchall():
+            masks[user_id] = masks.get(user_id, 0) | bits.get(name, 0)
+        cursor.executemany("UPDATE users SET achievement_mask = ? WHERE user_id = ?",
+                           [(mask, user_id) for user_id, mask in masks.items() if mask])
     
     def add_user(self, user_id: int, username: str):
         """Add new user or update existing user"""
@@ -80,11 +183,11 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
+            # Upsert so existing rows keep their position and achievement mask
             cursor.execute("""
-                INSERT OR REPLACE INTO users (user_id, username, xp, level)
-                VALUES (?, ?, COALESCE((SELECT xp FROM users WHERE user_id = ?), 0),
-                        COALESCE((SELECT level FROM users WHERE user_id = ?), 1))
-            """, (user_id, username, user_id, user_id))
+                INSERT INTO users (user_id, username) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET username = excluded.username
+            """, (user_id, username))
             conn.commit()
         except Exception as e:
             print(f"Error adding user: {e}")
@@ -115,11 +218,12 @@ class DatabaseManager:
                 UPDATE users SET xp = ?, level = ? WHERE user_id = ?
             """, (new_xp, new_level, user_id))
             
-            # Check for level up achievement
+            conn.commit()
+            
+            # Check for level up achievement (after commit; it opens its own connection)
             if new_level > current_level:
                 self.add_achievement(user_id, f"Level {new_level} Reached", "level_up")
             
-            conn.commit()
             return new_xp
         except Exception as e:
             print(f"Error adding XP: {e}")
@@ -144,8 +248,18 @@ class DatabaseManager:
         finally:
             conn.close()
     
-    def update_progress(self, user_id: int, course_id: int, module_id: int, lesson_id: int):
-        """Update user's current progress"""
+    def update_progress(self, user_id: int, course_id: int, module_id: int, lesson_id: int,
+                        content_version: str = None) -> Optional[Tuple[int, int]]:
+        """Update user's current progress (content_version: catalog version the lesson was read in)
+        
+        Returns (completed lessons, completed lessons in this course), or None on error.
+        """
+        from courses import get_next_lesson
+        
+        # Advance to the next lesson in catalog order (crossing modules and courses);
+        # after the very last lesson the position stays on it
+        next_position = get_next_lesson(course_id, module_id, lesson_id) or (course_id, module_id, lesson_id)
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -153,28 +267,56 @@ class DatabaseManager:
             # Mark lesson as completed
             cursor.execute("""
                 INSERT OR REPLACE INTO course_progress 
-                (user_id, course_id, module_id, lesson_id, completed, completion_date)
-                VALUES (?, ?, ?, ?, TRUE, CURRENT_TIMESTAMP)
-            """, (user_id, course_id, module_id, lesson_id))
+                (user_id, course_id, module_id, lesson_id, completed, completion_date, content_version)
+                VALUES (?, ?, ?, ?, TRUE, CURRENT_TIMESTAMP, ?)
+            """, (user_id, course_id, module_id, lesson_id, content_version))
             
             # Update user's current position
             cursor.execute("""
                 UPDATE users SET current_course = ?, current_module = ?, current_lesson = ?
                 WHERE user_id = ?
-            """, (course_id, module_id, lesson_id + 1, user_id))
+            """, (*next_position, user_id))
+            
+            # Completion counts for the achievement engine
+            cursor.execute("""
+                SELECT COUNT(*), SUM(course_id = ?) FROM course_progress
+                WHERE user_id = ? AND completed = TRUE
+            """, (course_id, user_id))
+            completed, course_completed = cursor.fetchone()
             
             conn.commit()
+            return completed, course_completed or 0
         except Exception as e:
             print(f"Error updating progress: {e}")
+            return None
         finally:
             conn.close()
     
-    def add_achievement(self, user_id: int, achievement_name: str, achievement_type: str):
-        """Add achievement to user"""
+    def add_achievement(self, user_id: int, achievement_name: str, achievement_type: str, achievement_bit: int = 0):
+        """Add achievement to user
+        
+        Defined achievements pass their achievement_mask bit, which makes the
+        "already earned?" check a single bit test; others are matched by name.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
+            if achievement_bit:
+                cursor.execute("""
+                    UPDATE users SET achievement_mask = achievement_mask | ?
+                    WHERE user_id = ? AND achievement_mask & ? = 0
+                """, (achievement_bit, user_id, achievement_bit))
+                if cursor.rowcount == 0:
+                    return False
+                cursor.execute("""
+                    INSERT INTO achievements (user_id, achievement_name, achievement_type)
+                    VALUES (?, ?, ?)
+                """, (user_id, achievement_name, achievement_type))
+                conn.commit()
+                return True
+            
+
             # Check if achievement already exists
             cursor.execute("""
                 SELECT id FROM achievements 
@@ -195,6 +337,158 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def get_progress_snapshot(self, user_id: int, username: str = None) -> Optional[dict]:
+        """Everything !progress, !achievements and !stats show, in one query
+        
+        Passing username also registers/renames the user on the same connection.
+        Returns None on error; "username" is None if the user has no row yet.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            if username is not None:
+                cursor.execute("""
+                    INSERT INTO users (user_id, username) VALUES (?, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET username = excluded.username
+                """, (user_id, username))
+            
+            cursor.execute("""
+                SELECT u.username, u.xp, u.level, u.current_course, u.current_module, u.current_lesson,
+                       u.achievement_mask, u.activity_days,
+                       (SELECT json_group_array(json_array(achievement_name, achievement_type, date_awarded))
+                        FROM (SELECT achievement_name, achievement_type, date_awarded FROM achievements
+                              WHERE user_id = q.user_id ORDER BY date_awarded DESC)),
+                       (SELECT json_group_object(course_id, completed)
+                        FROM (SELECT course_id, COUNT(*) AS completed FROM course_progress
+                              WHERE user_id = q.user_id AND completed = TRUE GROUP BY course_id)),
+                       (SELECT json_array(COUNT(*), AVG(CAST(score AS FLOAT) / total_questions * 100),
+                                          SUM(score = total_questions), MAX(CAST(score AS FLOAT) / total_questions * 100))
+                        FROM quiz_attempts WHERE user_id = q.user_id)
+                FROM (SELECT ? AS user_id) AS q LEFT JOIN users u ON u.user_id = q.user_id
+            """, (user_id,))
+            row = cursor.fetchone()
+            conn.commit()
+        except Exception as e:
+            print(f"Error getting progress snapshot: {e}")
+            return None
+        finally:
+            conn.close()
+        
+        (name, xp, level, current_course, current_module, current_lesson,
+         mask, activity_days, achievements, courses, quiz) = row
+        courses = {int(course_id): count for course_id, count in json.loads(courses).items()}
+        attempts, average, perfect, best = json.loads(quiz)
+        return {
+            "username": name,
+            "xp": xp or 0,
+            "level": level or 1,
+            "position": (current_course or 1, current_module or 1, current_lesson or 1),
+            "mask": mask or 0,
+            "activity_days": activity_days,
+            "achievements": [tuple(entry) for entry in json.loads(achievements)],
+            "courses": courses,
+            "completed_lessons": sum(courses.values()),
+            "quiz": {"attempts": attempts, "average": average or 0, "perfect": perfect or 0, "best": best or 0}
+        }
+    
+    def get_achievement_stats(self, user_id: int = None) -> dict:
+        """Stats of every user (or just `user_id`) for achievement evaluation, in a few GROUP BY queries
+        
+        Returns {user_id: {"xp", "level", "mask", "lessons", "courses": {course_id: n},
+        "perfect_quizzes", "longest_streak"}}.
+        """
+        from activity import bits_from_blob, longest_streak
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        only_user = "" if user_id is None else " AND user_id = ?"
+        params = () if user_id is None else (user_id,)
+        
+        try:
+            stats = {}
+            cursor.execute("SELECT user_id, xp, level, achievement_mask, activity_days FROM users WHERE 1 = 1" + only_user, params)
+            for row_user, xp, level, mask, activity_days in cursor.fetchall():
+                stats[row_user] = {"xp": xp or 0, "level": level or 1, "mask": mask or 0,
+                                   "lessons": 0, "courses": {}, "perfect_quizzes": 0,
+                                   "longest_streak": longest_streak(bits_from_blob(activity_days))}
+            
+            cursor.execute("""
+                SELECT user_id, course_id, COUNT(*) FROM course_progress
+                WHERE completed = TRUE""" + only_user + """ GROUP BY user_id, course_id
+            """, params)
+            for row_user, course_id, count in cursor.fetchall():
+                if row_user in stats:
+                    stats[row_user]["courses"][course_id] = count
+                    stats[row_user]["lessons"] += count
+            
+            cursor.execute("""
+                SELECT user_id, COUNT(*) FROM quiz_attempts
+                WHERE score = total_questions""" + only_user + """ GROUP BY user_id
+            """, params)
+            for row_user, count in cursor.fetchall():
+                if row_user in stats:
+                    stats[row_user]["perfect_quizzes"] = count
+            
+            return stats
+        except Exception as e:
+            print(f"Error getting achievement stats: {e}")
+            return {}
+        finally:
+            conn.close()
+    
+    def apply_achievement_awards(self, awards: list) -> Optional[dict]:
+        """Apply bulk awards in one transaction; returns {user_id: achievements applied} or None on error
+        
+        Each award is (user_id, [(name, type, bit, xp_bonus), ...]). Masks are
+        re-read under the write lock, so achievements the live engine awarded
+        in the meantime are skipped instead of being inserted (and paid) twice.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            applied = {}
+            for user_id, earned in awards:
+                cursor.execute("SELECT achievement_mask, xp, level FROM users WHERE user_id = ?", (user_id,))
+                row = cursor.fetchone()
+                if not row:
+                    continue
+                mask, xp, level = row[0] or 0, row[1], row[2]
+                
+                new = [(name, achievement_type, bit, xp_bonus) for name, achievement_type, bit, xp_bonus in earned
+                       if not mask & bit]
+                if not new:
+                    continue
+                
+                cursor.executemany("""
+                    INSERT INTO achievements (user_id, achievement_name, achievement_type) VALUES (?, ?, ?)
+                """, [(user_id, name, achievement_type) for name, achievement_type, _, _ in new])
+                for _, _, bit, xp_bonus in new:
+                    mask |= bit
+                    xp += xp_bonus
+                new_level = xp // 1000 + 1
+                cursor.execute("""
+                    UPDATE users SET achievement_mask = ?, xp = ?, level = ? WHERE user_id = ?
+                """, (mask, xp, new_level, user_id))
+                if new_level > level:
+                    cursor.execute("""
+                        INSERT INTO achievements (user_id, achievement_name, achievement_type)
+                        SELECT ?, ?, 'level_up' WHERE NOT EXISTS (
+                            SELECT 1 FROM achievements WHERE user_id = ? AND achievement_name = ?
+                        )
+                    """, (user_id, f"Level {new_level} Reached", user_id, f"Level {new_level} Reached"))
+                applied[user_id] = len(new)
+            conn.commit()
+            return applied
+        except Exception as e:
+            conn.rollback()
+            print(f"Error applying achievement awards: {e}")
+            return None
+        finally:
+            conn.close()
+    
     def get_leaderboard(self, limit: int = 10) -> List[Tuple]:
         """Get top users by XP"""
         conn = self.get_connection()
@@ -212,6 +506,66 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def record_activity(self, user_id: int) -> Optional[int]:
+        """Mark today as active; returns the current streak if this was the first activity today, else None"""
+        from activity import day_number, bits_from_blob, blob_from_bits, current_streak
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        today = day_number()
+        
+        try:
+            cursor.execute("SELECT activity_days FROM users WHERE user_id = ?", (user_id,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+            
+            bits = bits_from_blob(result[0])
+            if bits >> today & 1:
+                return None  # Already active today; nothing to write
+            
+            bits |= 1 << today
+            cursor.execute("UPDATE users SET activity_days = ? WHERE user_id = ?", (blob_from_bits(bits), user_id))
+            conn.commit()
+            return current_streak(bits, today)
+        except Exception as e:
+            print(f"Error recording activity: {e}")
+            return None
+        finally:
+            conn.close()
+    
+    def get_activity(self, user_id: int) -> int:
+        """Activity bitmap of a user (see activity.py)"""
+        from activity import bits_from_blob
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("SELECT activity_days FROM users WHERE user_id = ?", (user_id,))
+            result = cursor.fetchone()
+            return bits_from_blob(result[0]) if result else 0
+        except Exception as e:
+            print(f"Error getting activity: {e}")
+            return 0
+        finally:
+            conn.close()
+    
+    def get_achievement_mask(self, user_id: int) -> int:
+        """Bitmask of the defined achievements a user has earned"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("SELECT achievement_mask FROM users WHERE user_id = ?", (user_id,))
+            result = cursor.fetchone()
+            return (result[0] or 0) if result else 0
+        except Exception as e:
+            print(f"Error getting achievement mask: {e}")
+            return 0
+        finally:
+            conn.close()
+    
     def get_user_achievements(self, user_id: int) -> List[Tuple]:
         """Get all achievements for a user"""
         conn = self.get_connection()
@@ -231,20 +585,234 @@ class DatabaseManager:
             conn.close()
     
     def record_quiz_attempt(self, user_id: int, course_id: int, module_id: int, 
-                           lesson_id: int, score: int, total_questions: int):
-        """Record a quiz attempt"""
+                           lesson_id: int, score: int, total_questions: int, content_version: str = None) -> int:
+        """Record a quiz attempt (content_version: catalog version the questions came from)
+        
+        Returns the user's number of perfect attempts afterwards.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         
         try:
             cursor.execute("""
                 INSERT INTO quiz_attempts 
-                (user_id, course_id, module_id, lesson_id, score, total_questions)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (user_id, course_id, module_id, lesson_id, score, total_questions))
+                (user_id, course_id, module_id, lesson_id, score, total_questions, content_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, course_id, module_id, lesson_id, score, total_questions, content_version))
+            
+            cursor.execute("""
+                SELECT COUNT(*) FROM quiz_attempts
+                WHERE user_id = ? AND score = total_questions
+            """, (user_id,))
+            perfect_quizzes = cursor.fetchone()[0]
+            
             conn.commit()
+            return perfect_quizzes
         except Exception as e:
             print(f"Error recording quiz attempt: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def save_quiz_sessions(self, sessions: list, answers: list) -> bool:
+        """Write a batch of quiz session rows and answers in one transaction
+        
+        Sessions are (session_id, user_id, course_id, module_id, lessons, score,
+        content_version, started, updated, finished); answers are
+        (session_id, question, selected, is_correct).
+        
+        A row never goes back in time: a batch taken before a newer write
+        (e.g. the sweeper racing a finished quiz) can't roll back the score
+        or reopen a finished session.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany("""
+                INSERT INTO quiz_sessions
+                (session_id, user_id, course_id, module_id, lessons, score, content_version, started, updated, finished)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    score = excluded.score, updated = excluded.updated,
+                    finished = MAX(quiz_sessions.finished, excluded.finished)
+                WHERE excluded.updated >= quiz_sessions.updated
+            """, sessions)
+            cursor.executemany("""
+                INSERT OR IGNORE INTO quiz_answers (session_id, question, selected, is_correct)
+                VALUES (?, ?, ?, ?)
+            """, answers)
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Error saving quiz sessions: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def load_quiz_session(self, session_id: str) -> Optional[Tuple]:
+        """Get a quiz session row with its answers as a comma-separated string (in question order)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT s.session_id, s.user_id, s.course_id, s.module_id, s.lessons, s.score,
+                       s.content_version, s.started, s.updated, s.finished,
+                       (SELECT group_concat(selected, ',') FROM (
+                            SELECT selected FROM quiz_answers WHERE session_id = s.session_id ORDER BY question
+                       ))
+                FROM quiz_sessions s
+                WHERE s.session_id = ?
+            """, (session_id,))
+            return cursor.fetchone()
+        except Exception as e:
+            print(f"Error loading quiz session: {e}")
+            return None
+        finally:
+            conn.close()
+    
+    def get_resumable_quiz_session(self, user_id: int, active_since: float) -> Optional[str]:
+        """Id of the user's most recently used unfinished quiz session, if still active"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT session_id FROM quiz_sessions
+                WHERE user_id = ? AND finished = 0 AND updated >= ?
+                ORDER BY updated DESC LIMIT 1
+            """, (user_id, active_since))
+            result = cursor.fetchone()
+            return result[0] if result else None
+        except Exception as e:
+            print(f"Error getting resumable quiz session: {e}")
+            return None
+        finally:
+            conn.close()
+    
+    def delete_expired_quiz_sessions(self, inactive_before: float, finished_before: float) -> int:
+        """Delete quiz sessions (and their answers): unfinished ones idle since before
+        `inactive_before`, finished ones closed before `finished_before`"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                DELETE FROM quiz_answers WHERE session_id IN (
+                    SELECT session_id FROM quiz_sessions
+                    WHERE (finished = 0 AND updated < ?) OR (finished = 1 AND updated < ?)
+                )
+            """, (inactive_before, finished_before))
+            cursor.execute("""
+                DELETE FROM quiz_sessions
+                WHERE (finished = 0 AND updated < ?) OR (finished = 1 AND updated < ?)
+            """, (inactive_before, finished_before))
+            deleted = cursor.rowcount
+            conn.commit()
+            return deleted
+        except Exception as e:
+            conn.rollback()
+            print(f"Error deleting expired quiz sessions: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def save_authored_course(self, course_id: int, title: str, description: str, level: str, created_by: int) -> bool:
+        """Persist an admin-authored course"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                INSERT INTO authored_courses (course_id, title, description, level, created_by)
+                VALUES (?, ?, ?, ?, ?)
+            """, (course_id, title, description, level, created_by))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving authored course: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def save_authored_module(self, course_id: int, module_id: int, title: str, created_by: int) -> bool:
+        """Persist an admin-authored module"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                INSERT INTO authored_modules (course_id, module_id, title, created_by)
+                VALUES (?, ?, ?, ?)
+            """, (course_id, module_id, title, created_by))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving authored module: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def save_authored_lesson(self, course_id: int, module_id: int, lesson_id: int, lesson: dict, created_by: int) -> Optional[str]:
+        """Persist an admin-authored lesson (full lesson stored as JSON); returns its updated_at or None"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        # Same format as CURRENT_TIMESTAMP, so the catalog stamp matches what a restart reads back
+        updated_at = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        
+        try:
+            cursor.execute("""
+                INSERT OR REPLACE INTO authored_lessons
+                (course_id, module_id, lesson_id, title, xp_reward, lesson_json, created_by, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (course_id, module_id, lesson_id, lesson["title"], lesson.get("xp_reward", 100),
+                  json.dumps(lesson, ensure_ascii=False), created_by, updated_at))
+            conn.commit()
+            return updated_at
+        except Exception as e:
+            print(f"Error saving authored lesson: {e}")
+            return None
+        finally:
+            conn.close()
+    
+    def get_authored_content(self) -> Tuple[List[Tuple], List[Tuple], List[Tuple]]:
+        """Get authored (courses, modules, lesson summaries) for building the catalog"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("SELECT course_id, title, description, level FROM authored_courses")
+            courses = cursor.fetchall()
+            cursor.execute("SELECT course_id, module_id, title FROM authored_modules")
+            modules = cursor.fetchall()
+            cursor.execute("""
+                SELECT course_id, module_id, lesson_id, title, xp_reward, updated_at FROM authored_lessons
+            """)
+            lessons = cursor.fetchall()
+            return courses, modules, lessons
+        except Exception as e:
+            print(f"Error getting authored content: {e}")
+            return [], [], []
+        finally:
+            conn.close()
+    
+    def get_authored_lesson(self, course_id: int, module_id: int, lesson_id: int, updated_at: str = None) -> Optional[dict]:
+        """Get the full JSON of an authored lesson (only the revision saved at updated_at, if given)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT lesson_json FROM authored_lessons
+                WHERE course_id = ? AND module_id = ? AND lesson_id = ? AND (? IS NULL OR updated_at = ?)
+            """, (course_id, module_id, lesson_id, updated_at, updated_at))
+            result = cursor.fetchone()
+            return json.loads(result[0]) if result else None
+        except Exception as e:
+            print(f"Error getting authored lesson: {e}")
+            return None
         finally:
             conn.close()
 
@@ -0,0 +1,38 @@
+"""
+Embed Cache for Cybersecurity Learning Bot
+Pre-built embed payloads for static content, keyed by content version
+"""
+
+import discord
+from courses import LRUCache, add_reload_listener, get_content_version
+
+class EmbedCache:
+    def __init__(self, maxsize: int = 256):
+        self.payloads = LRUCache(maxsize)
+        self.version = None
+
+    def get(self, key, build) -> discord.Embed:
+        """Get a fresh Embed for `key`, building and caching its payload on a miss
+        
+        The returned embed is a copy, so callers can patch in per-user fields.
+        """
+        version = get_content_version()
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+        payload = self.payloads.get(key)
+        if payload is None:
+            payload = build().to_dict()
+            self.payloads.put(key, payload)
+
+        return discord.Embed.from_dict({**payload, "fields": [dict(field) for field in payload.get("fields", [])]})
+
+    def clear(self, catalog=None):
+        self.payloads.clear()
+
+# Global embed cache instance
+embed_cache = EmbedCache()
+
+# Drop stale payloads as soon as content is reloaded
+add_reload_listener(embed_cache.clear)
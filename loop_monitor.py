@@ -0,0 +1,157 @@
+"""
+Event Loop Watchdog for Cybersecurity Learning Bot
+Measures event-loop scheduling lag and reports handlers that block the loop
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+
+# Source files that belong to the bot itself (used to name the blocking handler)
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class LoopWatchdog:
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, history: int = 2000):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag_samples = deque(maxlen=history)
+        self.blocking_events = deque(maxlen=20)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self._loop = None
+        self._loop_thread_id = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_tick = time.monotonic()
+        self._reported_tick = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the lag probe and the helper thread (safe to call on every on_ready)"""
+        if self.running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._probe())
+
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+            self._thread.start()
+
+        print(f"🐕 Loop watchdog started (threshold {self.threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        """Stop the lag probe and the helper thread"""
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _probe(self):
+        """Sleep for a fixed interval and record how late the loop woke us up"""
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self._last_tick = started
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - started - self.interval)
+            self.lag_samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            self._last_tick = time.monotonic()
+
+    def _monitor(self):
+        """Helper thread: capture the loop thread's stack while it is stalled"""
+        poll = min(self.interval, self.threshold / 2)
+        while not self._stop.wait(poll):
+            tick = self._last_tick
+            stalled_for = time.monotonic() - tick - self.interval
+            if stalled_for < self.threshold or self._reported_tick == tick:
+                continue
+
+            # Report each stall only once
+            self._reported_tick = tick
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+
+            self._report_stall(frame, stalled_for)
+
+    def _report_stall(self, frame, stalled_for: float):
+        """Record and log the handler that is holding the event loop"""
+        stack = traceback.extract_stack(frame)
+        handler = find_handler(frame)
+
+        self.stall_count += 1
+        self.blocking_events.append({
+            "handler": handler,
+            "stalled_ms": round(stalled_for * 1000, 1),
+            "timestamp": datetime.utcnow().isoformat(),
+            "stack": "".join(traceback.format_list(stack[-15:]))
+        })
+
+        print(f"⚠️ Event loop blocked for {stalled_for * 1000:.0f}+ ms in {handler}")
+        for line in traceback.format_list(stack[-6:]):
+            print(line.rstrip())
+
+    def get_lag_percentiles(self) -> dict:
+        """Get loop lag percentiles in milliseconds"""
+        samples = sorted(self.lag_samples)
+        if not samples:
+            return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0, "samples": 0}
+
+        def percentile(p):
+            index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+            return round(samples[index] * 1000, 2)
+
+        return {
+            "p50": percentile(50),
+            "p90": percentile(90),
+            "p99": percentile(99),
+            "max": round(self.max_lag * 1000, 2),
+            "samples": len(samples)
+        }
+
+def find_handler(frame) -> str:
+    """Name the outermost bot function on a stack, e.g. admin:AdminView.user_stats"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+
+    # Only look at frames scheduled by the loop, not the code that started it
+    frames.reverse()
+    loop_frames = [index for index, candidate in enumerate(frames)
+                   if candidate.f_code.co_filename == asyncio.events.__file__]
+    if loop_frames:
+        frames = frames[loop_frames[-1] + 1:]
+
+    for candidate in frames:
+        filename = os.path.abspath(candidate.f_code.co_filename)
+        if os.path.dirname(filename) != PROJECT_DIR or filename == os.path.abspath(__file__):
+            continue
+
+        module = os.path.splitext(os.path.basename(filename))[0]
+        return f"{module}:{_qualified_name(candidate.f_code)}"
+
+    if frames:
+        return f"{os.path.basename(frames[-1].f_code.co_filename)}:{_qualified_name(frames[-1].f_code)}"
+    return "unknown"
+
+def _qualified_name(code) -> str:
+    """Get Class.method style name for a code object when available (Python 3.11+)"""
+    return getattr(code, "co_qualname", code.co_name)
+
+# Global loop watchdog instance
+loop_watchdog = LoopWatchdog(threshold=float(os.getenv("LOOP_LAG_THRESHOLD_MS", "250")) / 1000)
@@ -0,0 +1,107 @@
+"""
+Memory Introspection for Cybersecurity Learning Bot
+Tracks live View objects and reports tracemalloc usage per subsystem
+"""
+
+import os
+import tracemalloc
+import weakref
+from collections import Counter, deque
+from datetime import datetime
+
+# Bot modules are reported by name, everything else by top-level package
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class MemoryTracker:
+    def __init__(self, history: int = 24):
+        self.live_views = weakref.WeakSet()
+        self.history = deque(maxlen=history)
+        self._previous = None
+
+    def track_view(self, view):
+        """Register a View so it is counted while it is alive"""
+        self.live_views.add(view)
+
+    def view_counts(self) -> dict:
+        """Count live views by class: {name: (total, still listening)}"""
+        totals = Counter()
+        active = Counter()
+        for view in list(self.live_views):
+            name = type(view).__name__
+            totals[name] += 1
+            if not view.is_finished():
+                active[name] += 1
+        return {name: (count, active[name]) for name, count in totals.most_common()}
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1):
+        """Start tracing allocations (adds some CPU and memory overhead)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._previous = None
+
+    def stop(self):
+        """Stop tracing and drop stored snapshots"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._previous = None
+
+    def take_snapshot(self) -> dict:
+        """Take a snapshot and report usage per subsystem and growth since the last one"""
+        if not tracemalloc.is_tracing():
+            return {"error": "tracemalloc is not running"}
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+        subsystems = Counter()
+        for stat in snapshot.statistics("filename"):
+            subsystems[subsystem_for(stat.traceback[0].filename)] += stat.size
+
+        growth = []
+        if self._previous is not None:
+            for stat in snapshot.compare_to(self._previous, "lineno")[:10]:
+                if stat.size_diff:
+                    frame = stat.traceback[0]
+                    growth.append((f"{os.path.basename(frame.filename)}:{frame.lineno}", stat.size_diff, stat.size))
+
+        current, peak = tracemalloc.get_traced_memory()
+        self.history.append((datetime.utcnow(), current))
+        self._previous = snapshot
+
+        return {
+            "current": current,
+            "peak": peak,
+            "subsystems": subsystems.most_common(),
+            "growth": growth,
+            "history": list(self.history)
+        }
+
+def subsystem_for(filename: str) -> str:
+    """Map a source file to the subsystem that owns its allocations"""
+    path = os.path.abspath(filename)
+    if os.path.dirname(path) == PROJECT_DIR:
+        return os.path.splitext(os.path.basename(path))[0]
+
+    parts = path.replace("\\", "/").split("/")
+    if "site-packages" in parts:
+        index = parts.index("site-packages")
+        if index + 1 < len(parts):
+            return os.path.splitext(parts[index + 1])[0]
+    return "stdlib/other"
+
+def format_bytes(size: int) -> str:
+    """Human readable byte count"""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+# Global memory tracker instance
+memory_tracker = MemoryTracker()
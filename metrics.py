@@ -0,0 +1,308 @@
+"""
+Metrics Registry for Cybersecurity Learning Bot
+Counters, latency histograms and gauges for commands, views and subsystems,
+served as Prometheus text on a local HTTP port
+"""
+
+import asyncio
+import os
+import time
+from discord.ui import View
+from memory import memory_tracker
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(label_names: tuple, label_values: tuple, extra: dict = None) -> str:
+    """Format a label set as {name="value",...}"""
+    pairs = list(zip(label_names, label_values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = [f'{name}="{str(value)}"'.replace("\n", " ") for name, value in pairs]
+    return "{" + ",".join(escaped) + "}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, *label_values) -> float:
+        return self.values.get(label_values, 0)
+
+    def render(self) -> list:
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}"
+                for key, value in sorted(self.values.items())]
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self.values = {}
+
+    def observe(self, value: float, *label_values):
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["counts"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def quantile(self, q: float, *label_values) -> float:
+        """Estimate a quantile as the upper bound of the bucket that contains it"""
+        series = self.values.get(label_values)
+        if not series or not series["count"]:
+            return 0.0
+
+        rank = q * series["count"]
+        for bound, count in zip(self.buckets, series["counts"]):
+            if count >= rank:
+                return bound
+        return float("inf")
+
+    def render(self) -> list:
+        lines = []
+        for key, series in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, series["counts"]):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, {'le': bound})} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, {'le': '+Inf'})} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series['count']}")
+        return lines
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, func=None, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.func = func
+        self.labels = labels
+        self.values = {}
+
+    def set(self, value: float, *label_values):
+        self.values[label_values] = value
+
+    def collect(self) -> dict:
+        """Get current values; callable gauges return a number or {label_values: number}"""
+        if self.func is None:
+            return dict(self.values)
+
+        try:
+            value = self.func()
+        except Exception as e:
+            print(f"Error collecting gauge {self.name}: {e}")
+            return {}
+        return value if isinstance(value, dict) else {(): value}
+
+    def render(self) -> list:
+        lines = []
+        for key, value in sorted(self.collect().items()):
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _get_or_create(self, metric_class, name: str, *args, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = metric_class(name, *args, **kwargs)
+        return metric
+
+    def counter(self, name: str, description: str, labels: tuple = ()) -> Counter:
+        return self._get_or_create(Counter, name, description, labels)
+
+    def histogram(self, name: str, description: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, labels, buckets)
+
+    def gauge(self, name: str, description: str, func=None, labels: tuple = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, description, func, labels)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f"# HELP {name} {metric.description}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Global metrics registry instance
+registry = MetricsRegistry()
+
+command_calls = registry.counter(
+    "bot_commands_total", "Prefix commands invoked", ("command", "status"))
+command_latency = registry.histogram(
+    "bot_command_duration_seconds", "Prefix command latency", ("command",))
+view_calls = registry.counter(
+    "bot_view_callbacks_total", "View component callbacks invoked", ("callback", "status"))
+view_latency = registry.histogram(
+    "bot_view_callback_duration_seconds", "View component callback latency", ("callback",))
+notification_results = registry.counter(
+    "bot_notifications_total", "Achievement DM notifications by outcome", ("result",))
+
+def instrument_bot(bot):
+    """Time every command (including cog commands) with global invoke hooks"""
+
+    @bot.before_invoke
+    async def start_command_timer(ctx):
+        ctx.metrics_started = time.perf_counter()
+
+    @bot.after_invoke
+    async def record_command(ctx):
+        started = getattr(ctx, "metrics_started", None)
+        if started is None or ctx.command is None:
+            return
+
+        name = ctx.command.qualified_name
+        command_latency.observe(time.perf_counter() - started, name)
+        command_calls.inc(name, "error" if ctx.command_failed else "ok")
+
+def register_bot_gauges(bot):
+    """Register gauges for the database, event loop and discord connection"""
+    from database import db
+    from loop_monitor import loop_watchdog
+    from courses import lesson_cache, content_store
+    from embed_cache import embed_cache
+    from notifications import notification_dispatcher
+    from achievements import achievement_manager
+    from quiz import quiz_sessions
+
+    registry.gauge("bot_db_connections_opened", "SQLite connections opened since start",
+                   lambda: db.connections_opened)
+    registry.gauge("bot_db_size_bytes", "Size of the SQLite database file",
+                   lambda: os.path.getsize(db.db_path) if os.path.exists(db.db_path) else 0)
+    registry.gauge("bot_event_loop_lag_ms", "Event loop scheduling lag percentiles",
+                   lambda: {(q,): v for q, v in loop_watchdog.get_lag_percentiles().items() if q != "samples"},
+                   ("quantile",))
+    registry.gauge("bot_event_loop_stalls", "Event loop stalls over the watchdog threshold",
+                   lambda: loop_watchdog.stall_count)
+    registry.gauge("bot_asyncio_tasks", "Pending asyncio tasks (scheduler queue depth)",
+                   lambda: len(asyncio.all_tasks(bot.loop)) if bot.is_ready() else 0)
+    registry.gauge("bot_gateway_latency_seconds", "Discord gateway heartbeat latency",
+                   lambda: bot.latency if bot.is_ready() else 0)
+    registry.gauge("bot_guilds", "Guilds the bot is in", lambda: len(bot.guilds))
+    registry.gauge("bot_lesson_cache_entries", "Parsed lessons held in the LRU cache",
+                   lambda: len(lesson_cache.data))
+    registry.gauge("bot_lesson_cache_requests", "Lesson cache lookups by result",
+                   lambda: {("hit",): lesson_cache.hits, ("miss",): lesson_cache.misses}, ("result",))
+    if content_store is not None:
+        registry.gauge("bot_content_store_bytes", "Lesson bytes held by the compact content store",
+                       lambda: {("raw",): content_store.raw_bytes, ("compressed",): content_store.compressed_bytes},
+                       ("size",))
+    registry.gauge("bot_embed_cache_requests", "Pre-built embed lookups by result",
+                   lambda: {("hit",): embed_cache.payloads.hits, ("miss",): embed_cache.payloads.misses}, ("result",))
+    registry.gauge("bot_achievement_page_cache_requests", "Cached !achievements page lookups by result",
+                   lambda: {("hit",): achievement_manager.pages.users.hits,
+                            ("miss",): achievement_manager.pages.users.misses}, ("result",))
+    registry.gauge("bot_quiz_sessions", "Module quiz sessions in progress",
+                   lambda: len(quiz_sessions.sessions))
+    registry.gauge("bot_notification_queue_depth", "Users with an achievement DM waiting to be sent",
+                   lambda: notification_dispatcher.queue_depth)
+    registry.gauge("bot_notification_closed_dms", "Users skipped because their DMs are closed",
+                   lambda: len(notification_dispatcher.closed_dms))
+    registry.gauge("bot_live_views", "View objects still in memory",
+                   lambda: {(name,): total for name, (total, _) in memory_tracker.view_counts().items()},
+                   ("view",))
+
+def timed_callback(name: str, callback):
+    """Wrap a component callback so it is counted and timed as `name`"""
+
+    async def timed(interaction):
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return await callback(interaction)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            view_latency.observe(time.perf_counter() - started, name)
+            view_calls.inc(name, status)
+
+    timed.instrumented = True
+    return timed
+
+class InstrumentedView(View):
+    """View whose component callbacks are counted and timed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        memory_tracker.track_view(self)
+        for item in self.children:
+            self._instrument(item)
+
+    def add_item(self, item):
+        self._instrument(item)
+        return super().add_item(item)
+
+    def _instrument(self, item):
+        callback = getattr(item, "callback", None)
+        if callback is None or getattr(callback, "instrumented", False):
+            return
+
+        func = getattr(callback, "callback", callback)
+        name = f"{type(self).__name__}.{getattr(func, '__name__', 'callback')}"
+        item.callback = timed_callback(name, callback)
+
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        """Start serving /metrics (safe to call on every on_ready)"""
+        if self._server is not None or not self.port:
+            return
+
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            print(f"📈 Metrics available at http://{self.host}:{self.port}/metrics")
+        except OSError as e:
+            print(f"❌ Failed to start metrics server: {e}")
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain the request headers
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/", "/metrics"):
+                status, body = "200 OK", self.registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+# Global metrics server instance (METRICS_PORT=0 disables it)
+metrics_server = MetricsServer(registry, port=int(os.getenv("METRICS_PORT", "9108")))
@@ -0,0 +1,180 @@
+"""
+Notification Dispatcher for Cybersecurity Learning Bot
+Sends achievement DMs from a background queue, coalescing awards per user
+and skipping users whose DMs are closed
+"""
+
+import asyncio
+import os
+import time
+import discord
+from metrics import notification_results
+
+# Discord allows at most 25 fields per embed
+MAX_FIELDS = 25
+
+class NotificationDispatcher:
+    def __init__(self, coalesce_delay: float = 2.0, min_interval: float = 0.5, closed_ttl: float = 6 * 3600):
+        self.coalesce_delay = coalesce_delay
+        self.min_interval = min_interval
+        self.closed_ttl = closed_ttl
+        self.pending = {}
+        self.closed_dms = {}
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._last_send = 0.0
+        self._last_prune = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.pending)
+
+    def start(self):
+        """Start the delivery worker (safe to call on every on_ready)"""
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def close(self, timeout: float = 5.0):
+        """Stop the worker and try to send pending DMs; whatever is left is counted as dropped"""
+        self.stop()
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        if self.pending:
+            notification_results.inc("dropped", amount=len(self.pending))
+            print(f"⚠️ Dropped {len(self.pending)} achievement DMs on shutdown")
+            self.pending.clear()
+
+    async def _drain(self):
+        for user_id in list(self.pending):
+            entry = self.pending.get(user_id)
+            if entry is None:
+                continue
+            entry["due"] = 0
+            try:
+                await self._deliver(user_id)
+            except Exception as e:
+                notification_results.inc("failed")
+                print(f"Error sending notification to {user_id}: {e}")
+
+    def prune_closed(self):
+        """Forget closed-DM entries that have expired"""
+        now = time.monotonic()
+        self._last_prune = now
+        for user_id in [user_id for user_id, expires in self.closed_dms.items() if expires < now]:
+            del self.closed_dms[user_id]
+
+    def dms_closed(self, user_id: int) -> bool:
+        """Whether a recent DM to this user was refused"""
+        expires = self.closed_dms.get(user_id)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del self.closed_dms[user_id]
+            return False
+        return True
+
+    def notify_achievements(self, user, achievements: list):
+        """Queue an achievement DM; awards for the same user within the delay share one message"""
+        if not achievements:
+            return
+        if self.dms_closed(user.id):
+            notification_results.inc("skipped_closed")
+            return
+
+        entry = self.pending.get(user.id)
+        if entry is not None:
+            entry["achievements"].extend(achievements)
+            notification_results.inc("coalesced")
+            return
+
+        self.pending[user.id] = {"user": user, "achievements": list(achievements), "due": time.monotonic() + self.coalesce_delay}
+        self._queue.put_nowait(user.id)
+
+    def build_embed(self, achievements: list) -> discord.Embed:
+        """One DM embed listing every achievement unlocked since the last message"""
+        title = "🏆 Achievement Unlocked!" if len(achievements) == 1 else f"🏆 {len(achievements)} Achievements Unlocked!"
+        embed = discord.Embed(title=title, color=0xFFD700)
+        for achievement in achievements[:MAX_FIELDS]:
+            embed.add_field(
+                name=achievement["name"],
+                value=f"{achievement['description']}\n+{achievement['xp_bonus']} Bonus XP",
+                inline=False
+            )
+        if len(achievements) > MAX_FIELDS:
+            embed.set_footer(text=f"...and {len(achievements) - MAX_FIELDS} more! Use !achievements to see them all.")
+        return embed
+
+    async def _run(self):
+        while True:
+            try:
+                user_id = await asyncio.wait_for(self._queue.get(), timeout=60)
+            except asyncio.TimeoutError:
+                user_id = None
+            if time.monotonic() - self._last_prune >= 60:
+                self.prune_closed()
+            if user_id is None:
+                continue
+
+            try:
+                await self._deliver(user_id)
+            except Exception as e:
+                notification_results.inc("failed")
+                print(f"Error sending notification to {user_id}: {e}")
+
+    async def _deliver(self, user_id: int):
+        entry = self.pending.get(user_id)
+        if entry is None:
+            return
+
+        # Wait out the coalescing window and the global pacing between DMs
+        now = time.monotonic()
+        wait = max(entry["due"] - now, self._last_send + self.min_interval - now)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        del self.pending[user_id]
+        self._last_send = time.monotonic()
+        try:
+            await entry["user"].send(embed=self.build_embed(entry["achievements"]))
+            notification_results.inc("sent")
+        except discord.Forbidden:
+            # DMs closed or no shared guild; don't retry until the entry expires
+            self.closed_dms[user_id] = time.monotonic() + self.closed_ttl
+            notification_results.inc("skipped_closed")
+        except discord.HTTPException as e:
+            if e.status != 429:
+                raise
+            # discord.py already retried the route; back off and requeue the same message
+            retry_after = getattr(e, "retry_after", None) or 5.0
+            self._requeue(entry, retry_after)
+            notification_results.inc("rate_limited")
+
+    def _requeue(self, entry: dict, delay: float):
+        user_id = entry["user"].id
+        pending = self.pending.get(user_id)
+        if pending is not None:
+            # New awards arrived meanwhile; deliver them together
+            entry["achievements"].extend(pending["achievements"])
+            self.pending[user_id] = {**entry, "due": time.monotonic() + delay}
+            return
+        self.pending[user_id] = {**entry, "due": time.monotonic() + delay}
+        self._queue.put_nowait(user_id)
+
+# Global notification dispatcher instance
+notification_dispatcher = NotificationDispatcher(
+    coalesce_delay=float(os.getenv("NOTIFY_COALESCE_SECONDS", "2")),
+    min_interval=float(os.getenv("NOTIFY_MIN_INTERVAL", "0.5"))
+)
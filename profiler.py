@@ -0,0 +1,103 @@
+"""
+Sampling Profiler for Cybersecurity Learning Bot
+Periodically samples every thread's stack to build flamegraph-ready output
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Top-of-stack frames that mean a thread is parked waiting, not doing work:
+# the event loop's selector, lock/condition waits and idle executor workers
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.lock = threading.Lock()
+        self.stacks = Counter()
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.duration = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+    def run(self, seconds: float) -> bool:
+        """Sample all threads for the given window (call from a background thread)"""
+        if not self.lock.acquire(blocking=False):
+            return False
+
+        try:
+            self.stacks.clear()
+            self.self_counts.clear()
+            self.total_counts.clear()
+            self.samples = 0
+            self.idle_samples = 0
+
+            own_thread = threading.get_ident()
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            started = time.perf_counter()
+            deadline = started + seconds
+
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    if self._is_idle(frame):
+                        self.idle_samples += 1
+                    else:
+                        self._record(thread_names.get(thread_id, str(thread_id)), frame)
+                self.samples += 1
+                time.sleep(self.interval)
+
+            self.duration = time.perf_counter() - started
+            return True
+        finally:
+            self.lock.release()
+
+    def _is_idle(self, frame) -> bool:
+        """Whether the thread is blocked in a known wait rather than running code"""
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+    def _record(self, thread_name: str, frame):
+        """Add one stack sample"""
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}")
+            frame = frame.f_back
+
+        if not names:
+            return
+
+        names.reverse()
+        self.stacks[";".join([thread_name] + names)] += 1
+        self.self_counts[names[-1]] += 1
+        for name in set(names):
+            self.total_counts[name] += 1
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format used by flamegraph.pl and speedscope"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top_functions(self, limit: int = 10) -> list:
+        """Functions with the most samples on top of the stack: (name, self, total)"""
+        return [(name, count, self.total_counts[name])
+                for name, count in self.self_counts.most_common(limit)]
+
+# Global sampler instance
+stack_sampler = StackSampler()
@@ -4,259 +4,673 @@ Handles quiz creation, user interactions, and scoring
 """
 
 import discord
-from discord.ui import Button, View
+from discord.ui import Button, DynamicItem, View
 import asyncio
+import os
 import random
+import secrets
+import time
+from datetime import timedelta
 from database import db
-from achievements import achievement_manager
-from courses import get_lesson
+from achievements import achievement_manager, XPChanged, PerfectQuizRecorded, StreakExtended
+from courses import get_catalog, LRUCache
+from metrics import timed_callback
 
-class QuizView(View):
-    def __init__(self, quiz_data: dict, user_id: int, course_id: int, module_id: int, lesson_id: int):
-        super().__init__(timeout=300)  # 5 minute timeout
-        self.quiz_data = quiz_data
+# How long a lesson quiz accepts answers (enforced from the message age,
+# since the buttons themselves never time out)
+LESSON_QUIZ_TIMEOUT = 300
+
+# Module quiz sessions stay resumable this long after their last answer
+QUIZ_SESSION_TTL = float(os.getenv("QUIZ_SESSION_TTL", str(24 * 3600)))
+
+# Finished sessions are kept this long after finishing, then deleted with their answers
+QUIZ_SESSION_RETENTION = float(os.getenv("QUIZ_SESSION_RETENTION", str(7 * 24 * 3600)))
+
+# Idle sessions are dropped from memory after this long (they stay in the database)
+QUIZ_SESSION_IDLE = 600
+
+class QuizSession:
+    """Compact state of a module quiz: question order as lesson ids, answers as option indexes"""
+    __slots__ = ("user_id", "course_id", "module_id", "lessons", "answers", "score", "content_version",
+                 "started", "updated", "finished")
+    
+    def __init__(self, user_id: int, course_id: int, module_id: int, lessons: tuple,
+                 content_version: str = None, started: float = None):
         self.user_id = user_id
         self.course_id = course_id
         self.module_id = module_id
-        self.lesson_id = lesson_id
-        self.answered = False
-        self.correct_answer = quiz_data["correct"]
-        
-        # Create buttons for each option
-        for i, option in enumerate(quiz_data["options"]):
-            button = Button(
-                label=f"{chr(65 + i)}. {option}",  # A, B, C, D
-                style=discord.ButtonStyle.secondary,
-                custom_id=f"quiz_option_{i}"
-            )
-            button.callback = self.create_callback(i)
-            self.add_item(button)
-    
-    def create_callback(self, option_index: int):
-        """Create callback function for quiz option button"""
-        async def callback(interaction: discord.Interaction):
-            if interaction.user.id != self.user_id:
-                await interaction.response.send_message(
-                    "❌ This isn't your quiz! Use `!quiz` to start your own.",
-                    ephemeral=True
-                )
-                return
-            
-            if self.answered:
-                await interaction.response.send_message(
-                    "❌ You've already answered this quiz!",
-                    ephemeral=True
-                )
-                return
-            
-            self.answered = True
-            
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
-            
-            # Check if answer is correct
-            is_correct = option_index == self.correct_answer
-            
-            # Create response embed
-            if is_correct:
-                embed = discord.Embed(
-                    title="✅ Correct!",
-                    description=f"**Great job!** {self.quiz_data['explanation']}",
-                    color=0x00FF00
-                )
-                xp_earned = 100
-                db.add_xp(self.user_id, xp_earned)
-                embed.add_field(
-                    name="XP Earned",
-                    value=f"+{xp_earned} XP",
-                    inline=True
-                )
-                
-                # Record perfect quiz attempt
-                db.record_quiz_attempt(
-                    self.user_id, self.course_id, self.module_id, 
-                    self.lesson_id, 1, 1
-                )
-                
-                # Check for achievements
-                new_achievements = achievement_manager.check_and_award_achievements(
-                    self.user_id, "perfect_quiz"
-                )
-                
-                if new_achievements:
-                    achievement_text = "\n".join([f"🏆 {ach['name']}" for ach in new_achievements])
-                    embed.add_field(
-                        name="New Achievements!",
-                        value=achievement_text,
-                        inline=False
-                    )
-            else:
-                embed = discord.Embed(
-                    title="❌ Incorrect",
-                    description=f"The correct answer was **{chr(65 + self.correct_answer)}. {self.quiz_data['options'][self.correct_answer]}**\n\n{self.quiz_data['explanation']}",
-                    color=0xFF0000
-                )
-                embed.add_field(
-                    name="Keep Learning!",
-                    value="Review the lesson material and try again later.",
-                    inline=False
-                )
-                
-                # Record failed quiz attempt
-                db.record_quiz_attempt(
-                    self.user_id, self.course_id, self.module_id,
-                    self.lesson_id, 0, 1
-                )
-            
-            # Update the message with results
-            await interaction.response.edit_message(embed=embed, view=self)
+        self.lessons = lessons
+        self.answers = bytearray()
+        self.score = 0
+        self.content_version = content_version
+        self.started = started or time.time()
+        self.updated = self.started
+        self.finished = False
+    
+    @property
+    def expired(self) -> bool:
+        return time.time() - self.updated > QUIZ_SESSION_TTL
+    
+    def row(self, session_id: str) -> tuple:
+        """Row for db.save_quiz_sessions"""
+        return (session_id, self.user_id, self.course_id, self.module_id, ",".join(map(str, self.lessons)),
+                self.score, self.content_version, self.started, self.updated, int(self.finished))
+    
+    @classmethod
+    def from_row(cls, row: tuple):
+        """Rebuild a session from db.load_quiz_session"""
+        _, user_id, course_id, module_id, lessons, score, content_version, started, updated, finished, answers = row
+        session = cls(user_id, course_id, module_id, tuple(int(lesson) for lesson in lessons.split(",")),
+                      content_version, started)
+        session.answers = bytearray(int(answer) for answer in answers.split(",")) if answers else bytearray()
+        session.score = score
+        session.updated = updated
+        session.finished = bool(finished)
+        return session
+
+class QuizSessionStore:
+    """Module quiz sessions by id, kept in memory and written to SQLite in batches
+    
+    Everything else a click needs is in the button's custom_id. New sessions
+    are written right away; answers are buffered and flushed when
+    `batch_size` are pending, when a quiz finishes, by the sweeper every
+    `interval` seconds and on shutdown (see close()). A session not in
+    memory (e.g. after a restart) is loaded back from the database.
+    """
+    
+    def __init__(self, interval: float = 30.0, batch_size: int = 50):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.sessions = {}
+        self.dirty = set()
+        self.pending_answers = []
+        self.swept = 0
+        self._task = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        """Start the flush/sweep task (safe to call on every on_ready)"""
+        if self.running or not self.interval:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+    
+    def create(self, user_id: int, course_id: int, module_id: int, lessons: list, content_version: str = None) -> tuple:
+        """Start a session; returns (session_id, session)"""
+        session_id = secrets.token_hex(6)
+        session = self.sessions[session_id] = QuizSession(user_id, course_id, module_id, tuple(lessons), content_version)
+        self.dirty.add(session_id)
+        self.flush()
+        return session_id, session
+    
+    def get(self, session_id: str):
+        """Session by id (loaded from the database if needed), or None if it finished or expired"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            row = db.load_quiz_session(session_id)
+            if row is None:
+                return None
+            session = self.sessions[session_id] = QuizSession.from_row(row)
+        
+        if session.finished or session.expired:
+            return None
+        return session
+    
+    def latest_for_user(self, user_id: int):
+        """(session_id, session) of the user's most recently used unfinished quiz, or None"""
+        in_memory = [(session.updated, session_id) for session_id, session in self.sessions.items()
+                     if session.user_id == user_id and not session.finished and not session.expired]
+        if in_memory:
+            session_id = max(in_memory)[1]
+        else:
+            session_id = db.get_resumable_quiz_session(user_id, time.time() - QUIZ_SESSION_TTL)
         
-        return callback
+        session = self.get(session_id) if session_id else None
+        return (session_id, session) if session else None
     
-    async def on_timeout(self):
-        """Handle quiz timeout"""
-        for item in self.children:
-            item.disabled = True
+    def record_answer(self, session_id: str, session: QuizSession, option: int, is_correct: bool):
+        """Add an answer to the session and queue it for the next batch"""
+        session.answers.append(option)
+        if is_correct:
+            session.score += 1
+        session.updated = time.time()
+        self.dirty.add(session_id)
+        self.pending_answers.append((session_id, len(session.answers) - 1, option, int(is_correct)))
+        if len(self.pending_answers) >= self.batch_size:
+            self.flush()
+    
+    def finish(self, session_id: str, session: QuizSession):
+        """Close a session and write it (with any buffered answers) right away
+        
+        If the write fails the session stays in memory, marked finished, so
+        the next flush retries it and it can't be resumed meanwhile.
+        """
+        session.finished = True
+        session.updated = time.time()
+        self.dirty.add(session_id)
+        if self.flush():
+            self.sessions.pop(session_id, None)
+    
+    def _take_batch(self) -> tuple:
+        rows = [self.sessions[session_id].row(session_id) for session_id in self.dirty if session_id in self.sessions]
+        answers = self.pending_answers
+        self.dirty = set()
+        self.pending_answers = []
+        return rows, answers
+    
+    def _restore_batch(self, rows: list, answers: list):
+        """Put a batch that failed to write back in the queue"""
+        self.dirty.update(row[0] for row in rows)
+        self.pending_answers = answers + self.pending_answers
+    
+    def close(self):
+        """Stop the sweeper and write everything still buffered (call on shutdown)"""
+        self.stop()
+        if not self.flush():
+            print(f"❌ Could not save {len(self.dirty)} quiz sessions and {len(self.pending_answers)} answers on shutdown")
+    
+    def flush(self) -> bool:
+        """Write buffered sessions and answers in one transaction"""
+        rows, answers = self._take_batch()
+        if not rows and not answers:
+            return True
+        if db.save_quiz_sessions(rows, answers):
+            return True
+        self._restore_batch(rows, answers)
+        return False
+    
+    async def sweep(self) -> int:
+        """Flush buffered writes, delete expired sessions and drop idle ones from memory"""
+        rows, answers = self._take_batch()
+        if (rows or answers) and not await asyncio.to_thread(db.save_quiz_sessions, rows, answers):
+            self._restore_batch(rows, answers)
+        
+        now = time.time()
+        deleted = await asyncio.to_thread(db.delete_expired_quiz_sessions, now - QUIZ_SESSION_TTL,
+                                          now - QUIZ_SESSION_RETENTION)
+        self.swept += deleted
+        
+        idle_before = time.time() - QUIZ_SESSION_IDLE
+        for session_id in [session_id for session_id, session in self.sessions.items()
+                           if (session.updated < idle_before or session.finished) and session_id not in self.dirty]:
+            del self.sessions[session_id]
+        return deleted
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Error sweeping quiz sessions: {e}")
+
+# Global quiz session store instance (QUIZ_SESSION_FLUSH_INTERVAL=0 disables background flushes)
+quiz_sessions = QuizSessionStore(interval=float(os.getenv("QUIZ_SESSION_FLUSH_INTERVAL", "30")))
 
-class MultiQuizView(View):
-    def __init__(self, questions: list, user_id: int, course_id: int, module_id: int, lesson_id: int):
-        super().__init__(timeout=600)  # 10 minute timeout
-        self.questions = questions
+def _components(*items) -> View:
+    """Container for persistent items; stopped so discord.py doesn't keep a copy per message"""
+    view = View(timeout=None)
+    for item in items:
+        view.add_item(item)
+    view.stop()
+    return view
+
+class QuizOptionButton(DynamicItem[Button], template=r"quiz:(?P<user_id>\d+):(?P<course_id>\d+):(?P<module_id>\d+):(?P<lesson_id>\d+):(?P<option>\d+):(?P<version>[0-9a-f]+)"):
+    """Answer button of a lesson quiz, routed by its custom_id after restarts too
+    
+    The custom_id carries the content version the quiz was shown from, so the
+    answer is graded against that question and not a reloaded one.
+    """
+    
+    def __init__(self, user_id: int, course_id: int, module_id: int, lesson_id: int, option: int, version: str,
+                 label: str = None, style: discord.ButtonStyle = discord.ButtonStyle.secondary, disabled: bool = False):
+        super().__init__(Button(
+            label=label or f"{chr(65 + option)}.",
+            style=style,
+            disabled=disabled,
+            custom_id=f"quiz:{user_id}:{course_id}:{module_id}:{lesson_id}:{option}:{version}"
+        ))
         self.user_id = user_id
         self.course_id = course_id
         self.module_id = module_id
         self.lesson_id = lesson_id
-        self.current_question = 0
-        self.score = 0
-        self.answers = []
-        
-        # Create option buttons
-        for i in range(4):  # Assuming max 4 options
-            button = Button(
-                label=f"{chr(65 + i)}.",  # A, B, C, D
-                style=discord.ButtonStyle.secondary,
-                custom_id=f"multi_quiz_option_{i}",
-                row=0
+        self.option = option
+        self.version = version
+        self.callback = timed_callback("QuizOptionButton.callback", self.callback)
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(int(match["user_id"]), int(match["course_id"]), int(match["module_id"]), int(match["lesson_id"]),
+                   int(match["option"]), match["version"], label=item.label)
+    
+    async def callback(self, interaction: discord.Interaction):
+        await quiz_manager.answer_lesson_quiz(interaction, self.user_id, self.course_id, self.module_id,
+                                              self.lesson_id, self.option, self.version)
+
+class ModuleQuizButton(DynamicItem[Button], template=r"mquiz:(?P<session_id>[0-9a-f]+):(?P<user_id>\d+):(?P<course_id>\d+):(?P<module_id>\d+):(?P<lesson_id>\d+):(?P<question>\d+):(?P<action>\d+|next|finish)"):
+    """Option or navigation button of a module quiz, routed by its custom_id"""
+    
+    def __init__(self, session_id: str, user_id: int, course_id: int, module_id: int, lesson_id: int,
+                 question: int, action: str, label: str = None,
+                 style: discord.ButtonStyle = discord.ButtonStyle.secondary, disabled: bool = False, row: int = None):
+        if label is None:
+            label = {"next": "Next Question ➡️", "finish": "Finish Quiz 🏁"}.get(action) or f"{chr(65 + int(action))}."
+        super().__init__(Button(
+            label=label,
+            style=style,
+            disabled=disabled,
+            row=row,
+            custom_id=f"mquiz:{session_id}:{user_id}:{course_id}:{module_id}:{lesson_id}:{question}:{action}"
+        ))
+        self.session_id = session_id
+        self.user_id = user_id
+        self.course_id = course_id
+        self.module_id = module_id
+        self.lesson_id = lesson_id
+        self.question = question
+        self.action = action
+        self.callback = timed_callback("ModuleQuizButton.callback", self.callback)
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(match["session_id"], int(match["user_id"]), int(match["course_id"]), int(match["module_id"]),
+                   int(match["lesson_id"]), int(match["question"]), match["action"], label=item.label)
+    
+    async def callback(self, interaction: discord.Interaction):
+        await quiz_manager.handle_module_quiz_click(interaction, self)
+
+def _options_text(options: list) -> str:
+    return "".join(f"**{chr(65 + i)}.** {option}\n" for i, option in enumerate(options))
+
+class QuizManager:
+    def __init__(self):
+        self.db = db
+        # Lesson quiz messages already answered (guards against double clicks)
+        self.answered = LRUCache(1024)
+        # Catalog snapshots quizzes were shown from, by content version
+        self.snapshots = LRUCache(16)
+    
+    def _snapshot(self, version: str):
+        """Catalog a quiz was shown from, or None if that content is no longer available
+        
+        That is the current catalog while its version matches, otherwise a
+        recent snapshot still held in memory.
+        """
+        catalog = get_catalog()
+        if catalog.version == version:
+            return catalog
+        return self.snapshots.get(version)
+    
+    def lesson_quiz_components(self, user_id: int, course_id: int, module_id: int, lesson_id: int, quiz_data: dict,
+                               version: str, chosen: int = None) -> View:
+        """Answer buttons of a lesson quiz; after an answer they are disabled and colored"""
+        buttons = []
+        for i, option in enumerate(quiz_data["options"]):
+            style = discord.ButtonStyle.secondary
+            if chosen is not None and i == quiz_data["correct"]:
+                style = discord.ButtonStyle.success
+            elif chosen is not None and i == chosen:
+                style = discord.ButtonStyle.danger
+            buttons.append(QuizOptionButton(user_id, course_id, module_id, lesson_id, i, version,
+                                            label=f"{chr(65 + i)}. {option}"[:80], style=style,
+                                            disabled=chosen is not None))
+        return _components(*buttons)
+    
+    async def start_lesson_quiz(self, ctx, course_id: int, module_id: int, lesson_id: int, user_id: int = None):
+        """Start a quiz for a specific lesson (`ctx` may be an interaction followup, then pass user_id)"""
+        user_id = user_id or ctx.author.id
+        catalog = get_catalog()
+        self.snapshots.put(catalog.version, catalog)
+        lesson = catalog.get_lesson(course_id, module_id, lesson_id)
+        
+        if not lesson or "quiz" not in lesson:
+            embed = discord.Embed(
+                title="❌ No Quiz Available",
+                description="This lesson doesn't have a quiz yet.",
+                color=0xFF0000
             )
-            button.callback = self.create_option_callback(i)
-            self.add_item(button)
-        
-        # Add navigation buttons
-        self.next_button = Button(
-            label="Next Question ➡️",
-            style=discord.ButtonStyle.primary,
-            custom_id="next_question",
-            disabled=True,
-            row=1
+            await ctx.send(embed=embed)
+            return
+        
+        quiz_data = lesson["quiz"]
+        
+        # Create quiz embed
+        embed = discord.Embed(
+            title=f"❓ {lesson['title']} - Quiz",
+            description=quiz_data["question"],
+            color=0x0099FF
         )
-        self.next_button.callback = self.next_question
-        self.add_item(self.next_button)
-        
-        self.finish_button = Button(
-            label="Finish Quiz 🏁",
-            style=discord.ButtonStyle.success,
-            custom_id="finish_quiz",
-            disabled=True,
-            row=1
+        
+        embed.add_field(
+            name="Choose your answer:",
+            value=_options_text(quiz_data["options"]),
+            inline=False
         )
-        self.finish_button.callback = self.finish_quiz
-        self.add_item(self.finish_button)
-    
-    def create_option_callback(self, option_index: int):
-        """Create callback for option selection"""
-        async def callback(interaction: discord.Interaction):
-            if interaction.user.id != self.user_id:
-                await interaction.response.send_message(
-                    "❌ This isn't your quiz!",
-                    ephemeral=True
-                )
-                return
-            
-            # Record answer
-            current_q = self.questions[self.current_question]
-            is_correct = option_index == current_q["correct"]
-            
-            self.answers.append({
-                "question_index": self.current_question,
-                "selected": option_index,
-                "correct": current_q["correct"],
-                "is_correct": is_correct
-            })
-            
-            if is_correct:
-                self.score += 1
+        
+        embed.set_footer(text="You have 5 minutes to answer!")
+        
+        await ctx.send(embed=embed, view=self.lesson_quiz_components(user_id, course_id, module_id, lesson_id, quiz_data,
+                                                                          catalog.version))
+    
+    async def answer_lesson_quiz(self, interaction: discord.Interaction, user_id: int, course_id: int,
+                                 module_id: int, lesson_id: int, option: int, version: str):
+        """Grade a lesson quiz answer decoded from the button's custom_id"""
+        if interaction.user.id != user_id:
+            await interaction.response.send_message(
+                "❌ This isn't your quiz! Use `!quiz` to start your own.",
+                ephemeral=True
+            )
+            return
+        
+        message_id = interaction.message.id if interaction.message else None
+        if message_id is not None and self.answered.get(message_id):
+            await interaction.response.send_message(
+                "❌ You've already answered this quiz!",
+                ephemeral=True
+            )
+            return
+        
+        if interaction.message and discord.utils.utcnow() - interaction.message.created_at > timedelta(seconds=LESSON_QUIZ_TIMEOUT):
+            await interaction.response.send_message(
+                "⏰ This quiz has expired. Use `!quiz` to try again!",
+                ephemeral=True
+            )
+            return
+        
+        # Grade against the content the question was shown from
+        catalog = self._snapshot(version)
+        if catalog is None:
+            await interaction.response.send_message(
+                "❌ This quiz's content changed. Use `!quiz` to start a new one.",
+                ephemeral=True
+            )
+            return
+        
+        lesson = catalog.get_lesson(course_id, module_id, lesson_id)
+        if not lesson or "quiz" not in lesson or option >= len(lesson["quiz"]["options"]):
+            await interaction.response.send_message(
+                "❌ This quiz is no longer available. Use `!quiz` to start a new one.",
+                ephemeral=True
+            )
+            return
+        
+        if message_id is not None:
+            self.answered.put(message_id, True)
+        
+        quiz_data = lesson["quiz"]
+        correct_answer = quiz_data["correct"]
+        is_correct = option == correct_answer
+        
+        # Create response embed
+        if is_correct:
+            embed = discord.Embed(
+                title="✅ Correct!",
+                description=f"**Great job!** {quiz_data['explanation']}",
+                color=0x00FF00
+            )
+            xp_earned = 100
+            new_xp = db.add_xp(user_id, xp_earned)
+            embed.add_field(
+                name="XP Earned",
+                value=f"+{xp_earned} XP",
+                inline=True
+            )
             
-            # Disable option buttons and enable next/finish
-            for item in self.children[:4]:  # First 4 are option buttons
-                item.disabled = True
-                if item.custom_id == f"multi_quiz_option_{option_index}":
-                    item.style = discord.ButtonStyle.success if is_correct else discord.ButtonStyle.danger
+            # Record perfect quiz attempt
+            perfect_quizzes = db.record_quiz_attempt(
+                user_id, course_id, module_id, lesson_id, 1, 1, catalog.version
+            )
             
-            # Enable appropriate navigation button
-            if self.current_question < len(self.questions) - 1:
-                self.next_button.disabled = False
-            else:
-                self.finish_button.disabled = False
+            # Check for achievements
+            new_achievements = achievement_manager.apply_deltas(user_id, [
+                XPChanged(new_xp - xp_earned, new_xp),
+                PerfectQuizRecorded(perfect_quizzes)
+            ] + self._streak_deltas(user_id))
+        else:
+            embed = discord.Embed(
+                title="❌ Incorrect",
+                description=f"The correct answer was **{chr(65 + correct_answer)}. {quiz_data['options'][correct_answer]}**\n\n{quiz_data['explanation']}",
+                color=0xFF0000
+            )
+            embed.add_field(
+                name="Keep Learning!",
+                value="Review the lesson material and try again later.",
+                inline=False
+            )
             
-            # Show immediate feedback
-            feedback = "✅ Correct!" if is_correct else f"❌ Incorrect. The answer was {chr(65 + current_q['correct'])}."
+            # Record failed quiz attempt
+            db.record_quiz_attempt(
+                user_id, course_id, module_id, lesson_id, 0, 1, catalog.version
+            )
             
-            embed = self.create_question_embed()
+            # Trying still counts towards the daily streak
+            new_achievements = achievement_manager.apply_deltas(user_id, self._streak_deltas(user_id))
+        
+        if new_achievements:
             embed.add_field(
-                name="Answer",
-                value=feedback,
+                name="New Achievements!",
+                value="\n".join([f"🏆 {ach['name']}" for ach in new_achievements]),
                 inline=False
             )
-            
-            await interaction.response.edit_message(embed=embed, view=self)
         
-        return callback
+        # Update the message with results
+        view = self.lesson_quiz_components(user_id, course_id, module_id, lesson_id, quiz_data, version, chosen=option)
+        await interaction.response.edit_message(embed=embed, view=view)
     
-    async def next_question(self, interaction: discord.Interaction):
-        """Move to next question"""
-        if interaction.user.id != self.user_id:
-            await interaction.response.send_message(
-                "❌ This isn't your quiz!",
-                ephemeral=True
+    def _streak_deltas(self, user_id: int) -> list:
+        """Record today's activity; a StreakExtended delta on the first activity of the day"""
+        streak = db.record_activity(user_id)
+        return [StreakExtended(streak)] if streak else []
+    
+    async def start_module_quiz(self, ctx, course_id: int, module_id: int):
+        """Start a comprehensive quiz for a module"""
+        catalog = get_catalog()
+        course = catalog.courses.get(course_id)
+        module = course["modules"].get(module_id) if course else None
+        if not module:
+            embed = discord.Embed(
+                title="❌ Module Not Found",
+                description="Could not find the specified module.",
+                color=0xFF0000
             )
+            await ctx.send(embed=embed)
             return
         
-        self.current_question += 1
+        # Collect the lessons of this module that have a quiz
+        lessons = []
+        for lesson_id in module["lessons"]:
+            lesson = catalog.get_lesson(course_id, module_id, lesson_id)
+            if lesson and "quiz" in lesson:
+                lessons.append(lesson_id)
         
-        # Reset buttons for next question
-        for item in self.children[:4]:  # Option buttons
-            item.disabled = False
-            item.style = discord.ButtonStyle.secondary
+        if not lessons:
+            embed = discord.Embed(
+                title="❌ No Quizzes Available",
+                description="This module doesn't have any quizzes yet.",
+                color=0xFF0000
+            )
+            await ctx.send(embed=embed)
+            return
         
-        self.next_button.disabled = True
-        self.finish_button.disabled = True
+        # Shuffle questions for variety
+        random.shuffle(lessons)
         
-        # Update question display
-        embed = self.create_question_embed()
-        await interaction.response.edit_message(embed=embed, view=self)
+        # Limit to 5 questions max for better UX
+        lessons = lessons[:5]
+        
+        # Create initial embed
+        embed = discord.Embed(
+            title=f"🎯 {module['title']} - Module Quiz",
+            description=f"Test your knowledge with {len(lessons)} questions from this module!",
+            color=0x0099FF
+        )
+        
+        embed.add_field(
+            name="Instructions",
+            value="• Answer each question by clicking the correct option\n• You'll see immediate feedback\n• Click 'Next' to continue or 'Finish' when done",
+            inline=False
+        )
+        
+        self.snapshots.put(catalog.version, catalog)
+        session_id, session = quiz_sessions.create(ctx.author.id, course_id, module_id, lessons, catalog.version)
+        
+        await ctx.send(embed=embed)
+        
+        # Start first question after a brief delay
+        await asyncio.sleep(2)
+        question = self._question(session, 0)
+        await ctx.send(embed=self.create_question_embed(session, 0, question),
+                       view=self.module_quiz_components(session_id, session, 0, question))
     
-    async def finish_quiz(self, interaction: discord.Interaction):
-        """Finish quiz and show results"""
-        if interaction.user.id != self.user_id:
+    async def resume_module_quiz(self, ctx):
+        """Re-send the current question of the user's unfinished module quiz"""
+        latest = quiz_sessions.latest_for_user(ctx.author.id)
+        if latest is None:
+            embed = discord.Embed(
+                title="❌ No Quiz to Resume",
+                description="You don't have an unfinished module quiz. Start one with `!quiz <course> <module>`!",
+                color=0xFF0000
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        session_id, session = latest
+        answered = len(session.answers)
+        
+        # Continue with the next unanswered question, or offer Finish once all are answered
+        index = min(answered, len(session.lessons) - 1)
+        question = self._question(session, index)
+        if question is None:
+            quiz_sessions.finish(session_id, session)
+            embed = discord.Embed(
+                title="❌ Quiz No Longer Available",
+                description="This quiz's content changed. Use `!quiz <course> <module>` to start a new one!",
+                color=0xFF0000
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        chosen = session.answers[index] if answered == len(session.lessons) else None
+        embed = self.create_question_embed(session, index, question)
+        embed.set_author(name="🔄 Resuming your module quiz")
+        await ctx.send(embed=embed, view=self.module_quiz_components(session_id, session, index, question, chosen=chosen))
+    
+    def _question(self, session: QuizSession, index: int):
+        """Quiz data of a session question from the content the session started on,
+        or None if that content or the question is gone"""
+        catalog = self._snapshot(session.content_version)
+        if catalog is None:
+            return None
+        lesson = catalog.get_lesson(session.course_id, session.module_id, session.lessons[index])
+        return lesson.get("quiz") if lesson else None
+    
+    def module_quiz_components(self, session_id: str, session: QuizSession, index: int, question: dict,
+                               chosen: int = None, finished: bool = False) -> View:
+        """Option and navigation buttons for one question of a module quiz"""
+        def button(action, **kwargs):
+            return ModuleQuizButton(session_id, session.user_id, session.course_id, session.module_id,
+                                    session.lessons[index], index, action, **kwargs)
+        
+        items = []
+        for i in range(len(question["options"])):
+            style = discord.ButtonStyle.secondary
+            if chosen == i:
+                style = discord.ButtonStyle.success if i == question["correct"] else discord.ButtonStyle.danger
+            items.append(button(str(i), style=style, disabled=chosen is not None or finished, row=0))
+        
+        answered = chosen is not None and not finished
+        last = index == len(session.lessons) - 1
+        items.append(button("next", style=discord.ButtonStyle.primary, disabled=not answered or last, row=1))
+        items.append(button("finish", style=discord.ButtonStyle.success, disabled=not answered or not last, row=1))
+        return _components(*items)
+    
+    async def handle_module_quiz_click(self, interaction: discord.Interaction, item: ModuleQuizButton):
+        """Route a module quiz button click decoded from its custom_id"""
+        if interaction.user.id != item.user_id:
             await interaction.response.send_message(
                 "❌ This isn't your quiz!",
                 ephemeral=True
             )
             return
         
-        # Disable all buttons
-        for item in self.children:
-            item.disabled = True
+        session = quiz_sessions.get(item.session_id)
+        if session is None:
+            await interaction.response.send_message(
+                "⏰ This quiz has expired. Use `!quiz <course> <module>` to start a new one!",
+                ephemeral=True
+            )
+            return
+        
+        # Each question's buttons are only valid while that question is the current step
+        answered = len(session.answers)
+        stale = (item.action.isdigit() and item.question != answered) or \
+                (item.action == "next" and item.question != answered - 1) or \
+                (item.action == "finish" and answered != len(session.lessons))
+        if stale:
+            await interaction.response.send_message(
+                "❌ You've already moved past this question!",
+                ephemeral=True
+            )
+            return
+        
+        index = item.question + 1 if item.action == "next" else item.question
+        question = self._question(session, index)
+        if question is None:
+            quiz_sessions.finish(item.session_id, session)
+            await interaction.response.send_message(
+                "❌ This quiz's content changed. Use `!quiz <course> <module>` to start a new one!",
+                ephemeral=True
+            )
+            return
+        
+        if item.action == "finish":
+            await self.finish_module_quiz(interaction, item.session_id, session, question)
+        elif item.action == "next":
+            embed = self.create_question_embed(session, index, question)
+            await interaction.response.edit_message(embed=embed, view=self.module_quiz_components(
+                item.session_id, session, index, question))
+        else:
+            await self.answer_module_question(interaction, item.session_id, session, index, question, int(item.action))
+    
+    async def answer_module_question(self, interaction: discord.Interaction, session_id: str,
+                                     session: QuizSession, index: int, question: dict, option: int):
+        """Record an answer and show immediate feedback"""
+        is_correct = option == question["correct"]
+        quiz_sessions.record_answer(session_id, session, option, is_correct)
+        
+        # Show immediate feedback
+        feedback = "✅ Correct!" if is_correct else f"❌ Incorrect. The answer was {chr(65 + question['correct'])}."
+        
+        embed = self.create_question_embed(session, index, question)
+        embed.add_field(
+            name="Answer",
+            value=feedback,
+            inline=False
+        )
+        
+        await interaction.response.edit_message(embed=embed, view=self.module_quiz_components(
+            session_id, session, index, question, chosen=option))
+    
+    async def finish_module_quiz(self, interaction: discord.Interaction, session_id: str,
+                                 session: QuizSession, question: dict):
+        """Finish quiz and show results"""
+        quiz_sessions.finish(session_id, session)
         
         # Calculate results
-        total_questions = len(self.questions)
-        percentage = (self.score / total_questions) * 100
+        total_questions = len(session.lessons)
+        percentage = (session.score / total_questions) * 100
         
         # Create results embed
         embed = discord.Embed(
             title="🎯 Quiz Complete!",
-            description=f"**Score: {self.score}/{total_questions} ({percentage:.1f}%)**",
+            description=f"**Score: {session.score}/{total_questions} ({percentage:.1f}%)**",
             color=0x00FF00 if percentage >= 70 else 0xFFAA00 if percentage >= 50 else 0xFF0000
         )
         
@@ -272,25 +686,24 @@ class MultiQuizView(View):
         
         # Award XP based on performance
         base_xp = 50
-        bonus_xp = self.score * 25
+        bonus_xp = session.score * 25
         total_xp = base_xp + bonus_xp
         
-        db.add_xp(self.user_id, total_xp)
+        new_xp = db.add_xp(session.user_id, total_xp)
         embed.add_field(name="XP Earned", value=f"+{total_xp} XP", inline=True)
         
         # Record quiz attempt
-        db.record_quiz_attempt(
-            self.user_id, self.course_id, self.module_id,
-            self.lesson_id, self.score, total_questions
+        perfect_quizzes = db.record_quiz_attempt(
+            session.user_id, session.course_id, session.module_id,
+            0, session.score, total_questions, session.content_version
         )
         
         # Check for achievements
-        achievement_types = ["perfect_quiz"] if self.score == total_questions else []
-        new_achievements = []
-        for ach_type in achievement_types:
-            new_achievements.extend(
-                achievement_manager.check_and_award_achievements(self.user_id, ach_type)
-            )
+        deltas = [XPChanged(new_xp - total_xp, new_xp)]
+        if session.score == total_questions:
+            deltas.append(PerfectQuizRecorded(perfect_quizzes))
+        deltas += self._streak_deltas(session.user_id)
+        new_achievements = achievement_manager.apply_deltas(session.user_id, deltas)
         
         if new_achievements:
             achievement_text = "\n".join([f"🏆 {ach['name']}" for ach in new_achievements])
@@ -300,222 +713,95 @@ class MultiQuizView(View):
                 inline=False
             )
         
-        await interaction.response.edit_message(embed=embed, view=self)
+        view = self.module_quiz_components(session_id, session, total_questions - 1, question, finished=True)
+        await interaction.response.edit_message(embed=embed, view=view)
     
-    def create_question_embed(self) -> discord.Embed:
-        """Create embed for current question"""
-        current_q = self.questions[self.current_question]
-        
+    def create_question_embed(self, session: QuizSession, index: int, question: dict) -> discord.Embed:
+        """Create embed for a module quiz question"""
         embed = discord.Embed(
-            title=f"❓ Question {self.current_question + 1}/{len(self.questions)}",
-            description=current_q["question"],
+            title=f"❓ Question {index + 1}/{len(session.lessons)}",
+            description=question["question"],
             color=0x0099FF
         )
         
-        # Add options
-        options_text = ""
-        for i, option in enumerate(current_q["options"]):
-            options_text += f"**{chr(65 + i)}.** {option}\n"
-        
         embed.add_field(
             name="Options",
-            value=options_text,
+            value=_options_text(question["options"]),
             inline=False
         )
         
         embed.add_field(
             name="Progress",
-            value=f"Score: {self.score}/{self.current_question} so far",
+            value=f"Score: {session.score}/{len(session.answers)} so far",
             inline=True
         )
         
         return embed
-
-class QuizManager:
-    def __init__(self):
-        self.db = db
     
-    async def start_lesson_quiz(self, ctx, course_id: int, module_id: int, lesson_id: int):
-        """Start a quiz for a specific lesson"""
-        lesson = get_lesson(course_id, module_id, lesson_id)
-        
-        if not lesson or "quiz" not in lesson:
-            embed = discord.Embed(
-                title="❌ No Quiz Available",
-                description="This lesson doesn't have a quiz yet.",
-                color=0xFF0000
-            )
-            await ctx.send(embed=embed)
-            return
-        
-        quiz_data = lesson["quiz"]
-        
-        # Create quiz embed
-        embed = discord.Embed(
-            title=f"❓ {lesson['title']} - Quiz",
-            description=quiz_data["question"],
-            color=0x0099FF
-        )
-        
-        # Add options
-        options_text = ""
-        for i, option in enumerate(quiz_data["options"]):
-            options_text += f"**{chr(65 + i)}.** {option}\n"
-        
-        embed.add_field(
-            name="Choose your answer:",
-            value=options_text,
-            inline=False
-        )
-        
-        embed.set_footer(text="You have 5 minutes to answer!")
-        
-        # Create view with buttons
-        view = QuizView(quiz_data, ctx.author.id, course_id, module_id, lesson_id)
-        
-        await ctx.send(embed=embed, view=view)
-    
-    async def start_module_quiz(self, ctx, course_id: int, module_id: int):
-        """Start a comprehensive quiz for a module"""
-        from courses import get_module
+    async def get_quiz_stats(self, ctx, user_id: int = None, snapshot: dict = None):
+        """Get quiz statistics for a user (from db.get_progress_snapshot)"""
+        target_user_id = user_id or ctx.author.id
+        snapshot = snapshot or self.db.get_progress_snapshot(target_user_id)
         
-        module = get_module(course_id, module_id)
-        if not module:
+        if snapshot is None:
             embed = discord.Embed(
-                title="❌ Module Not Found",
-                description="Could not find the specified module.",
+                title="❌ Error",
+                description="Could not retrieve quiz statistics.",
                 color=0xFF0000
             )
             await ctx.send(embed=embed)
             return
         
-        # Collect all quiz questions from module lessons
-        questions = []
-        for lesson_id, lesson in module["lessons"].items():
-            if "quiz" in lesson:
-                questions.append(lesson["quiz"])
-        
-        if not questions:
+        quiz = snapshot["quiz"]
+        if not quiz["attempts"]:
             embed = discord.Embed(
-                title="❌ No Quizzes Available",
-                description="This module doesn't have any quizzes yet.",
-                color=0xFF0000
+                title="📊 Quiz Statistics",
+                description="No quiz attempts yet! Take some quizzes to see your stats.",
+                color=0x0099FF
             )
             await ctx.send(embed=embed)
             return
         
-        # Shuffle questions for variety
-        random.shuffle(questions)
-        
-        # Limit to 5 questions max for better UX
-        questions = questions[:5]
+        total_attempts, avg_percentage = quiz["attempts"], quiz["average"]
+        perfect_scores, best_percentage = quiz["perfect"], quiz["best"]
+        username = snapshot["username"] or "Unknown User"
         
-        # Create initial embed
         embed = discord.Embed(
-            title=f"🎯 {module['title']} - Module Quiz",
-            description=f"Test your knowledge with {len(questions)} questions from this module!",
-            color=0x0099FF
+            title=f"📊 {username}'s Quiz Statistics",
+            color=0x00FF00
         )
         
         embed.add_field(
-            name="Instructions",
-            value="• Answer each question by clicking the correct option\n• You'll see immediate feedback\n• Click 'Next' to continue or 'Finish' when done",
+            name="📈 Overall Performance",
+            value=f"• **Total Attempts:** {total_attempts}\n• **Average Score:** {avg_percentage:.1f}%\n• **Best Score:** {best_percentage:.1f}%",
             inline=False
         )
         
-        # Create multi-quiz view
-        view = MultiQuizView(questions, ctx.author.id, course_id, module_id, 0)
+        embed.add_field(
+            name="🎯 Perfect Scores",
+            value=f"**{perfect_scores}** out of {total_attempts} attempts ({(perfect_scores/total_attempts*100):.1f}%)",
+            inline=False
+        )
         
-        await ctx.send(embed=embed)
+        # Performance rating
+        if avg_percentage >= 90:
+            rating = "🌟 Cybersecurity Expert"
+        elif avg_percentage >= 80:
+            rating = "🏆 Security Specialist"
+        elif avg_percentage >= 70:
+            rating = "👍 Good Student"
+        elif avg_percentage >= 60:
+            rating = "📚 Learning in Progress"
+        else:
+            rating = "📖 Keep Studying!"
         
-        # Start first question after a brief delay
-        await asyncio.sleep(2)
-        question_embed = view.create_question_embed()
-        await ctx.send(embed=question_embed, view=view)
-    
-    async def get_quiz_stats(self, ctx, user_id: int = None):
-        """Get quiz statistics for a user"""
-        target_user_id = user_id or ctx.author.id
+        embed.add_field(
+            name="🎖️ Performance Rating",
+            value=rating,
+            inline=False
+        )
         
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Get quiz statistics
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_attempts,
-                    AVG(CAST(score AS FLOAT) / total_questions * 100) as avg_percentage,
-                    SUM(CASE WHEN score = total_questions THEN 1 ELSE 0 END) as perfect_scores,
-                    MAX(CAST(score AS FLOAT) / total_questions * 100) as best_percentage
-                FROM quiz_attempts 
-                WHERE user_id = ?
-            """, (target_user_id,))
-            
-            stats = cursor.fetchone()
-            
-            if not stats or stats[0] == 0:
-                embed = discord.Embed(
-                    title="📊 Quiz Statistics",
-                    description="No quiz attempts yet! Take some quizzes to see your stats.",
-                    color=0x0099FF
-                )
-                await ctx.send(embed=embed)
-                return
-            
-            total_attempts, avg_percentage, perfect_scores, best_percentage = stats
-            
-            # Get user info
-            user_stats = self.db.get_user_stats(target_user_id)
-            username = user_stats[0] if user_stats else "Unknown User"
-            
-            embed = discord.Embed(
-                title=f"📊 {username}'s Quiz Statistics",
-                color=0x00FF00
-            )
-            
-            embed.add_field(
-                name="📈 Overall Performance",
-                value=f"• **Total Attempts:** {total_attempts}\n• **Average Score:** {avg_percentage:.1f}%\n• **Best Score:** {best_percentage:.1f}%",
-                inline=False
-            )
-            
-            embed.add_field(
-                name="🎯 Perfect Scores",
-                value=f"**{perfect_scores}** out of {total_attempts} attempts ({(perfect_scores/total_attempts*100):.1f}%)",
-                inline=False
-            )
-            
-            # Performance rating
-            if avg_percentage >= 90:
-                rating = "🌟 Cybersecurity Expert"
-            elif avg_percentage >= 80:
-                rating = "🏆 Security Specialist"
-            elif avg_percentage >= 70:
-                rating = "👍 Good Student"
-            elif avg_percentage >= 60:
-                rating = "📚 Learning in Progress"
-            else:
-                rating = "📖 Keep Studying!"
-            
-            embed.add_field(
-                name="🎖️ Performance Rating",
-                value=rating,
-                inline=False
-            )
-            
-            await ctx.send(embed=embed)
-            
-        except Exception as e:
-            print(f"Error getting quiz stats: {e}")
-            embed = discord.Embed(
-                title="❌ Error",
-                description="Could not retrieve quiz statistics.",
-                color=0xFF0000
-            )
-            await ctx.send(embed=embed)
-        finally:
-            conn.close()
+        await ctx.send(embed=embed)
 
 # Global quiz manager instance
 quiz_manager = QuizManager()
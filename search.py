@@ -0,0 +1,144 @@
+"""
+Lesson Search for Cybersecurity Learning Bot
+SQLite FTS5 index over lesson titles, content, exercises and quiz questions
+"""
+
+import sqlite3
+from database import db
+from courses import add_reload_listener
+
+class LessonSearch:
+    def __init__(self):
+        self.available = None
+        self.indexed_lessons = 0
+
+    def init_index(self) -> bool:
+        """Create the FTS5 table and the per-lesson stamp table"""
+        if self.available is not None:
+            return self.available
+
+        conn = db.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS lesson_search USING fts5(
+                    course_id UNINDEXED,
+                    module_id UNINDEXED,
+                    lesson_id UNINDEXED,
+                    title,
+                    content,
+                    exercise,
+                    quiz,
+                    tokenize = 'porter unicode61'
+                )
+            """)
+
+            # Source stamp of each indexed lesson so rebuilds only touch changed lessons
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lesson_search_state (
+                    course_id INTEGER,
+                    module_id INTEGER,
+                    lesson_id INTEGER,
+                    stamp TEXT,
+                    PRIMARY KEY (course_id, module_id, lesson_id)
+                )
+            """)
+            conn.commit()
+            self.available = True
+        except sqlite3.OperationalError as e:
+            print(f"❌ Lesson search disabled (SQLite FTS5 not available): {e}")
+            self.available = False
+        finally:
+            conn.close()
+
+        return self.available
+
+    def sync(self, catalog) -> int:
+        """Bring the index in line with a catalog; returns the number of lessons (re)indexed"""
+        if not self.init_index():
+            return 0
+
+        conn = db.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT course_id, module_id, lesson_id, stamp FROM lesson_search_state")
+            indexed = {(c, m, l): stamp for c, m, l, stamp in cursor.fetchall()}
+
+            current = {key: repr(summary["stamp"]) for key, summary in catalog.iter_lessons()}
+            changed = [key for key, stamp in current.items() if indexed.get(key) != stamp]
+            removed = [key for key in indexed if key not in current]
+
+            for key in changed + removed:
+                cursor.execute("""
+                    DELETE FROM lesson_search WHERE course_id = ? AND module_id = ? AND lesson_id = ?
+                """, key)
+                cursor.execute("""
+                    DELETE FROM lesson_search_state WHERE course_id = ? AND module_id = ? AND lesson_id = ?
+                """, key)
+
+            for key in changed:
+                lesson = catalog.get_lesson(*key, use_cache=False)
+                if not lesson:
+                    continue
+
+                exercise = lesson.get("practical_exercise", {})
+                quiz = lesson.get("quiz", {})
+                cursor.execute("""
+                    INSERT INTO lesson_search (course_id, module_id, lesson_id, title, content, exercise, quiz)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (*key, lesson.get("title", ""), lesson.get("content", ""),
+                      " ".join([exercise.get("title", ""), exercise.get("description", "")] + exercise.get("steps", [])),
+                      " ".join([quiz.get("question", "")] + quiz.get("options", []) + [quiz.get("explanation", "")])))
+                cursor.execute("""
+                    INSERT INTO lesson_search_state (course_id, module_id, lesson_id, stamp)
+                    VALUES (?, ?, ?, ?)
+                """, (*key, current[key]))
+
+            conn.commit()
+            self.indexed_lessons = len(current)
+            if changed or removed:
+                print(f"🔎 Search index updated: {len(changed)} lessons indexed, {len(removed)} removed")
+            return len(changed)
+        except Exception as e:
+            print(f"Error updating search index: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            conn.close()
+
+    def search(self, terms: str, limit: int = 5) -> list:
+        """Ranked matches: [(course_id, module_id, lesson_id, title, snippet)]"""
+        words = [word.replace('"', "") for word in terms.split()]
+        words = [word for word in words if word]
+        if not words or not self.init_index():
+            return []
+
+        # Quote each word so user input is never parsed as FTS5 syntax; prefix-match the last one
+        query = " ".join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+
+        conn = db.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                SELECT course_id, module_id, lesson_id, title,
+                       snippet(lesson_search, -1, '__', '__', '…', 16)
+                FROM lesson_search
+                WHERE lesson_search MATCH ?
+                ORDER BY bm25(lesson_search, 0, 0, 0, 10.0, 1.0, 2.0, 2.0)
+                LIMIT ?
+            """, (query.strip(), limit))
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"Error searching lessons: {e}")
+            return []
+        finally:
+            conn.close()
+
+# Global lesson search instance
+lesson_search = LessonSearch()
+
+# Re-index changed lessons whenever course content is reloaded
+add_reload_listener(lesson_search.sync)
@@ -0,0 +1,153 @@
+"""
+Startup Helpers for Cybersecurity Learning Bot
+Startup timeline, cached slash-command sync and an import-time budget check
+
+Usage: python startup.py [module] [budget_ms]
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Cold import budget for bot.py, in milliseconds
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Fingerprint of the last command tree pushed to Discord
+COMMAND_TREE_CACHE = os.getenv("COMMAND_TREE_CACHE", os.path.join(PROJECT_DIR, ".command_tree.json"))
+
+class StartupTimeline:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = []
+
+    def mark(self, phase: str):
+        """Record a startup phase once (on_ready and friends fire again on reconnect)"""
+        if phase not in self.elapsed():
+            self.marks.append((phase, time.perf_counter()))
+
+    def elapsed(self) -> dict:
+        """Milliseconds from process start to each phase"""
+        return {phase: (at - self.started) * 1000 for phase, at in self.marks}
+
+    def log(self):
+        """Print the timeline with the time spent in each phase"""
+        previous = self.started
+        parts = []
+        for phase, at in self.marks:
+            parts.append(f"{phase} +{(at - previous) * 1000:.0f} ms")
+            previous = at
+        total = (previous - self.started) * 1000
+        print(f"⏱️ Startup timeline: {' → '.join(parts)} (total {total:.0f} ms)")
+
+# Global startup timeline (created when bot.py starts importing)
+timeline = StartupTimeline()
+
+def command_tree_fingerprint(tree) -> str:
+    """Hash the payload Discord would receive for the global command tree"""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands()),
+                     key=lambda command: (command.get("type", 1), command["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+def _load_tree_cache() -> dict:
+    try:
+        with open(COMMAND_TREE_CACHE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+async def sync_command_tree(bot, force: bool = False) -> bool:
+    """Sync slash commands only when their definitions changed since the last sync"""
+    fingerprint = command_tree_fingerprint(bot.tree)
+    cached = _load_tree_cache()
+
+    if not force and cached.get("fingerprint") == fingerprint and cached.get("application_id") == bot.application_id:
+        print(f"🔄 Slash commands unchanged since {cached.get('synced_at', 'last sync')}, skipping sync")
+        return False
+
+    synced = await bot.tree.sync()
+    print(f"🔄 Synced {len(synced)} slash commands")
+
+    try:
+        with open(COMMAND_TREE_CACHE, "w") as f:
+            json.dump({
+                "fingerprint": fingerprint,
+                "application_id": bot.application_id,
+                "synced_at": datetime.utcnow().isoformat()
+            }, f)
+    except OSError as e:
+        print(f"Error saving command tree cache: {e}")
+
+    return True
+
+def measure_import_time(module: str = "bot") -> dict:
+    """Import a module in a fresh interpreter and parse the -X importtime report"""
+    # After the import, report whether it already loaded the lesson catalog
+    script = f"import {module}, courses; print(courses._catalog is not None)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = _parse_line(line)
+        imports[name] = (self_us, cumulative_us)
+
+    if module not in imports:
+        raise RuntimeError(f"No import time reported for {module}")
+
+    return {
+        "module": module,
+        "total_ms": imports[module][1] / 1000,
+        "imports": imports,
+        "content_loaded": result.stdout.strip().splitlines()[-1:] == ["True"]
+    }
+
+def _parse_line(line: str) -> tuple:
+    """Parse one `import time:` line into (self_us, cumulative_us, module)"""
+    fields = line[len("import time:"):].split("|")
+    return int(fields[0]), int(fields[1]), fields[2].strip()
+
+def check_startup_budget(report: dict, budget_ms: float = IMPORT_BUDGET_MS) -> list:
+    """Return a list of budget violations for an import report (empty when within budget)"""
+    problems = []
+
+    if report["total_ms"] > budget_ms:
+        problems.append(f"importing {report['module']} took {report['total_ms']:.0f} ms (budget {budget_ms:.0f} ms)")
+
+    if report.get("content_loaded"):
+        problems.append(f"importing {report['module']} loaded the lesson catalog; content must load in setup_hook")
+
+    return problems
+
+if __name__ == "__main__":
+    module = sys.argv[1] if len(sys.argv) > 1 else "bot"
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else IMPORT_BUDGET_MS
+
+    report = measure_import_time(module)
+    print(f"⏱️ import {module}: {report['total_ms']:.1f} ms (budget {budget:.0f} ms)")
+
+    slowest = sorted(report["imports"].items(), key=lambda item: -item[1][0])[:10]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"   {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms total  {name}")
+
+    problems = check_startup_budget(report, budget)
+    for problem in problems:
+        print(f"❌ {problem}")
+
+    sys.exit(1 if problems else 0)